@@ -0,0 +1,119 @@
+# Assignment3/app/api/async_groups_router.py
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional, Union
+from ..db.async_database import get_async_db
+from ..core.etag import etag_matches, group_etag, not_modified
+from ..db import schemas
+from ..services import async_group_service, group_service, stats_service
+from ..services.student_service import DEFAULT_STUDENT_LOAD, StudentLoad
+
+# Асинхронный вариант groups_router (DB_MODE=async): те же маршруты и схемы ответов
+
+router = APIRouter()
+
+# --- 1. Создать группу ---
+@router.post("/", response_model=schemas.Group, status_code=status.HTTP_201_CREATED)
+async def create_group_endpoint(group: schemas.GroupCreate, db: AsyncSession = Depends(get_async_db)):
+    """Создать новую группу."""
+    return await async_group_service.create_group(db=db, group=group)
+
+# --- 2. Получить список групп ---
+@router.get("/", response_model=Union[List[schemas.Group], schemas.GroupPage])
+async def read_groups_endpoint(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    paging: Literal["offset", "cursor"] = Query(
+        "offset", description="offset — список (устаревший режим), cursor — страница с next_cursor"
+    ),
+    cursor: Optional[str] = Query(None, description="Курсор из next_cursor предыдущей страницы"),
+    order: group_service.GroupOrder = Query("id", description="Порядок для курсорного режима: id или name"),
+    with_total: bool = Query(False, description="Посчитать общее количество (дополнительный COUNT)"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Получить список всех групп."""
+    if paging == "cursor" or cursor is not None:
+        try:
+            groups, next_cursor, total = await async_group_service.get_groups_page(
+                db, limit=limit, cursor=cursor, order=order, with_total=with_total
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return schemas.GroupPage(items=groups, next_cursor=next_cursor, total=total)
+
+    groups = await async_group_service.get_groups(db, skip=skip, limit=limit)
+    return groups
+
+# --- 2a. Статистика по всем группам ---
+# Объявлен до /{group_id}, иначе "stats" разбирался бы как group_id
+@router.get("/stats", response_model=schemas.GroupStatsSummary)
+async def read_groups_stats_endpoint(db: AsyncSession = Depends(get_async_db)):
+    """Размеры групп, min/avg/max возраста и число студентов без группы (одним агрегирующим запросом)."""
+    return await db.run_sync(stats_service.get_group_stats_summary)
+
+# --- 3. Получить информацию о группе по ее id ---
+@router.get("/{group_id}", response_model=schemas.Group)
+async def read_group_endpoint(
+    group_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)
+):
+    """Получить информацию о группе по ID (с ETag; If-None-Match -> 304)."""
+    db_group = await async_group_service.get_group_cached(db, group_id=group_id)
+    if db_group is None:
+        raise HTTPException(status_code=404, detail="Группа не найдена")
+    etag = group_etag(db_group.id, db_group.version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return db_group
+
+# --- 4. Удалить группу ---
+@router.delete("/{group_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_group_endpoint(group_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Удалить группу по ID."""
+    deleted_group = await async_group_service.delete_group(db, group_id=group_id)
+    if deleted_group is None:
+        raise HTTPException(status_code=404, detail="Группа не найдена")
+    return
+
+# --- 4a. Массово перевести студентов в группу ---
+@router.put("/{group_id}/students", response_model=schemas.GroupStudentsAssignResult)
+async def assign_students_to_group_endpoint(
+    group_id: int, assignment: schemas.GroupStudentsAssign, db: AsyncSession = Depends(get_async_db)
+):
+    """Перевести список студентов в группу; ненайденные студенты попадают в errors."""
+    result = await async_group_service.assign_students_to_group(db, group_id, assignment.student_ids)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Группа не найдена")
+    updated, errors = result
+    return schemas.GroupStudentsAssignResult(updated=updated, errors=errors)
+
+# --- 5. Получить всех студентов в группе ---
+@router.get("/{group_id}/students", response_model=List[schemas.Student])
+async def get_students_in_group_endpoint(
+    group_id: int,
+    request: Request,
+    response: Response,
+    load: StudentLoad = Query(DEFAULT_STUDENT_LOAD, description="Стратегия загрузки группы: joined, selectin (lazy = selectin)"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Получить список всех студентов, принадлежащих указанной группе.
+    ETag считается агрегатом по индексу; при совпадении If-None-Match строки не загружаются (304).
+    """
+    etag = await db.run_sync(group_service.get_roster_etag, group_id)
+    if etag is None:
+        # Если группа не найдена, выбросим 404
+        raise HTTPException(status_code=404, detail="Группа не найдена")
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return await async_group_service.get_students_in_group_cached(db, group_id=group_id, load=load, etag=etag)
+
+# --- 6. Статистика группы ---
+@router.get("/{group_id}/stats", response_model=schemas.GroupStatsDetail)
+async def read_group_stats_endpoint(group_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Размер группы, min/avg/max возраста и распределение по возрасту."""
+    stats = await db.run_sync(stats_service.get_group_stats, group_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Группа не найдена")
+    return stats
@@ -1,7 +1,13 @@
 # Assignment3/app/api/students_router.py
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Literal, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..core.etag import etag_matches, not_modified, student_etag
+from ..core.fast_json import FastJSONResponse
+from ..core.json_stream import iter_json_array_batches
 from ..db.database import get_db
 from ..db import schemas
 from ..services import student_service 
@@ -14,20 +20,104 @@ def create_student_endpoint(student: schemas.StudentCreate, db: Session = Depend
     """Создать нового студента."""
     return student_service.create_student(db=db, student=student)
 
+# --- 1a. Массово создать студентов ---
+@router.post("/bulk", response_model=schemas.StudentBulkResult, status_code=status.HTTP_201_CREATED)
+async def bulk_create_students_endpoint(request: Request, db: Session = Depends(get_db)):
+    """
+    Создать студентов из JSON-массива [{"fio", "age", "group_id"}, ...] в одной транзакции.
+    Тело читается потоково и вставляется пачками; некорректные элементы попадают в errors.
+    """
+    result = schemas.StudentBulkResult(created=0, ids=[], errors=[])
+    try:
+        async for batch in iter_json_array_batches(request.stream(), student_service.BULK_BATCH_SIZE):
+            ids, errors = await run_in_threadpool(student_service.bulk_create_students, db, batch)
+            result.ids.extend(ids)
+            result.errors.extend(errors)
+    except ValueError as e:
+        await run_in_threadpool(db.rollback)
+        raise HTTPException(status_code=400, detail=str(e))
+    await run_in_threadpool(db.commit)
+    result.created = len(result.ids)
+    return result
+
 # --- 2. Получить список студентов ---
-@router.get("/", response_model=List[schemas.Student])
-def read_students_endpoint(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/", response_model=Union[List[schemas.Student], schemas.StudentPage])
+def read_students_endpoint(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    load: student_service.StudentLoad = Query(
+        student_service.DEFAULT_STUDENT_LOAD, description="Стратегия загрузки группы: joined, selectin, lazy"
+    ),
+    paging: Literal["offset", "cursor"] = Query(
+        "offset", description="offset — список (устаревший режим), cursor — страница с next_cursor"
+    ),
+    cursor: Optional[str] = Query(None, description="Курсор из next_cursor предыдущей страницы"),
+    order: student_service.StudentOrder = Query("id", description="Порядок для курсорного режима: id или fio"),
+    with_total: bool = Query(False, description="Посчитать общее количество (дополнительный COUNT)"),
+    db: Session = Depends(get_db),
+):
     """Получить список всех студентов."""
-    students = student_service.get_students(db, skip=skip, limit=limit)
+    if settings.LIST_FAST_PATH:
+        # Кортежи колонок -> dict -> JSON, без ORM-объектов и повторной валидации (load не применяется)
+        if paging == "cursor" or cursor is not None:
+            try:
+                page = student_service.get_student_rows_page(
+                    db, limit=limit, cursor=cursor, order=order, with_total=with_total
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            return FastJSONResponse(page)
+        return FastJSONResponse(student_service.get_student_rows(db, skip=skip, limit=limit))
+
+    if paging == "cursor" or cursor is not None:
+        try:
+            students, next_cursor, total = student_service.get_students_page(
+                db, limit=limit, cursor=cursor, order=order, load=load, with_total=with_total
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return schemas.StudentPage(items=students, next_cursor=next_cursor, total=total)
+
+    students = student_service.get_students(db, skip=skip, limit=limit, load=load)
     return students
 
+# --- 2a. Поиск студентов по ФИО ---
+# Объявлен до /{student_id}, иначе "search" разбирался бы как student_id
+@router.get("/search", response_model=List[schemas.Student])
+def search_students_endpoint(
+    q: str = Query(..., min_length=1, description="Начало ФИО или ФИО с опечатками"),
+    limit: int = Query(20, ge=1, le=100),
+    load: student_service.StudentLoad = Query(student_service.DEFAULT_STUDENT_LOAD),
+    db: Session = Depends(get_db),
+):
+    """Найти студентов по ФИО (префикс и нечеткое совпадение), по убыванию релевантности."""
+    return student_service.search_students(db, q=q, limit=limit, load=load)
+
+# --- 2b. Выгрузить всех студентов ---
+@router.get("/export", response_class=StreamingResponse)
+def export_students_endpoint(
+    format: student_service.ExportFormat = Query("ndjson", description="ndjson или csv"),
+    db: Session = Depends(get_db),
+):
+    """Выгрузить всех студентов с названиями групп потоком (NDJSON или CSV)."""
+    media_type = "text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        student_service.iter_students_export(db.get_bind(), format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="students.{format}"'},
+    )
+
 # --- 3. Получить информацию о студенте по его id ---
 @router.get("/{student_id}", response_model=schemas.Student)
-def read_student_endpoint(student_id: int, db: Session = Depends(get_db)):
-    """Получить информацию о студенте по ID."""
-    db_student = student_service.get_student(db, student_id=student_id)
+def read_student_endpoint(student_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """Получить информацию о студенте по ID (с ETag; If-None-Match -> 304)."""
+    db_student = student_service.get_student_cached(db, student_id=student_id)
     if db_student is None:
         raise HTTPException(status_code=404, detail="Студент не найден")
+    etag = student_etag(db_student.id, db_student.version, db_student.group.version if db_student.group else None)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return db_student
 
 # --- 4. Удалить студента ---
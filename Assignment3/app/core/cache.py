@@ -0,0 +1,214 @@
+# Assignment3/app/core/cache.py
+import time
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from pydantic import TypeAdapter
+from .config import settings
+
+# --- Кэш чтения для студентов, групп и составов групп ---
+# Значения — готовые Pydantic-схемы ответа (не ORM-объекты, которые привязаны к сессии).
+# Сервисы инвалидируют затронутые ключи после каждой изменяющей операции.
+# Граница устаревания — TTL: запись не может жить дольше ttl секунд, даже если
+# инвалидация не дошла (другой воркер gunicorn со своим кэшем в памяти, гонка
+# чтения с незафиксированной транзакцией).
+# Асинхронные сервисы (DB_MODE=async) вызывают aget/aset/adelete: сетевой бэкенд
+# не должен блокировать цикл событий.
+
+def student_key(student_id: int) -> str:
+    return f"student:{student_id}"
+
+def group_key(group_id: int) -> str:
+    return f"group:{group_id}"
+
+def group_students_key(group_id: int) -> str:
+    return f"group_students:{group_id}"
+
+
+class Cache(ABC):
+    """Кэш значений по строковому ключу. adapter нужен бэкендам, хранящим JSON."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @abstractmethod
+    def get(self, key: str, adapter: TypeAdapter) -> Optional[Any]:
+        """Значение по ключу или None (промах)."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, adapter: TypeAdapter) -> None:
+        """Сохраняет значение (None не кэшируется)."""
+
+    @abstractmethod
+    def delete(self, *keys: str) -> None:
+        """Инвалидирует ключи."""
+
+    # Бэкенды в памяти не выполняют I/O и вызываются прямо в цикле событий
+
+    async def aget(self, key: str, adapter: TypeAdapter) -> Optional[Any]:
+        return self.get(key, adapter)
+
+    async def aset(self, key: str, value: Any, adapter: TypeAdapter) -> None:
+        self.set(key, value, adapter)
+
+    async def adelete(self, *keys: str) -> None:
+        self.delete(*keys)
+
+    def _count(self, value: Optional[Any]) -> Optional[Any]:
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+class NullCache(Cache):
+    """Кэш выключен (CACHE_BACKEND=off): каждый вызов — промах."""
+
+    def get(self, key: str, adapter: TypeAdapter) -> Optional[Any]:
+        return self._count(None)
+
+    def set(self, key: str, value: Any, adapter: TypeAdapter) -> None:
+        pass
+
+    def delete(self, *keys: str) -> None:
+        pass
+
+
+class LRUTTLCache(Cache):
+    """
+    LRU-кэш в памяти процесса с ограничением времени жизни записи.
+    Потокобезопасен: синхронные эндпоинты выполняются в пуле потоков.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str, adapter: TypeAdapter) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                return self._count(None)
+            self._entries.move_to_end(key)
+            return self._count(entry[1])
+
+    def set(self, key: str, value: Any, adapter: TypeAdapter) -> None:
+        if value is None:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+            self.invalidations += len(keys)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "size": len(self), "evictions": self.evictions, "ttl_seconds": self.ttl}
+
+
+class RedisCache(Cache):
+    """
+    Общий кэш в Redis для всех воркеров: значения хранятся как JSON с TTL (SET EX).
+    Принимает любой клиент с get/set/delete (redis.Redis или подделка в тестах).
+    async_client (redis.asyncio.Redis) используется в aget/aset/adelete; без него
+    синхронные вызовы выполняются в пуле потоков.
+    """
+
+    def __init__(self, client: Any, ttl: float, key_prefix: str = "a3cache:", async_client: Any = None):
+        super().__init__()
+        self._client = client
+        self._async_client = async_client
+        self.ttl = ttl
+        self._key_prefix = key_prefix
+
+    def get(self, key: str, adapter: TypeAdapter) -> Optional[Any]:
+        raw = self._client.get(self._key_prefix + key)
+        return self._count(adapter.validate_json(raw) if raw is not None else None)
+
+    def set(self, key: str, value: Any, adapter: TypeAdapter) -> None:
+        if value is None:
+            return
+        self._client.set(self._key_prefix + key, adapter.dump_json(value), ex=max(int(self.ttl), 1))
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self._client.delete(*(self._key_prefix + key for key in keys))
+            self.invalidations += len(keys)
+
+    async def aget(self, key: str, adapter: TypeAdapter) -> Optional[Any]:
+        if self._async_client is None:
+            return await asyncio.to_thread(self.get, key, adapter)
+        raw = await self._async_client.get(self._key_prefix + key)
+        return self._count(adapter.validate_json(raw) if raw is not None else None)
+
+    async def aset(self, key: str, value: Any, adapter: TypeAdapter) -> None:
+        if value is None:
+            return
+        if self._async_client is None:
+            return await asyncio.to_thread(self.set, key, value, adapter)
+        await self._async_client.set(self._key_prefix + key, adapter.dump_json(value), ex=max(int(self.ttl), 1))
+
+    async def adelete(self, *keys: str) -> None:
+        if not keys:
+            return
+        if self._async_client is None:
+            return await asyncio.to_thread(self.delete, *keys)
+        await self._async_client.delete(*(self._key_prefix + key for key in keys))
+        self.invalidations += len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "ttl_seconds": self.ttl}
+
+
+def create_cache(backend: Optional[str] = None) -> Cache:
+    """Создает кэш согласно CACHE_BACKEND: memory, redis или off."""
+    backend = (backend or settings.CACHE_BACKEND).lower()
+    if backend == "memory":
+        return LRUTTLCache(settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_SECONDS)
+    if backend == "redis":
+        # Необязательная зависимость: нужна только при CACHE_BACKEND=redis
+        import redis
+        async_client = None
+        if settings.DB_MODE == "async":
+            import redis.asyncio
+            async_client = redis.asyncio.Redis.from_url(settings.REDIS_URL)
+        return RedisCache(redis.Redis.from_url(settings.REDIS_URL), settings.CACHE_TTL_SECONDS, async_client=async_client)
+    if backend == "off":
+        return NullCache()
+    raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+
+
+# Глобальный экземпляр, используемый сервисами
+cache = create_cache()
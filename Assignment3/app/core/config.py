@@ -1,5 +1,6 @@
 # Assignment3/app/core/config.py
 import os
+from typing import Optional
 from dotenv import load_dotenv
 
 # Загружаем переменные из .env файла
@@ -13,9 +14,59 @@ class Settings:
     DB_USER: str = os.getenv("DB_USER", "postgres")
     DB_PASS: str = os.getenv("DB_PASS", "mypassword")
     
+    # Ожидание БД при старте: экспоненциальная задержка со случайным разбросом
+    DB_CONNECT_MAX_ATTEMPTS: int = int(os.getenv("DB_CONNECT_MAX_ATTEMPTS", "10"))
+    DB_CONNECT_BASE_DELAY: float = float(os.getenv("DB_CONNECT_BASE_DELAY", "0.2"))
+    DB_CONNECT_MAX_DELAY: float = float(os.getenv("DB_CONNECT_MAX_DELAY", "5"))
+    
+    # Пул соединений. DB_MAX_CONNECTIONS — общий бюджет на все воркеры gunicorn
+    # (WEB_CONCURRENCY, по нему же gunicorn выбирает число воркеров); пул каждого воркера
+    # получает свою долю. DB_POOL_SIZE/DB_MAX_OVERFLOW по умолчанию выводятся из доли
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+    DB_MAX_CONNECTIONS: int = int(os.getenv("DB_MAX_CONNECTIONS", "80"))
+    DB_POOL_SIZE: Optional[int] = int(os.environ["DB_POOL_SIZE"]) if os.getenv("DB_POOL_SIZE") else None
+    DB_MAX_OVERFLOW: Optional[int] = int(os.environ["DB_MAX_OVERFLOW"]) if os.getenv("DB_MAX_OVERFLOW") else None
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Сколько соединений открыть при старте воркера (по умолчанию — весь pool_size, 0 — не прогревать)
+    DB_POOL_WARMUP: Optional[int] = int(os.environ["DB_POOL_WARMUP"]) if os.getenv("DB_POOL_WARMUP") else None
+    
     # URL для подключения SQLAlchemy
     DATABASE_URL: str = (
         f"postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
     )
+    # URL для асинхронного драйвера (asyncpg)
+    ASYNC_DATABASE_URL: str = (
+        f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    )
+    
+    # Режим API: sync — синхронные эндпоинты в threadpool (psycopg2),
+    # async — эндпоинты на AsyncSession (asyncpg), без ограничения пулом потоков
+    DB_MODE: str = os.getenv("DB_MODE", "sync").lower()
+    
+    # Кэш чтения студентов/групп: memory (LRU в процессе), redis (общий) или off.
+    # TTL — верхняя граница устаревания записи (секунды)
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory").lower()
+    CACHE_TTL_SECONDS: float = float(os.getenv("CACHE_TTL_SECONDS", "30"))
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://redis:6379/0")
+    
+    # Статистика групп из сводной таблицы group_age_counts (обновляется мутаторами)
+    # вместо агрегации по всей таблице students
+    GROUP_STATS_SUMMARY: bool = os.getenv("GROUP_STATS_SUMMARY", "false").lower() == "true"
+    
+    # Мутации студентов и групп: orm — SELECT + UPDATE + commit + refresh,
+    # returning — одна команда UPDATE/DELETE ... RETURNING (только PostgreSQL)
+    MUTATION_MODE: str = os.getenv("MUTATION_MODE", "orm").lower()
+    
+    # Профилирование SQL по запросам: заголовок Server-Timing и лог запросов
+    # дольше SQL_SLOW_REQUEST_MS с их командами. Выключено — без накладных расходов
+    SQL_PROFILER: bool = os.getenv("SQL_PROFILER", "false").lower() == "true"
+    SQL_SLOW_REQUEST_MS: float = float(os.getenv("SQL_SLOW_REQUEST_MS", "500"))
+    
+    # Быстрый путь GET /students: кортежи колонок и JSON без повторной валидации
+    # response_model (orjson, если установлен)
+    LIST_FAST_PATH: bool = os.getenv("LIST_FAST_PATH", "false").lower() == "true"
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,29 @@
+# Assignment3/app/core/etag.py
+from typing import Optional
+from fastapi import Response, status
+
+# --- ETag и условные GET-запросы ---
+# ETag строится из версий строк (Student.version, Group.version), поэтому для ответа
+# 304 не нужны ни загрузка ORM-объектов, ни сериализация тела.
+
+def student_etag(student_id: int, version: int, group_version: Optional[int] = None) -> str:
+    """ETag студента: тело содержит вложенную группу, поэтому в него входит и ее версия (g0 — без группы)."""
+    return f'"student-{student_id}-v{version}-g{group_version or 0}"'
+
+def group_etag(group_id: int, version: int) -> str:
+    return f'"group-{group_id}-v{version}"'
+
+def roster_etag(group_id: int, group_version: int, student_count: int, versions_sum: int) -> str:
+    """ETag состава группы по агрегату: версия группы, число студентов и сумма их версий."""
+    return f'"roster-{group_id}-v{group_version}-{student_count}-{versions_sum}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Сравнение для If-None-Match (RFC 9110: слабое сравнение, допускается список и *)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
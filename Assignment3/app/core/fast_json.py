@@ -0,0 +1,26 @@
+# Assignment3/app/core/fast_json.py
+import json
+from typing import Any
+from fastapi.responses import Response
+
+try:
+    # Необязательная зависимость: без orjson ответ кодируется стандартным json
+    import orjson
+except ImportError:
+    orjson = None
+
+# Кодировщик, которым FastJSONResponse кодирует ответы (выводится бенчмарками)
+JSON_ENCODER = "orjson" if orjson is not None else "json"
+
+
+class FastJSONResponse(Response):
+    """
+    JSON-ответ без jsonable_encoder и response_model: содержимое (dict/list из
+    простых типов) кодируется сразу, через orjson, если он установлен.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,105 @@
+# Assignment3/app/core/json_stream.py
+import json
+import codecs
+from typing import Any, AsyncIterator, List, Tuple
+
+# --- Потоковый разбор JSON-массива ---
+# Тело запроса вида [{...}, {...}, ...] разбирается по мере поступления чанков:
+# в памяти держится только недочитанный элемент и текущая пачка, а не весь массив.
+
+# Предельный размер одного элемента: защищает от бесконечного накопления буфера
+# на некорректном JSON, который нельзя отличить от недочитанного элемента.
+MAX_ITEM_CHARS = 1_000_000
+
+_WHITESPACE = " \t\r\n"
+
+
+class JSONArrayStreamParser:
+    """Инкрементальный разбор JSON-массива верхнего уровня. Ошибки — ValueError."""
+
+    def __init__(self, max_item_chars: int = MAX_ITEM_CHARS):
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        # start -> first (значение или ']') -> comma -> value -> comma ... -> end
+        self._state = "start"
+        self._max_item_chars = max_item_chars
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Добавляет чанк и возвращает элементы, которые удалось разобрать целиком."""
+        return self._parse(self._buffer + self._utf8.decode(chunk), final=False)
+
+    def close(self) -> List[Any]:
+        """Завершает разбор; ошибка, если массив не закрыт."""
+        items = self._parse(self._buffer + self._utf8.decode(b"", final=True), final=True)
+        if self._state != "end":
+            raise ValueError("Неожиданный конец JSON-массива")
+        return items
+
+    def _parse(self, buffer: str, final: bool) -> List[Any]:
+        items: List[Any] = []
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+
+            if self._state == "start":
+                if char != "[":
+                    raise ValueError("Ожидается JSON-массив")
+                pos += 1
+                self._state = "first"
+            elif self._state == "comma":
+                if char == ",":
+                    self._state = "value"
+                elif char == "]":
+                    self._state = "end"
+                else:
+                    raise ValueError(f"Ожидается ',' или ']' после элемента, получено {char!r}")
+                pos += 1
+            elif self._state == "first" and char == "]":
+                pos += 1
+                self._state = "end"
+            elif self._state in ("first", "value"):
+                try:
+                    item, end = self._decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError as e:
+                    if final:
+                        raise ValueError(f"Некорректный JSON: {e.msg}") from e
+                    if len(buffer) - pos > self._max_item_chars:
+                        raise ValueError("Элемент слишком большой или некорректный JSON") from e
+                    break
+                # Число в конце буфера может продолжиться в следующем чанке
+                if end == len(buffer) and not final:
+                    break
+                items.append(item)
+                pos = end
+                self._state = "comma"
+            else:
+                raise ValueError("Лишние данные после JSON-массива")
+
+        self._buffer = buffer[pos:]
+        return items
+
+
+async def iter_json_array_batches(
+    chunks: AsyncIterator[bytes], batch_size: int
+) -> AsyncIterator[List[Tuple[int, Any]]]:
+    """Разбирает поток JSON-массива и отдает пачки (индекс элемента, элемент)."""
+    parser = JSONArrayStreamParser()
+    batch: List[Tuple[int, Any]] = []
+    index = 0
+    async for chunk in chunks:
+        for item in parser.feed(chunk):
+            batch.append((index, item))
+            index += 1
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    for item in parser.close():
+        batch.append((index, item))
+        index += 1
+    if batch:
+        yield batch
@@ -0,0 +1,36 @@
+# Assignment3/app/core/pagination.py
+import json
+import base64
+from typing import Any, List, Sequence
+
+from sqlalchemy import ColumnElement
+
+# --- Непрозрачные курсоры для keyset-пагинации ---
+# Курсор — base64url(JSON) с порядком сортировки и ключом последней строки страницы.
+# Клиент не должен разбирать курсор, только передавать его обратно.
+
+def encode_cursor(order: str, values: List[Any]) -> str:
+    """Кодирует порядок сортировки и значения ключа последней строки."""
+    raw = json.dumps([order, *values], separators=(",", ":"), ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, order: str, key_columns: Sequence[ColumnElement]) -> List[Any]:
+    """
+    Декодирует курсор и проверяет, что он выдан для того же порядка сортировки
+    и что значения ключа имеют типы колонок key_columns (иначе сравнение в WHERE
+    упадет уже в БД). При ошибке выбрасывает ValueError.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        decoded = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Некорректный курсор") from e
+    if not isinstance(decoded, list) or len(decoded) != len(key_columns) + 1 or decoded[0] != order:
+        raise ValueError("Курсор не соответствует порядку сортировки")
+    values = decoded[1:]
+    for value, column in zip(values, key_columns):
+        expected = column.type.python_type
+        # bool — подкласс int в Python, но не допустимый ID
+        if not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+            raise ValueError("Некорректное значение ключа в курсоре")
+    return values
@@ -0,0 +1,209 @@
+# Assignment3/app/core/search_index.py
+import bisect
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+# --- Индекс поиска по ФИО в памяти процесса ---
+# Используется, когда БД не PostgreSQL (нет pg_trgm): SQLite в разработке и бенчмарках.
+# Слова ФИО хранятся в отсортированном словаре (поиск по префиксу через bisect)
+# и в триграммном индексе (поиск с опечатками, как similarity в pg_trgm).
+# Индекс строится один раз и дальше обновляется инкрементально при создании/удалении
+# студентов в этом процессе.
+
+# Минимальная триграммная похожесть слова запроса и слова ФИО
+MIN_SIMILARITY = 0.3
+# Предел просмотра кандидатов на запрос: ограничивает задержку на очень частых словах
+SCAN_LIMIT = 5_000
+# Предел числа слов словаря, раскрываемых по префиксу (короткие префиксы чисел)
+MAX_PREFIX_WORDS = 1_000
+
+# Оценки совпадения слова запроса со словом ФИО
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.9
+FUZZY_WEIGHT = 0.8
+
+
+def normalize(text: str) -> str:
+    return text.casefold().replace("ё", "е")
+
+def tokenize(text: str) -> List[str]:
+    return normalize(text).split()
+
+def trigrams(word: str) -> Set[str]:
+    """Триграммы слова с дополнением пробелами (как в pg_trgm)."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class StudentSearchIndex:
+    """Префиксный и триграммный индекс по словам ФИО. Потокобезопасен."""
+
+    def __init__(self):
+        self._fio: Dict[int, str] = {}
+        self._postings: Dict[str, Set[int]] = {}      # слово -> ID студентов
+        self._vocabulary: List[str] = []               # отсортированные слова (для bisect)
+        self._trigram_words: Dict[str, Set[str]] = {}  # триграмма -> слова (только буквенные)
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self.built = False
+
+    def __len__(self) -> int:
+        return len(self._fio)
+
+    # --- Построение и инкрементальное обновление ---
+
+    def build(self, rows: Iterable[Tuple[int, str]]) -> None:
+        """Строит индекс заново по парам (id, fio)."""
+        with self._lock:
+            self._fio.clear()
+            self._postings.clear()
+            self._trigram_words.clear()
+            for student_id, fio in rows:
+                self._fio[student_id] = fio
+                for word in set(tokenize(fio)):
+                    self._postings.setdefault(word, set()).add(student_id)
+            self._vocabulary = sorted(self._postings)
+            for word in self._vocabulary:
+                self._index_trigrams(word)
+            self.built = True
+
+    def ensure_built(self, load_rows: Callable[[], Iterable[Tuple[int, str]]]) -> None:
+        """Строит индекс при первом обращении (один раз, даже при конкурентных запросах)."""
+        if self.built:
+            return
+        with self._build_lock:
+            if not self.built:
+                self.build(load_rows())
+
+    def add(self, student_id: int, fio: str) -> None:
+        """Добавляет студента; ничего не делает, пока индекс не построен."""
+        if not self.built:
+            return
+        with self._lock:
+            self._fio[student_id] = fio
+            for word in set(tokenize(fio)):
+                ids = self._postings.get(word)
+                if ids is None:
+                    ids = self._postings[word] = set()
+                    bisect.insort(self._vocabulary, word)
+                    self._index_trigrams(word)
+                ids.add(student_id)
+
+    def remove(self, student_id: int) -> None:
+        """Удаляет студента; слова без студентов убираются из словаря."""
+        if not self.built:
+            return
+        with self._lock:
+            fio = self._fio.pop(student_id, None)
+            if fio is None:
+                return
+            for word in set(tokenize(fio)):
+                ids = self._postings.get(word)
+                if ids is None:
+                    continue
+                ids.discard(student_id)
+                if not ids:
+                    del self._postings[word]
+                    del self._vocabulary[bisect.bisect_left(self._vocabulary, word)]
+                    for trigram in trigrams(word) if word.isalpha() else ():
+                        self._trigram_words[trigram].discard(word)
+
+    def _index_trigrams(self, word: str) -> None:
+        # Числа и прочие небуквенные слова ищутся только по префиксу
+        if word.isalpha():
+            for trigram in trigrams(word):
+                self._trigram_words.setdefault(trigram, set()).add(word)
+
+    # --- Поиск ---
+
+    def _fuzzy_words(self, query_word: str) -> Dict[str, float]:
+        """Слова словаря, похожие на слово запроса по триграммам (без префиксных совпадений)."""
+        if not query_word.isalpha():
+            return {}
+        query_trigrams = trigrams(query_word)
+        shared = Counter()
+        for trigram in query_trigrams:
+            shared.update(self._trigram_words.get(trigram, ()))
+        matches = {}
+        for word, count in shared.items():
+            if word.startswith(query_word):
+                continue
+            score = count / (len(query_trigrams) + len(trigrams(word)) - count)
+            if score >= MIN_SIMILARITY:
+                matches[word] = score * FUZZY_WEIGHT
+        return matches
+
+    def _matching_words(self, query_word: str) -> List[Tuple[float, str]]:
+        """
+        Слова словаря, подходящие под слово запроса: (оценка, слово) по убыванию оценки.
+        Префиксных слов берется не больше MAX_PREFIX_WORDS (у них одинаковая оценка).
+        """
+        matches = self._fuzzy_words(query_word)
+        position = bisect.bisect_left(self._vocabulary, query_word)
+        end = min(position + MAX_PREFIX_WORDS, len(self._vocabulary))
+        while position < end and self._vocabulary[position].startswith(query_word):
+            word = self._vocabulary[position]
+            matches[word] = EXACT_SCORE if word == query_word else PREFIX_SCORE
+            position += 1
+        return sorted(((score, word) for word, score in matches.items()), reverse=True)
+
+    @staticmethod
+    def _word_score(query_word: str, fuzzy: Dict[str, float], words: List[str]) -> float:
+        """Лучшая оценка слова запроса среди слов одного ФИО (0 — не найдено)."""
+        best = 0.0
+        for word in words:
+            if word == query_word:
+                return EXACT_SCORE
+            best = max(best, PREFIX_SCORE if word.startswith(query_word) else fuzzy.get(word, 0.0))
+        return best
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[int, float]]:
+        """
+        Находит студентов, у которых каждое слово запроса совпадает со словом ФИО
+        (точно, по префиксу или с опечаткой). Возвращает (id, оценка) по убыванию оценки.
+        """
+        query_words = list(dict.fromkeys(tokenize(query)))
+        if not query_words or limit <= 0:
+            return []
+
+        with self._lock:
+            candidates = {word: self._matching_words(word) for word in query_words}
+            if not all(candidates.values()):
+                return []
+            # Обходим студентов самого редкого слова запроса, остальные слова проверяем по ФИО
+            lead = min(query_words, key=lambda w: sum(len(self._postings[word]) for _, word in candidates[w]))
+            others = [(other, self._fuzzy_words(other)) for other in query_words if other != lead]
+            others_best = sum(candidates[other][0][0] for other, _ in others)
+
+            results: Dict[int, float] = {}
+            scanned = 0
+            for lead_score, lead_word in candidates[lead]:
+                # Слова идут по убыванию оценки, поэтому bound — максимум для всех оставшихся;
+                # как только limit результатов не хуже bound, остальные заведомо ниже
+                bound = lead_score + others_best
+                reached = sum(1 for total in results.values() if total >= bound)
+                if reached >= limit or scanned >= SCAN_LIMIT:
+                    break
+                for student_id in self._postings[lead_word]:
+                    scanned += 1
+                    if student_id not in results:
+                        words = tokenize(self._fio[student_id])
+                        total = lead_score
+                        for other, fuzzy in others:
+                            score = self._word_score(other, fuzzy, words)
+                            if not score:
+                                break
+                            total += score
+                        else:
+                            results[student_id] = total
+                            reached += total >= bound
+                    if reached >= limit or scanned >= SCAN_LIMIT:
+                        break
+
+            ranked = sorted(results.items(), key=lambda item: (-item[1], self._fio[item[0]], item[0]))
+            return ranked[:limit]
+
+
+# Глобальный экземпляр (используется, если БД не PostgreSQL)
+student_search_index = StudentSearchIndex()
@@ -0,0 +1,113 @@
+# Assignment3/app/core/sql_profiler.py
+import time
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .config import settings
+
+# --- Профилирование SQL по запросам (SQL_PROFILER=true) ---
+# События before/after_cursor_execute движка записывают каждую команду в профиль
+# текущего HTTP-запроса (ContextVar: threadpool синхронных эндпоинтов и greenlet
+# asyncpg копируют контекст запроса). Middleware создает профиль, добавляет заголовок
+# Server-Timing и печатает медленные запросы вместе с их командами.
+# При выключенном режиме ни события, ни middleware не регистрируются.
+
+# Сколько команд запроса сохраняется для лога (счетчик и время учитывают все)
+MAX_RECORDED_STATEMENTS = 50
+# Длина текста команды в логе
+MAX_STATEMENT_LENGTH = 300
+
+
+class RequestProfile:
+    """Команды SQL одного HTTP-запроса: число, суммарное время и первые MAX_RECORDED_STATEMENTS."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.statements: List[Tuple[float, str]] = []
+        self._started: List[float] = []
+
+    def start(self) -> None:
+        self._started.append(time.perf_counter())
+
+    def finish(self, statement: str) -> None:
+        if not self._started:
+            return
+        elapsed_ms = (time.perf_counter() - self._started.pop()) * 1000
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if len(self.statements) < MAX_RECORDED_STATEMENTS:
+            self.statements.append((elapsed_ms, statement))
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("sql_profile", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.start()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.finish(statement)
+
+def install_sql_profiler(engine: Engine) -> None:
+    """Подписывает профилировщик на события движка (для AsyncEngine — передать sync_engine)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def server_timing(profile: RequestProfile, total_ms: float) -> str:
+    """Значение заголовка Server-Timing: время и число команд SQL и полное время до ответа."""
+    return f'db;dur={profile.total_ms:.1f};desc="{profile.count} statements", app;dur={total_ms:.1f}'
+
+def log_slow_request(method: str, path: str, total_ms: float, profile: RequestProfile) -> None:
+    lines = [
+        f"Медленный запрос {method} {path}: {total_ms:.0f} мс, "
+        f"SQL: {profile.count} команд, {profile.total_ms:.0f} мс"
+    ]
+    for elapsed_ms, statement in profile.statements:
+        lines.append(f"  {elapsed_ms:8.1f} мс  {' '.join(statement.split())[:MAX_STATEMENT_LENGTH]}")
+    if profile.count > len(profile.statements):
+        lines.append(f"  ... еще {profile.count - len(profile.statements)} команд")
+    print("\n".join(lines))
+
+
+class SQLProfilerMiddleware:
+    """
+    ASGI middleware: профиль SQL на каждый HTTP-запрос.
+    Server-Timing отражает команды до начала ответа; в лог медленных запросов
+    попадают и команды потоковой выгрузки, выполненные во время отправки тела.
+    """
+
+    def __init__(self, app, slow_request_ms: float = settings.SQL_SLOW_REQUEST_MS):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - started) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(profile, total_ms).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_profile.reset(token)
+            total_ms = (time.perf_counter() - started) * 1000
+            if total_ms >= self.slow_request_ms:
+                log_slow_request(scope["method"], scope["path"], total_ms, profile)
@@ -0,0 +1,43 @@
+# Assignment3/app/db/async_database.py
+
+from typing import AsyncIterator, Optional
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from ..core.config import settings
+from ..core.sql_profiler import install_sql_profiler
+from .database import pool_options
+
+# Асинхронный вариант database.py (используется при DB_MODE=async).
+# Модели и Base общие с синхронным вариантом; DDL при старте выполняет init_db из database.py.
+
+# 1. Создание асинхронного движка БД
+async_engine = create_async_engine(settings.ASYNC_DATABASE_URL, **pool_options(serving=True))
+if settings.SQL_PROFILER:
+    # События курсора выполняются на синхронном движке внутри AsyncEngine
+    install_sql_profiler(async_engine.sync_engine)
+
+# 2. Создание фабрики асинхронных сессий
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,  # объекты остаются доступны для сериализации после commit
+)
+
+# 3. Функция зависимости для получения асинхронной сессии
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# 4. Прогрев пула (см. warm_up_pool в database.py)
+async def warm_up_async_pool(count: Optional[int] = None) -> int:
+    """Заранее открывает соединения асинхронного пула. Возвращает их число."""
+    if count is None:
+        count = settings.DB_POOL_WARMUP if settings.DB_POOL_WARMUP is not None else async_engine.pool.size()
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(await async_engine.connect())
+    finally:
+        for conn in connections:
+            await conn.close()
+    return len(connections)
@@ -1,12 +1,54 @@
 # Assignment3/app/db/database.py
 
-from sqlalchemy import create_engine
+import time
+import random
+import hashlib
+from typing import Optional
+from sqlalchemy import (
+    Column, Integer, MetaData, String, Table, create_engine, delete, insert, inspect, select, text,
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.schema import CreateColumn, CreateIndex, CreateTable
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from ..core.config import settings
+from ..core.sql_profiler import install_sql_profiler
 
 # 1. Создание движка БД
-engine = create_engine(settings.DATABASE_URL)
+
+def pool_options(serving: bool = True) -> dict:
+    """
+    Параметры пула движка из Settings. Движок, обслуживающий запросы (по DB_MODE),
+    получает долю воркера в общем бюджете DB_MAX_CONNECTIONS: по умолчанию 3/4 доли —
+    постоянный пул, 1/4 — overflow. Вспомогательному движку (старт и /health/ready
+    в режиме async) достается одно соединение из той же доли.
+    """
+    options = {
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if not serving:
+        return {**options, "pool_size": 1, "max_overflow": 0}
+
+    budget = max(settings.DB_MAX_CONNECTIONS // max(settings.WEB_CONCURRENCY, 1), 1)
+    if settings.DB_MODE == "async":
+        budget = max(budget - 1, 1)
+    max_overflow = settings.DB_MAX_OVERFLOW if settings.DB_MAX_OVERFLOW is not None else budget // 4
+    pool_size = settings.DB_POOL_SIZE if settings.DB_POOL_SIZE is not None else max(budget - max_overflow, 1)
+    if pool_size + max_overflow > budget:
+        print(
+            f"Пул {pool_size}+{max_overflow} превышает долю воркера ({budget} из {settings.DB_MAX_CONNECTIONS} "
+            f"на {settings.WEB_CONCURRENCY} воркеров), уменьшен."
+        )
+        pool_size = min(pool_size, budget)
+        max_overflow = budget - pool_size
+    return {**options, "pool_size": pool_size, "max_overflow": max_overflow}
+
+engine = create_engine(settings.DATABASE_URL, **pool_options(serving=settings.DB_MODE != "async"))
+if settings.SQL_PROFILER:
+    install_sql_profiler(engine)
 
 # 2. Создание фабрики локальных сессий
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -23,6 +65,153 @@ def get_db():
         db.close()
 
 # 5. Инициализация БД
+
+# Ключ advisory lock PostgreSQL: DDL выполняет только один из воркеров gunicorn
+SCHEMA_LOCK_KEY = 3_003_003
+
+# Отметка версии схемы (отдельные метаданные — не входит в Base.metadata)
+schema_version_table = Table(
+    "schema_version",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+)
+
+# Признак готовности (используется проверкой /health/ready)
+db_initialized = False
+
+# DDL только для PostgreSQL, не выражаемый через модели: триграммный индекс для поиска по ФИО
+POSTGRES_EXTRA_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_students_fio_trgm ON students USING gin (lower(fio) gin_trgm_ops)",
+]
+
+def schema_fingerprint(dialect) -> str:
+    """Хеш DDL всех таблиц и индексов: меняется при любом изменении моделей."""
+    from . import models  # noqa: F401 — регистрация моделей в Base.metadata
+
+    digest = hashlib.sha256()
+    for table in Base.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda idx: idx.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    if dialect.name == "postgresql":
+        for statement in POSTGRES_EXTRA_DDL:
+            digest.update(statement.encode())
+    return digest.hexdigest()
+
+def wait_for_db() -> None:
+    """Ожидание доступности БД с экспоненциальной задержкой и jitter."""
+    max_attempts = settings.DB_CONNECT_MAX_ATTEMPTS
+    for attempt in range(1, max_attempts + 1):
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return
+        except OperationalError as e:
+            if attempt == max_attempts:
+                print("Превышено количество попыток. БД недоступна.")
+                raise
+            delay = random.uniform(
+                0, min(settings.DB_CONNECT_MAX_DELAY, settings.DB_CONNECT_BASE_DELAY * 2 ** attempt)
+            )
+            print(f"БД недоступна ({attempt}/{max_attempts}): {e}. Повтор через {delay:.2f} сек...")
+            time.sleep(delay)
+
+def _read_fingerprint(conn) -> Optional[str]:
+    """
+    Отметка версии схемы; None, если таблицы schema_version еще нет (новая БД).
+    Таблица здесь не создается: на новой БД воркеры стартуют одновременно, и
+    CREATE TABLE вне advisory lock у проигравших завершался бы ошибкой.
+    """
+    try:
+        return conn.execute(
+            select(schema_version_table.c.fingerprint).where(schema_version_table.c.id == 1)
+        ).scalar()
+    except (ProgrammingError, OperationalError):
+        # PostgreSQL: UndefinedTable (транзакция прервана — вызывающий только откатывает ее);
+        # SQLite: "no such table"
+        return None
+
+def _add_missing_columns_and_indexes(conn) -> None:
+    """
+    create_all не изменяет существующие таблицы: добавляем новые столбцы моделей
+    (ALTER TABLE ADD COLUMN, у NOT NULL столбцов должен быть server_default) и индексы.
+    """
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing_columns:
+                column_ddl = CreateColumn(column).compile(dialect=conn.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column_ddl}"))
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(conn)
+
 def init_db():
-    from . import models
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    """
+    Ожидание БД и создание таблиц.
+    DDL выполняется только если отметка версии схемы не совпадает с текущими моделями,
+    поэтому обычный перезапуск воркера стоит одного SELECT.
+    Возвращает True, если схема обновлялась.
+    """
+    global db_initialized
+    wait_for_db()
+
+    fingerprint = schema_fingerprint(engine.dialect)
+
+    # Быстрый путь: схема уже актуальна (только чтение, соединение закрывается с откатом)
+    with engine.connect() as conn:
+        if _read_fingerprint(conn) == fingerprint:
+            db_initialized = True
+            return False
+
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            # Остальные воркеры ждут здесь и затем видят уже обновленную отметку
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        schema_version_table.create(conn, checkfirst=True)
+        updated = _read_fingerprint(conn) != fingerprint
+        if updated:
+            Base.metadata.create_all(bind=conn)
+            _add_missing_columns_and_indexes(conn)
+            if engine.dialect.name == "postgresql":
+                for statement in POSTGRES_EXTRA_DDL:
+                    conn.execute(text(statement))
+            conn.execute(delete(schema_version_table))
+            conn.execute(insert(schema_version_table).values(id=1, fingerprint=fingerprint))
+
+    db_initialized = True
+    return updated
+
+def warm_up_pool(bind: Optional[Engine] = None, count: Optional[int] = None) -> int:
+    """
+    Заранее открывает соединения пула (по умолчанию DB_POOL_WARMUP или весь pool_size),
+    чтобы первые запросы после деплоя не платили за подключение, TLS и аутентификацию.
+    Соединения удерживаются до открытия последнего, иначе пул выдавал бы одно и то же.
+    Возвращает число открытых соединений.
+    """
+    bind = bind or engine
+    if count is None:
+        count = settings.DB_POOL_WARMUP if settings.DB_POOL_WARMUP is not None else bind.pool.size()
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(bind.connect())
+    finally:
+        for conn in connections:
+            conn.close()
+    return len(connections)
+
+def check_db_ready() -> bool:
+    """Проверка готовности: БД инициализирована и отвечает на запрос."""
+    if not db_initialized:
+        return False
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return True
+    except OperationalError:
+        return False
\ No newline at end of file
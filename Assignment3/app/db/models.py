@@ -1,5 +1,5 @@
 # Assignment3/app/db/models.py
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .database import Base
 
@@ -9,6 +9,8 @@ class Group(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True, nullable=False)
+    # Версия для ETag: увеличивается при каждом изменении группы и ее состава
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     # Отношение (связь) с таблицей Student
     students = relationship("Student", back_populates="group")
@@ -22,7 +24,42 @@ class Student(Base):
     age = Column(Integer, nullable=False)
     
     # Внешний ключ, связывающий с группой (groups.id)
-    group_id = Column(Integer, ForeignKey("groups.id"), nullable=True) # nullable=True - студент может быть без группы
+    # ON DELETE SET NULL — страховка для удаления группы, если студент был привязан к ней
+    # параллельно; на уже созданной таблице ограничение init_db не пересоздает
+    group_id = Column(Integer, ForeignKey("groups.id", ondelete="SET NULL"), nullable=True) # nullable=True - студент может быть без группы
+    
+    # Версия для ETag: увеличивается при каждом изменении студента
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     # Отношение (связь) с таблицей Group
-    group = relationship("Group", back_populates="students")
\ No newline at end of file
+    group = relationship("Group", back_populates="students")
+
+    # Индексы: keyset-пагинация в порядке (fio, id) и выборка по группе
+    __table_args__ = (
+        Index("ix_students_fio_id", "fio", "id"),
+        # Состав группы и его ETag (count/sum(version)) читаются по индексу, без обращения к таблице
+        Index("ix_students_group_id_version", "group_id", "version"),
+    )
+
+class GroupAgeCount(Base):
+    """
+    Сводная таблица для статистики групп: число студентов каждого возраста в группе.
+    Поддерживается инкрементально мутаторами сервисов при GROUP_STATS_SUMMARY=true.
+    """
+    __tablename__ = "group_age_counts"
+    
+    # 0 — студенты без группы (NULL нельзя использовать в первичном ключе)
+    group_key = Column(Integer, primary_key=True, autoincrement=False)
+    age = Column(Integer, primary_key=True, autoincrement=False)
+    count = Column(Integer, nullable=False, default=0)
+
+class GroupAgeCountState(Base):
+    """
+    Отметка актуальности group_age_counts (одна строка, id = 1). Снимается при старте
+    воркера с GROUP_STATS_SUMMARY=false: такой воркер не обновляет сводную таблицу,
+    и при следующем включении режима ее нужно пересобрать.
+    """
+    __tablename__ = "group_age_counts_state"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    valid = Column(Boolean, nullable=False, default=False)
@@ -1,6 +1,6 @@
 # Assignment3/app/db/schemas.py
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, List, Optional
 
 # --- Базовые модели (Base Models) ---
 
@@ -30,6 +30,7 @@ class StudentCreate(StudentBase):
 class Group(GroupBase):
     """Схема для вывода информации о группе"""
     id: int
+    version: int = 1
     
     class Config:
         # Разрешает чтение данных из ORM объектов (SQLAlchemy моделей)
@@ -39,6 +40,7 @@ class Group(GroupBase):
 class Student(StudentBase):
     """Схема для вывода информации о студенте"""
     id: int
+    version: int = 1
     
     # Вложенная схема для отображения информации о группе
     group: Optional[Group] = None
@@ -46,6 +48,68 @@ class Student(StudentBase):
     class Config:
         from_attributes = True
 
+# --- Модели для постраничного вывода (keyset-пагинация) ---
+
+class StudentPage(BaseModel):
+    """Страница студентов; next_cursor — курсор следующей страницы (None — конец)"""
+    items: List[Student]
+    next_cursor: Optional[str] = None
+    # Заполняется только по запросу (with_total=true): COUNT(*) по большой таблице дорогой
+    total: Optional[int] = None
+
+class GroupPage(BaseModel):
+    """Страница групп; next_cursor — курсор следующей страницы (None — конец)"""
+    items: List[Group]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+# --- Модели для массовых операций ---
+
+class BulkItemError(BaseModel):
+    """Ошибка обработки одного элемента массового запроса"""
+    index: int = Field(..., description="Позиция элемента в запросе (с 0)")
+    error: str
+
+class StudentBulkResult(BaseModel):
+    """Результат POST /students/bulk"""
+    created: int
+    # ID созданных студентов в порядке следования элементов запроса
+    ids: List[int]
+    errors: List[BulkItemError]
+
+class GroupStudentsAssign(BaseModel):
+    """Схема для массового перевода студентов в группу (PUT /groups/{group_id}/students)"""
+    student_ids: List[int] = Field(..., description="ID студентов, переводимых в группу")
+
+class GroupStudentsAssignResult(BaseModel):
+    """Результат массового перевода студентов в группу"""
+    updated: int
+    errors: List[BulkItemError]
+
+# --- Модели статистики групп ---
+
+class AgeStats(BaseModel):
+    """Количество студентов и их возраст (min/avg/max — None для пустой выборки)"""
+    student_count: int
+    min_age: Optional[int] = None
+    avg_age: Optional[float] = None
+    max_age: Optional[int] = None
+
+class GroupStats(AgeStats):
+    """Статистика одной группы"""
+    group_id: int
+    name: str
+
+class GroupStatsDetail(GroupStats):
+    """Статистика группы с распределением по возрасту (возраст -> число студентов)"""
+    age_distribution: Dict[int, int]
+
+class GroupStatsSummary(BaseModel):
+    """Статистика по всем группам и студентам без группы"""
+    groups: List[GroupStats]
+    ungrouped: AgeStats
+    total_students: int
+
 # --- Модель для операций с группами ---
 
 class StudentGroupUpdate(BaseModel):
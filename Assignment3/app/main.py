@@ -1,13 +1,17 @@
 # Assignment3/app/main.py 
 
+import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from .db.database import init_db, engine
-from .db import models
-from .api import students_router, groups_router
+from fastapi import FastAPI, status
+from fastapi.responses import JSONResponse
+from .core.cache import cache
+from .core.config import settings
+from .core.sql_profiler import SQLProfilerMiddleware
+from .db.database import SessionLocal, engine, init_db, check_db_ready, warm_up_pool
+from .services import stats_service, student_service
 
-# Создание всех таблиц в БД при запуске (синхронно, если не используется миграция)
-models.Base.metadata.create_all(bind=engine)
+# Момент импорта приложения — точка отсчета времени холодного старта воркера
+STARTUP_BEGAN = time.perf_counter()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -15,14 +19,37 @@ async def lifespan(app: FastAPI):
     Управление жизненным циклом приложения (замена @app.on_event).
     Запускается при старте, завершается при остановке.
     """
-    # Действия при старте
-    init_db()
-    print("База данных инициализирована.")
+    # Действия при старте: ожидание БД и проверка отметки версии схемы.
+    # Таблицы создаются только если схема изменилась (один воркер под advisory lock).
+    schema_updated = init_db()
+    if settings.GROUP_STATS_SUMMARY:
+        # Пересборка, только если сводная таблица отстала (режим выключался или таблица новая)
+        stats_service.ensure_group_age_counts()
+    else:
+        # Этот воркер не обновляет сводную таблицу: при включении режима ее нужно пересобрать
+        stats_service.mark_group_age_counts_stale()
+    if engine.dialect.name != "postgresql":
+        # Без pg_trgm поиск по ФИО идет по индексу в памяти: строим его до первых запросов
+        with SessionLocal() as db:
+            student_service.ensure_search_index(db)
+    # Прогрев пула этого воркера: первые запросы после деплоя не ждут подключения к БД
+    if settings.DB_MODE == "async":
+        from .db.async_database import warm_up_async_pool
+        warmed = await warm_up_async_pool()
+    else:
+        warmed = warm_up_pool()
+    startup_ms = (time.perf_counter() - STARTUP_BEGAN) * 1000
+    print(
+        f"База данных инициализирована ({'схема обновлена' if schema_updated else 'DDL пропущен'}), "
+        f"пул прогрет: {warmed} соединений, холодный старт: {startup_ms:.0f} мс."
+    )
     
     yield
     
-    # Действия при остановке (если нужно)
-    # print("Приложение останавливается...")
+    # Действия при остановке: закрываем соединения асинхронного пула
+    if settings.DB_MODE == "async":
+        from .db.async_database import async_engine
+        await async_engine.dispose()
 
 app = FastAPI(
     title="Студенческий API",
@@ -31,6 +58,33 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Подключение роутеров
+# Подключение роутеров: синхронные (psycopg2, threadpool) или асинхронные (asyncpg) по DB_MODE
+if settings.DB_MODE == "async":
+    from .api import async_students_router as students_router, async_groups_router as groups_router
+elif settings.DB_MODE == "sync":
+    from .api import students_router, groups_router
+else:
+    raise ValueError(f"Unknown DB_MODE: {settings.DB_MODE}")
+
+# Профиль SQL по запросам (Server-Timing, лог медленных запросов); по умолчанию выключен
+if settings.SQL_PROFILER:
+    app.add_middleware(SQLProfilerMiddleware)
+
 app.include_router(students_router.router, prefix="/students", tags=["Студенты"])
-app.include_router(groups_router.router, prefix="/groups", tags=["Группы"])
\ No newline at end of file
+app.include_router(groups_router.router, prefix="/groups", tags=["Группы"])
+
+# Проверки состояния: liveness (процесс жив) и readiness (БД доступна)
+@app.get("/health/live", include_in_schema=False)
+def health_live():
+    return {"status": "ok"}
+
+@app.get("/health/ready", include_in_schema=False)
+def health_ready():
+    if not check_db_ready():
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"status": "unavailable"})
+    return {"status": "ready"}
+
+# Статистика кэша чтения (доля попаданий, размер, инвалидации)
+@app.get("/cache/stats", include_in_schema=False)
+def cache_stats():
+    return cache.stats()
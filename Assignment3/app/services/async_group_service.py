@@ -0,0 +1,139 @@
+# Assignment3/app/services/async_group_service.py
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple, Union
+from ..db import models
+from ..db import schemas
+from ..core.cache import cache, group_key, group_students_key, student_key
+from ..core.pagination import decode_cursor, encode_cursor
+from .stats_service import AgeCountDeltas, age_count_move, apply_age_count_deltas
+from .group_service import GROUP_ADAPTER, STUDENT_LIST_ADAPTER, GroupOrder, assign_students_to_group_uncached, delete_group_uncached
+from .student_service import DEFAULT_STUDENT_LOAD, StudentLoad, returning_mutations_enabled
+from .async_student_service import with_group_loading
+
+# Асинхронный вариант group_service (DB_MODE=async).
+
+# --- Создать группу ---
+
+async def create_group(db: AsyncSession, group: schemas.GroupCreate) -> models.Group:
+    """Создает новую группу в БД."""
+    db_group = models.Group(name=group.name)
+    db.add(db_group)
+    await db.commit()
+    await cache.adelete(group_key(db_group.id), group_students_key(db_group.id))
+    return db_group
+
+# --- Получить информацию о группе по id ---
+
+async def get_group(db: AsyncSession, group_id: int) -> Optional[models.Group]:
+    """Получает информацию о группе по ее ID."""
+    result = await db.execute(select(models.Group).where(models.Group.id == group_id))
+    return result.scalars().first()
+
+# --- Получить группу через кэш ---
+
+async def get_group_cached(db: AsyncSession, group_id: int) -> Optional[schemas.Group]:
+    """Получает группу из кэша; при промахе читает из БД и кэширует схему ответа."""
+    key = group_key(group_id)
+    group = await cache.aget(key, GROUP_ADAPTER)
+    if group is None:
+        db_group = await get_group(db, group_id)
+        if db_group is None:
+            return None
+        group = schemas.Group.model_validate(db_group)
+        await cache.aset(key, group, GROUP_ADAPTER)
+    return group
+
+# --- Получить список групп ---
+
+async def get_groups(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[models.Group]:
+    """Получает список всех групп."""
+    result = await db.execute(select(models.Group).order_by(models.Group.id).offset(skip).limit(limit))
+    return list(result.scalars().all())
+
+# --- Получить страницу групп (keyset-пагинация) ---
+
+async def get_groups_page(
+    db: AsyncSession,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    order: GroupOrder = "id",
+    with_total: bool = False,
+) -> Tuple[List[models.Group], Optional[str], Optional[int]]:
+    """Получает страницу групп после позиции курсора. Возвращает (группы, next_cursor, total)."""
+    key_column = models.Group.id if order == "id" else models.Group.name
+    query = select(models.Group).order_by(key_column)
+    if cursor:
+        (last_key,) = decode_cursor(cursor, order, [key_column])
+        query = query.where(key_column > last_key)
+
+    groups = list((await db.execute(query.limit(limit + 1))).scalars().all())
+    next_cursor = None
+    if len(groups) > limit:
+        groups = groups[:limit]
+        next_cursor = encode_cursor(order, [getattr(groups[-1], order)])
+
+    total = (await db.execute(select(func.count(models.Group.id)))).scalar() if with_total else None
+    return groups, next_cursor, total
+
+# --- Удалить группу ---
+
+async def delete_group(db: AsyncSession, group_id: int) -> Optional[Union[models.Group, schemas.Group]]:
+    """Удаляет группу и отменяет привязку всех студентов к этой группе."""
+    if returning_mutations_enabled(db.sync_session):
+        group, stale_keys = await db.run_sync(delete_group_uncached, group_id)
+        await cache.adelete(*stale_keys)
+        return group
+    db_group = await get_group(db, group_id)
+    if db_group:
+        # Устанавливаем group_id в NULL для всех студентов этой группы
+        result = await db.execute(
+            update(models.Student)
+            .where(models.Student.group_id == group_id)
+            .values(group_id=None, version=models.Student.version + 1)
+            .returning(models.Student.id, models.Student.age)
+        )
+        released = result.all()
+        student_ids = [student_id for student_id, _ in released]
+        deltas: AgeCountDeltas = AgeCountDeltas()
+        for _, age in released:
+            deltas.update(age_count_move(age, group_id, None))
+        await db.run_sync(apply_age_count_deltas, deltas)
+        # DELETE запросом: db.delete() лениво загрузил бы Group.students, что в AsyncSession недоступно
+        await db.execute(delete(models.Group).where(models.Group.id == group_id))
+        await db.commit()
+        await cache.adelete(group_key(group_id), group_students_key(group_id), *(student_key(sid) for sid in student_ids))
+    return db_group
+
+# --- Массово перевести студентов в группу ---
+
+async def assign_students_to_group(
+    db: AsyncSession, group_id: int, student_ids: List[int]
+) -> Optional[Tuple[int, List[schemas.BulkItemError]]]:
+    """Асинхронный вариант group_service.assign_students_to_group (та же логика через run_sync)."""
+    result, stale_keys = await db.run_sync(assign_students_to_group_uncached, group_id, student_ids)
+    await cache.adelete(*stale_keys)
+    return result
+
+# --- Получить всех студентов в группе ---
+
+async def get_students_in_group(
+    db: AsyncSession, group_id: int, load: StudentLoad = DEFAULT_STUDENT_LOAD
+) -> List[models.Student]:
+    """Получает всех студентов, принадлежащих указанной группе."""
+    query = select(models.Student).where(models.Student.group_id == group_id)
+    result = await db.execute(with_group_loading(query, load))
+    return list(result.scalars().all())
+
+# --- Получить состав группы через кэш ---
+
+async def get_students_in_group_cached(
+    db: AsyncSession, group_id: int, load: StudentLoad = DEFAULT_STUDENT_LOAD, etag: Optional[str] = None
+) -> List[schemas.Student]:
+    """Получает состав группы из кэша; при промахе читает из БД и кэширует список схем."""
+    key = group_students_key(group_id) + (f":{etag}" if etag else "")
+    students = await cache.aget(key, STUDENT_LIST_ADAPTER)
+    if students is None:
+        students = [schemas.Student.model_validate(s) for s in await get_students_in_group(db, group_id, load)]
+        await cache.aset(key, students, STUDENT_LIST_ADAPTER)
+    return students
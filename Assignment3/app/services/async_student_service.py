@@ -0,0 +1,225 @@
+# Assignment3/app/services/async_student_service.py
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.sql import Select
+from ..db import models
+from ..db import schemas
+from ..core.cache import cache, group_key, group_students_key, student_key
+from ..core.pagination import decode_cursor, encode_cursor
+from ..core.search_index import student_search_index
+from .stats_service import age_count_move, apply_age_count_deltas
+from .student_service import (
+    EXPORT_PARTITION_SIZE, ExportFormat, export_header, export_query, format_export_rows,
+)
+from .student_service import DEFAULT_STUDENT_LOAD, GROUP_ADAPTER, STUDENT_ADAPTER, StudentLoad, StudentOrder, bump_group_versions, student_cache_keys
+from .student_service import bulk_create_students_uncached, move_student_uncached, returning_mutations_enabled
+from .student_service import student_row_dicts, student_rows_page, student_rows_page_query, student_rows_query
+from typing import Any, AsyncIterator, List, Optional, Tuple, Union
+
+# Асинхронный вариант student_service (DB_MODE=async).
+
+# --- Стратегия загрузки связанной группы ---
+
+def with_group_loading(query: Select, load: StudentLoad = DEFAULT_STUDENT_LOAD) -> Select:
+    """
+    Добавляет к запросу студентов загрузку Student.group.
+    Ленивая загрузка в AsyncSession невозможна (нет неявного I/O), поэтому lazy -> selectin.
+    """
+    if load == "joined":
+        return query.options(joinedload(models.Student.group))
+    return query.options(selectinload(models.Student.group))
+
+# --- Создать студента ---
+
+async def create_student(db: AsyncSession, student: schemas.StudentCreate) -> models.Student:
+    """Создает нового студента в БД."""
+    db_student = models.Student(fio=student.fio, age=student.age, group_id=student.group_id)
+    db.add(db_student)
+    await db.run_sync(apply_age_count_deltas, {(student.group_id, student.age): 1})
+    await db.run_sync(bump_group_versions, [student.group_id])
+    await db.commit()
+    if db_student.group_id is not None:
+        await cache.adelete(group_key(db_student.group_id), group_students_key(db_student.group_id))
+    student_search_index.add(db_student.id, db_student.fio)
+    # Перечитываем вместе с группой: после commit связь не загружена
+    return await get_student(db, db_student.id)
+
+# --- Массово создать студентов ---
+
+async def bulk_create_students(
+    db: AsyncSession, batch: List[Tuple[int, Any]]
+) -> Tuple[List[int], List[schemas.BulkItemError]]:
+    """Асинхронный вариант student_service.bulk_create_students (та же логика пачки через run_sync)."""
+    ids, errors, stale_keys = await db.run_sync(bulk_create_students_uncached, batch)
+    await cache.adelete(*stale_keys)
+    return ids, errors
+
+# --- Получить информацию о студенте по его id ---
+
+async def get_student(
+    db: AsyncSession, student_id: int, load: StudentLoad = DEFAULT_STUDENT_LOAD
+) -> Optional[models.Student]:
+    """Получает информацию о студенте по его ID."""
+    query = select(models.Student).where(models.Student.id == student_id)
+    result = await db.execute(with_group_loading(query, load).execution_options(populate_existing=True))
+    return result.scalars().first()
+
+# --- Получить студента через кэш ---
+
+async def get_student_cached(db: AsyncSession, student_id: int) -> Optional[schemas.Student]:
+    """Получает студента из кэша; при промахе читает из БД и кэширует схему ответа (как student_service)."""
+    student = await cache.aget(student_key(student_id), STUDENT_ADAPTER)
+    if student is not None and student.group_id is not None:
+        group = await cache.aget(group_key(student.group_id), GROUP_ADAPTER)
+        if group is None:
+            db_group = await db.get(models.Group, student.group_id)
+            group = schemas.Group.model_validate(db_group) if db_group is not None else None
+            if group is not None:
+                await cache.aset(group_key(group.id), group, GROUP_ADAPTER)
+        # Группа уже удалена: запись студента устарела, читаем его заново
+        student = student.model_copy(update={"group": group}) if group is not None else None
+    if student is None:
+        db_student = await get_student(db, student_id)
+        if db_student is None:
+            return None
+        student = schemas.Student.model_validate(db_student)
+        await cache.aset(student_key(student_id), student.model_copy(update={"group": None}), STUDENT_ADAPTER)
+        if student.group is not None:
+            await cache.aset(group_key(student.group.id), student.group, GROUP_ADAPTER)
+    return student
+
+# --- Получить список студентов ---
+
+async def get_students(
+    db: AsyncSession, skip: int = 0, limit: int = 100, load: StudentLoad = DEFAULT_STUDENT_LOAD
+) -> List[models.Student]:
+    """Получает список всех студентов."""
+    query = select(models.Student).order_by(models.Student.id).offset(skip).limit(limit)
+    result = await db.execute(with_group_loading(query, load))
+    return list(result.scalars().all())
+
+# --- Получить страницу студентов (keyset-пагинация) ---
+
+async def get_students_page(
+    db: AsyncSession,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    order: StudentOrder = "id",
+    load: StudentLoad = DEFAULT_STUDENT_LOAD,
+    with_total: bool = False,
+) -> Tuple[List[models.Student], Optional[str], Optional[int]]:
+    """Получает страницу студентов после позиции курсора. Возвращает (студенты, next_cursor, total)."""
+    key_columns = [models.Student.id] if order == "id" else [models.Student.fio, models.Student.id]
+    query = select(models.Student).order_by(*key_columns)
+    if cursor:
+        last_key = decode_cursor(cursor, order, key_columns)
+        query = query.where(tuple_(*key_columns) > tuple_(*last_key))
+
+    result = await db.execute(with_group_loading(query.limit(limit + 1), load))
+    students = list(result.scalars().all())
+    next_cursor = None
+    if len(students) > limit:
+        students = students[:limit]
+        last = students[-1]
+        next_cursor = encode_cursor(order, [last.id] if order == "id" else [last.fio, last.id])
+
+    total = (await db.execute(select(func.count(models.Student.id)))).scalar() if with_total else None
+    return students, next_cursor, total
+
+# --- Быстрый путь списка студентов (LIST_FAST_PATH=true) ---
+
+async def get_student_rows(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[dict]:
+    """Список студентов для быстрого пути (без ORM-объектов и валидации)."""
+    result = await db.execute(student_rows_query(skip, limit))
+    return student_row_dicts(result.all())
+
+async def get_student_rows_page(
+    db: AsyncSession, limit: int = 100, cursor: Optional[str] = None, order: StudentOrder = "id", with_total: bool = False
+) -> dict:
+    """Страница студентов для быстрого пути (keyset-пагинация, как get_students_page)."""
+    rows = (await db.execute(student_rows_page_query(limit, cursor, order))).all()
+    total = (await db.execute(select(func.count(models.Student.id)))).scalar() if with_total else None
+    return student_rows_page(rows, limit, order, total)
+
+# --- Потоковая выгрузка студентов ---
+
+async def iter_students_export(bind: AsyncEngine, fmt: ExportFormat = "ndjson") -> AsyncIterator[str]:
+    """Асинхронный вариант student_service.iter_students_export (серверный курсор asyncpg)."""
+    header = export_header(fmt)
+    if header:
+        yield header
+    async with bind.connect() as conn:
+        result = await conn.stream(export_query().execution_options(yield_per=EXPORT_PARTITION_SIZE))
+        async for partition in result.partitions():
+            yield format_export_rows(partition, fmt)
+
+# --- Удалить студента ---
+
+async def delete_student(db: AsyncSession, student_id: int) -> Optional[models.Student]:
+    """Удаляет студента."""
+    db_student = await get_student(db, student_id)
+    if db_student:
+        await db.delete(db_student)
+        await db.run_sync(apply_age_count_deltas, {(db_student.group_id, db_student.age): -1})
+        await db.run_sync(bump_group_versions, [db_student.group_id])
+        await db.commit()
+        await cache.adelete(*student_cache_keys(student_id, db_student.group_id))
+        student_search_index.remove(student_id)
+    return db_student
+
+# --- Перевод студента одной командой (MUTATION_MODE=returning) ---
+
+async def move_student(db: AsyncSession, student_id: int, group_id: Optional[int]) -> Optional[schemas.Student]:
+    """Асинхронный вариант student_service.move_student."""
+    student, stale_keys = await db.run_sync(move_student_uncached, student_id, group_id)
+    await cache.adelete(*stale_keys)
+    return student
+
+# --- Добавить студента в группу ---
+
+async def add_student_to_group(
+    db: AsyncSession, student_id: int, group_id: int
+) -> Optional[Union[models.Student, schemas.Student]]:
+    """Привязывает студента к указанной группе."""
+    if returning_mutations_enabled(db.sync_session):
+        return await move_student(db, student_id, group_id)
+    db_student = await get_student(db, student_id)
+    if db_student:
+        old_group_id = db_student.group_id
+        db_student.group_id = group_id
+        db_student.version = models.Student.version + 1
+        await db.run_sync(apply_age_count_deltas, age_count_move(db_student.age, old_group_id, group_id))
+        await db.run_sync(bump_group_versions, [old_group_id, group_id])
+        await db.commit()
+        await cache.adelete(*student_cache_keys(student_id, old_group_id, group_id))
+        db_student = await get_student(db, student_id)
+    return db_student
+
+# --- Удалить студента из группы ---
+
+async def remove_student_from_group(
+    db: AsyncSession, student_id: int
+) -> Optional[Union[models.Student, schemas.Student]]:
+    """Удаляет студента из группы (устанавливает group_id в NULL)."""
+    if returning_mutations_enabled(db.sync_session):
+        return await move_student(db, student_id, None)
+    db_student = await get_student(db, student_id)
+    if db_student:
+        old_group_id = db_student.group_id
+        db_student.group_id = None
+        db_student.version = models.Student.version + 1
+        await db.run_sync(apply_age_count_deltas, age_count_move(db_student.age, old_group_id, None))
+        await db.run_sync(bump_group_versions, [old_group_id])
+        await db.commit()
+        await cache.adelete(*student_cache_keys(student_id, old_group_id))
+        db_student = await get_student(db, student_id)
+    return db_student
+
+# --- Перевести студента из группы A в группу B ---
+
+async def transfer_student(
+    db: AsyncSession, student_id: int, new_group_id: int
+) -> Optional[Union[models.Student, schemas.Student]]:
+    """Переводит студента из текущей группы в новую."""
+    return await add_student_to_group(db, student_id, new_group_id)
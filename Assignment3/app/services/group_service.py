@@ -1,8 +1,19 @@
 # Assignment3/app/services/group_service.py
+from pydantic import TypeAdapter
+from sqlalchemy import delete, func, select, true, update
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.sql import Select
+from typing import List, Literal, Optional, Tuple, Union
 from ..db import models
 from ..db import schemas
+from ..core.cache import cache, group_key, group_students_key, student_key
+from ..core.etag import roster_etag
+from .stats_service import AgeCountDeltas, age_count_move, apply_age_count_deltas
+from ..core.pagination import decode_cursor, encode_cursor
+from .student_service import (
+    DEFAULT_STUDENT_LOAD, GROUP_ADAPTER, StudentLoad, bump_group_versions, returning_mutations_enabled,
+    with_group_loading,
+)
 
 # --- Создать группу ---
 
@@ -12,6 +23,8 @@ def create_group(db: Session, group: schemas.GroupCreate) -> models.Group:
     db.add(db_group)
     db.commit()
     db.refresh(db_group)
+    # Пустой состав мог быть закэширован до создания группы с этим id
+    cache.delete(group_key(db_group.id), group_students_key(db_group.id))
     return db_group
 
 # --- Получить информацию о группе по id ---
@@ -20,28 +33,229 @@ def get_group(db: Session, group_id: int) -> Optional[models.Group]:
     """Получает информацию о группе по ее ID."""
     return db.query(models.Group).filter(models.Group.id == group_id).first()
 
+# --- Получить группу через кэш ---
+
+def get_group_cached(db: Session, group_id: int) -> Optional[schemas.Group]:
+    """Получает группу из кэша; при промахе читает из БД и кэширует схему ответа."""
+    key = group_key(group_id)
+    group = cache.get(key, GROUP_ADAPTER)
+    if group is None:
+        db_group = get_group(db, group_id)
+        if db_group is None:
+            return None
+        group = schemas.Group.model_validate(db_group)
+        cache.set(key, group, GROUP_ADAPTER)
+    return group
+
 # --- Получить список групп ---
 
 def get_groups(db: Session, skip: int = 0, limit: int = 100) -> List[models.Group]:
     """Получает список всех групп."""
-    return db.query(models.Group).offset(skip).limit(limit).all()
+    return db.query(models.Group).order_by(models.Group.id).offset(skip).limit(limit).all()
+
+# --- Получить страницу групп (keyset-пагинация) ---
+
+# Порядок сортировки для курсорной пагинации: по id или по уникальному названию
+GroupOrder = Literal["id", "name"]
+
+def get_groups_page(
+    db: Session,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    order: GroupOrder = "id",
+    with_total: bool = False,
+) -> Tuple[List[models.Group], Optional[str], Optional[int]]:
+    """Получает страницу групп после позиции курсора. Возвращает (группы, next_cursor, total)."""
+    key_column = models.Group.id if order == "id" else models.Group.name
+    query = db.query(models.Group).order_by(key_column)
+    if cursor:
+        (last_key,) = decode_cursor(cursor, order, [key_column])
+        query = query.filter(key_column > last_key)
+
+    groups = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(groups) > limit:
+        groups = groups[:limit]
+        next_cursor = encode_cursor(order, [getattr(groups[-1], order)])
+
+    total = db.query(func.count(models.Group.id)).scalar() if with_total else None
+    return groups, next_cursor, total
 
 # --- Удалить группу ---
 
-def delete_group(db: Session, group_id: int) -> Optional[models.Group]:
+def delete_group(db: Session, group_id: int) -> Optional[Union[models.Group, schemas.Group]]:
     """Удаляет группу и отменяет привязку всех студентов к этой группе."""
+    if returning_mutations_enabled(db):
+        return delete_group_returning(db, group_id)
     db_group = get_group(db, group_id)
     if db_group:
         # Устанавливаем group_id в NULL для всех студентов этой группы
-        db.query(models.Student).filter(models.Student.group_id == group_id).update({"group_id": None})
+        statement = (
+            update(models.Student)
+            .where(models.Student.group_id == group_id)
+            .values(group_id=None, version=models.Student.version + 1)
+            .returning(models.Student.id, models.Student.age)
+        )
+        released = db.execute(statement).all()
+        student_ids = [student_id for student_id, _ in released]
+        deltas: AgeCountDeltas = AgeCountDeltas()
+        for _, age in released:
+            deltas.update(age_count_move(age, group_id, None))
+        apply_age_count_deltas(db, deltas)
         
         db.delete(db_group)
         db.commit()
+        # У бывших студентов группы в кэше осталась вложенная группа
+        cache.delete(group_key(group_id), group_students_key(group_id), *(student_key(sid) for sid in student_ids))
     return db_group
 
+def delete_group_statement(group_id: int) -> Select:
+    """
+    Одна команда PostgreSQL (MUTATION_MODE=returning): отвязывает студентов группы
+    с увеличением их версий и удаляет саму группу. Строки результата — (id, name, version)
+    группы и (student_id, age) каждого отвязанного студента (NULL, если студентов нет).
+    Пустой результат — группа не найдена.
+    """
+    student, group = models.Student, models.Group
+    released = (
+        update(student)
+        .where(student.group_id == group_id)
+        .values(group_id=None, version=student.version + 1)
+        .returning(student.id.label("student_id"), student.age)
+        .cte("released")
+    )
+    # Внешний ключ проверяется в конце команды, когда студенты уже отвязаны
+    deleted = delete(group).where(group.id == group_id).returning(group.id, group.name, group.version).cte("deleted")
+    return select(deleted, released).select_from(deleted).outerjoin(released, true())
+
+def delete_group_uncached(db: Session, group_id: int) -> Tuple[Optional[schemas.Group], List[str]]:
+    """
+    Удаляет группу одной командой и фиксирует транзакцию, не трогая кэш.
+    Возвращает (группа или None, устаревшие ключи кэша), как move_student_uncached.
+    """
+    rows = db.execute(delete_group_statement(group_id)).all()
+    if not rows:
+        return None, []
+    student_ids = [row.student_id for row in rows if row.student_id is not None]
+    deltas: AgeCountDeltas = AgeCountDeltas()
+    for row in rows:
+        if row.student_id is not None:
+            deltas.update(age_count_move(row.age, group_id, None))
+    apply_age_count_deltas(db, deltas)
+    db.commit()
+    group = schemas.Group(id=rows[0].id, name=rows[0].name, version=rows[0].version)
+    return group, [group_key(group_id), group_students_key(group_id), *(student_key(sid) for sid in student_ids)]
+
+def delete_group_returning(db: Session, group_id: int) -> Optional[schemas.Group]:
+    """Удаляет группу одной командой; None — группа не найдена."""
+    group, stale_keys = delete_group_uncached(db, group_id)
+    cache.delete(*stale_keys)
+    return group
+
+# --- Массово перевести студентов в группу ---
+
+# Максимум ID в одной команде UPDATE (лимит параметров: SQLite — 32766, PostgreSQL — 65535)
+ASSIGN_CHUNK_SIZE = 30000
+
+def assign_students_to_group_uncached(
+    db: Session, group_id: int, student_ids: List[int]
+) -> Tuple[Optional[Tuple[int, List[schemas.BulkItemError]]], List[str]]:
+    """
+    Переводит студентов в группу командой UPDATE ... WHERE id IN (...) RETURNING id
+    (одна команда на каждые ASSIGN_CHUNK_SIZE ID) в одной транзакции, не трогая кэш.
+    Возвращает ((число переведенных, ошибки по элементам) или None, если группа
+    не найдена; устаревшие ключи кэша).
+    """
+    if get_group(db, group_id) is None:
+        return None, []
+
+    # Повторы ID не считаются ошибкой: перевод идемпотентен
+    unique_ids = list(dict.fromkeys(student_ids))
+    updated = set()
+    old_group_ids = set()
+    deltas: AgeCountDeltas = AgeCountDeltas()
+    for offset in range(0, len(unique_ids), ASSIGN_CHUNK_SIZE):
+        chunk = unique_ids[offset:offset + ASSIGN_CHUNK_SIZE]
+        # Прежние группы нужны для инвалидации их составов в кэше и для сводной статистики
+        previous = db.execute(
+            select(models.Student.group_id, models.Student.age, func.count(models.Student.id))
+            .where(models.Student.id.in_(chunk))
+            .group_by(models.Student.group_id, models.Student.age)
+        )
+        for old_group_id, age, count in previous:
+            old_group_ids.add(old_group_id)
+            deltas.update(age_count_move(age, old_group_id, group_id, count))
+        statement = (
+            update(models.Student)
+            .where(models.Student.id.in_(chunk))
+            .values(group_id=group_id, version=models.Student.version + 1)
+            .returning(models.Student.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated.update(db.scalars(statement))
+    apply_age_count_deltas(db, deltas)
+    bump_group_versions(db, old_group_ids | {group_id})
+    db.commit()
+    old_group_ids.discard(None)
+    stale_keys = [
+        *(student_key(student_id) for student_id in updated),
+        *(key for gid in old_group_ids | {group_id} for key in (group_key(gid), group_students_key(gid))),
+    ]
+
+    errors = [
+        schemas.BulkItemError(index=index, error="Студент не найден")
+        for index, student_id in enumerate(student_ids) if student_id not in updated
+    ]
+    return (len(updated), errors), stale_keys
+
+def assign_students_to_group(
+    db: Session, group_id: int, student_ids: List[int]
+) -> Optional[Tuple[int, List[schemas.BulkItemError]]]:
+    """Как assign_students_to_group_uncached, но сразу инвалидирует кэш."""
+    result, stale_keys = assign_students_to_group_uncached(db, group_id, student_ids)
+    cache.delete(*stale_keys)
+    return result
+
 # --- Получить всех студентов в группе ---
 
-def get_students_in_group(db: Session, group_id: int) -> List[models.Student]:
+def get_students_in_group(
+    db: Session, group_id: int, load: StudentLoad = DEFAULT_STUDENT_LOAD
+) -> List[models.Student]:
     """Получает всех студентов, принадлежащих указанной группе."""
-    # Используем Eager Loading для загрузки информации о студентах
-    return db.query(models.Student).filter(models.Student.group_id == group_id).all()
\ No newline at end of file
+    # Используем Eager Loading, чтобы сериализация не делала запрос группы на каждого студента
+    query = db.query(models.Student).filter(models.Student.group_id == group_id)
+    return with_group_loading(query, load).all()
+
+# --- Получить состав группы через кэш ---
+
+STUDENT_LIST_ADAPTER = TypeAdapter(List[schemas.Student])
+
+def get_students_in_group_cached(
+    db: Session, group_id: int, load: StudentLoad = DEFAULT_STUDENT_LOAD, etag: Optional[str] = None
+) -> List[schemas.Student]:
+    """
+    Получает состав группы из кэша; при промахе читает из БД и кэширует список схем.
+    С etag запись кэша привязана к версии состава и не может разойтись с ETag ответа.
+    """
+    key = group_students_key(group_id) + (f":{etag}" if etag else "")
+    students = cache.get(key, STUDENT_LIST_ADAPTER)
+    if students is None:
+        students = [schemas.Student.model_validate(s) for s in get_students_in_group(db, group_id, load)]
+        cache.set(key, students, STUDENT_LIST_ADAPTER)
+    return students
+
+# --- ETag состава группы ---
+
+def get_roster_etag(db: Session, group_id: int) -> Optional[str]:
+    """
+    ETag состава группы одним агрегирующим запросом (версия группы, число студентов,
+    сумма их версий) — без загрузки строк. None, если группа не найдена.
+    """
+    row = db.execute(
+        select(models.Group.version, func.count(models.Student.id), func.coalesce(func.sum(models.Student.version), 0))
+        .select_from(models.Group)
+        .outerjoin(models.Student, models.Student.group_id == models.Group.id)
+        .where(models.Group.id == group_id)
+        .group_by(models.Group.id, models.Group.version)
+    ).first()
+    return roster_etag(group_id, *row) if row else None
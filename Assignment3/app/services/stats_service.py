@@ -0,0 +1,194 @@
+# Assignment3/app/services/stats_service.py
+from collections import Counter
+from typing import Dict, Optional, Tuple
+from sqlalchemy import delete, func, insert, null, select, text, union_all, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..db import models
+from ..db import schemas
+from ..db.database import engine
+
+# --- Статистика групп ---
+# Режим по умолчанию — один запрос с GROUP BY students.group_id.
+# При GROUP_STATS_SUMMARY=true чтение идет из сводной таблицы group_age_counts
+# (строк не больше, чем групп x различных возрастов), которую мутаторы сервисов
+# обновляют в той же транзакции через apply_age_count_deltas. Пересборка из students
+# выполняется при старте, только если отметка group_age_counts_state снята.
+
+# group_key студентов без группы в сводной таблице
+UNGROUPED_KEY = 0
+
+# Ключ advisory lock PostgreSQL: мутаторы берут его разделяемо, пересборка — монопольно
+STATS_LOCK_KEY = 3_003_017
+
+# Изменения сводной таблицы: (group_id или None, возраст) -> прирост числа студентов
+AgeCountDeltas = Counter
+
+def age_count_move(age: int, old_group_id: Optional[int], new_group_id: Optional[int], count: int = 1) -> AgeCountDeltas:
+    """Изменения сводной таблицы при переводе count студентов возраста age между группами."""
+    deltas: AgeCountDeltas = Counter()
+    deltas[(old_group_id, age)] -= count
+    deltas[(new_group_id, age)] += count
+    return deltas
+
+def apply_age_count_deltas(db: Session, deltas: Dict[Tuple[Optional[int], int], int]) -> None:
+    """
+    Применяет изменения к group_age_counts одной командой INSERT ... ON CONFLICT DO UPDATE.
+    Выполняется в текущей транзакции сессии; без GROUP_STATS_SUMMARY ничего не делает.
+    """
+    if not settings.GROUP_STATS_SUMMARY:
+        return
+    # Сортировка по ключу — одинаковый порядок блокировок строк в конкурентных транзакциях
+    rows = [
+        {"group_key": UNGROUPED_KEY if group_id is None else group_id, "age": age, "count": delta}
+        for (group_id, age), delta in sorted(deltas.items(), key=lambda item: (item[0][0] or 0, item[0][1]))
+        if delta
+    ]
+    if not rows:
+        return
+    is_postgres = db.get_bind().dialect.name == "postgresql"
+    if is_postgres:
+        # Пересборка ждет фиксации уже примененных изменений, а новые ждут конца пересборки
+        db.execute(text("SELECT pg_advisory_xact_lock_shared(:key)"), {"key": STATS_LOCK_KEY})
+    dialect_insert = postgresql.insert if is_postgres else sqlite.insert
+    statement = dialect_insert(models.GroupAgeCount)
+    statement = statement.on_conflict_do_update(
+        index_elements=[models.GroupAgeCount.group_key, models.GroupAgeCount.age],
+        set_={"count": models.GroupAgeCount.count + statement.excluded.count},
+    )
+    db.execute(statement, rows)
+
+def _group_age_counts_valid(conn) -> bool:
+    state = models.GroupAgeCountState
+    return bool(conn.execute(select(state.valid).where(state.id == 1)).scalar())
+
+def mark_group_age_counts_stale() -> None:
+    """Снимает отметку актуальности (при старте с GROUP_STATS_SUMMARY=false)."""
+    state = models.GroupAgeCountState
+    with engine.begin() as conn:
+        conn.execute(update(state).where(state.id == 1, state.valid.is_(True)).values(valid=False))
+
+def ensure_group_age_counts() -> bool:
+    """
+    Пересчитывает сводную таблицу по students, если она не поддерживалась
+    (новая таблица или воркеры с выключенным режимом). Обычный старт стоит одного SELECT.
+    Возвращает True, если таблица пересобиралась.
+    """
+    with engine.begin() as conn:
+        if _group_age_counts_valid(conn):
+            return False
+
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            # Монопольно: ждет транзакции мутаторов с разделяемой блокировкой
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": STATS_LOCK_KEY})
+        # Другой воркер мог пересобрать таблицу, пока этот ждал блокировку
+        if _group_age_counts_valid(conn):
+            return False
+        conn.execute(delete(models.GroupAgeCount))
+        conn.execute(insert(models.GroupAgeCount).from_select(
+            ["group_key", "age", "count"],
+            select(
+                func.coalesce(models.Student.group_id, UNGROUPED_KEY),
+                models.Student.age,
+                func.count(models.Student.id),
+            ).group_by(models.Student.group_id, models.Student.age),
+        ))
+        conn.execute(delete(models.GroupAgeCountState))
+        conn.execute(insert(models.GroupAgeCountState).values(id=1, valid=True))
+    return True
+
+def _aggregate():
+    """Подзапрос: одна строка на группу (group_key NULL — без группы) с count/min/avg/max."""
+    if settings.GROUP_STATS_SUMMARY:
+        summary = models.GroupAgeCount
+        total = func.sum(summary.count)
+        return (
+            select(
+                func.nullif(summary.group_key, UNGROUPED_KEY).label("group_key"),
+                total.label("student_count"),
+                func.min(summary.age).label("min_age"),
+                (func.sum(summary.age * summary.count) * 1.0 / total).label("avg_age"),
+                func.max(summary.age).label("max_age"),
+            )
+            .where(summary.count > 0)
+            .group_by(summary.group_key)
+            .cte("group_agg")
+        )
+    student = models.Student
+    return (
+        select(
+            student.group_id.label("group_key"),
+            func.count(student.id).label("student_count"),
+            func.min(student.age).label("min_age"),
+            func.avg(student.age).label("avg_age"),
+            func.max(student.age).label("max_age"),
+        )
+        .group_by(student.group_id)
+        .cte("group_agg")
+    )
+
+def _age_stats(student_count, min_age, avg_age, max_age) -> dict:
+    return {
+        "student_count": int(student_count or 0),
+        "min_age": min_age,
+        "avg_age": round(float(avg_age), 2) if avg_age is not None else None,
+        "max_age": max_age,
+    }
+
+def get_group_stats_summary(db: Session) -> schemas.GroupStatsSummary:
+    """Статистика всех групп и студентов без группы одним запросом (группы без студентов — с нулями)."""
+    agg = _aggregate()
+    grouped = (
+        select(
+            models.Group.id, models.Group.name, agg.c.student_count, agg.c.min_age, agg.c.avg_age, agg.c.max_age
+        )
+        .select_from(models.Group)
+        .outerjoin(agg, agg.c.group_key == models.Group.id)
+    )
+    ungrouped = select(
+        null(), null(), agg.c.student_count, agg.c.min_age, agg.c.avg_age, agg.c.max_age
+    ).where(agg.c.group_key.is_(None))
+
+    groups = []
+    ungrouped_stats = _age_stats(0, None, None, None)
+    for group_id, name, *stats in db.execute(union_all(grouped, ungrouped)):
+        if group_id is None:
+            ungrouped_stats = _age_stats(*stats)
+        else:
+            groups.append(schemas.GroupStats(group_id=group_id, name=name, **_age_stats(*stats)))
+    groups.sort(key=lambda group: group.group_id)
+
+    return schemas.GroupStatsSummary(
+        groups=groups,
+        ungrouped=schemas.AgeStats(**ungrouped_stats),
+        total_students=sum(group.student_count for group in groups) + ungrouped_stats["student_count"],
+    )
+
+def get_group_stats(db: Session, group_id: int) -> Optional[schemas.GroupStatsDetail]:
+    """Статистика одной группы с распределением по возрасту или None, если группа не найдена."""
+    group = db.execute(select(models.Group.id, models.Group.name).where(models.Group.id == group_id)).first()
+    if group is None:
+        return None
+
+    if settings.GROUP_STATS_SUMMARY:
+        summary = models.GroupAgeCount
+        query = select(summary.age, summary.count).where(summary.group_key == group_id, summary.count > 0)
+    else:
+        student = models.Student
+        query = select(student.age, func.count(student.id)).where(student.group_id == group_id).group_by(student.age)
+    distribution = dict(sorted(db.execute(query).tuples()))
+
+    total = sum(distribution.values())
+    return schemas.GroupStatsDetail(
+        group_id=group.id,
+        name=group.name,
+        age_distribution=distribution,
+        **_age_stats(
+            total,
+            min(distribution) if distribution else None,
+            sum(age * count for age, count in distribution.items()) / total if total else None,
+            max(distribution) if distribution else None,
+        ),
+    )
@@ -1,8 +1,36 @@
 # Assignment3/app/services/student_service.py
-from sqlalchemy.orm import Session
+import io
+import csv
+import json
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import func, insert, or_, select, tuple_, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query, Session, joinedload, selectinload
+from sqlalchemy.sql import Select
 from ..db import models
 from ..db import schemas
-from typing import List, Optional
+from ..core.config import settings
+from ..core.cache import cache, group_key, group_students_key, student_key
+from ..core.pagination import decode_cursor, encode_cursor
+from ..core.search_index import student_search_index
+from .stats_service import age_count_move, apply_age_count_deltas
+from collections import Counter, defaultdict, deque
+from typing import Any, Iterable, Iterator, List, Literal, Optional, Tuple, Union
+
+# --- Стратегии загрузки связанной группы ---
+# joined   — один запрос с LEFT OUTER JOIN groups (по умолчанию);
+# selectin — два запроса: студенты + SELECT ... WHERE groups.id IN (...);
+# lazy     — группа подгружается отдельным запросом на каждого студента (N+1).
+StudentLoad = Literal["joined", "selectin", "lazy"]
+DEFAULT_STUDENT_LOAD: StudentLoad = "joined"
+
+def with_group_loading(query: Query, load: StudentLoad = DEFAULT_STUDENT_LOAD) -> Query:
+    """Добавляет к запросу студентов выбранную стратегию загрузки Student.group."""
+    if load == "joined":
+        return query.options(joinedload(models.Student.group))
+    if load == "selectin":
+        return query.options(selectinload(models.Student.group))
+    return query
 
 # --- Создать студента ---
 
@@ -10,22 +38,352 @@ def create_student(db: Session, student: schemas.StudentCreate) -> models.Studen
     """Создает нового студента в БД."""
     db_student = models.Student(fio=student.fio, age=student.age, group_id=student.group_id)
     db.add(db_student)
+    apply_age_count_deltas(db, {(student.group_id, student.age): 1})
+    bump_group_versions(db, [student.group_id])
     db.commit()
     db.refresh(db_student)
+    if db_student.group_id is not None:
+        cache.delete(group_key(db_student.group_id), group_students_key(db_student.group_id))
+    student_search_index.add(db_student.id, db_student.fio)
     return db_student
 
+# --- Массовое создание студентов ---
+
+# Размер пачки для многострочной вставки (3 параметра на строку)
+BULK_BATCH_SIZE = 1000
+
+def insert_students_returning_ids(db: Session, rows: List[dict]) -> List[int]:
+    """
+    Вставляет строки одной командой и возвращает их ID в порядке rows.
+    PostgreSQL: insertmanyvalues с sort_by_parameter_order — многострочный INSERT ... RETURNING
+    с упорядочиванием по параметрам. В SQLite такое упорядочивание SQLAlchemy выполняет
+    отдельным INSERT на каждую строку, а порядок строк RETURNING не гарантирован, поэтому
+    там одна команда INSERT ... VALUES (...), (...) возвращает ID вместе с полями, и ID
+    сопоставляются строкам по содержимому (одинаковые строки взаимозаменяемы).
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        statement = insert(models.Student).returning(models.Student.id, sort_by_parameter_order=True)
+        return list(db.scalars(statement, rows))
+
+    columns = (models.Student.fio, models.Student.age, models.Student.group_id)
+    ids_by_row = defaultdict(list)
+    for student_id, *values in db.execute(insert(models.Student).values(rows).returning(models.Student.id, *columns)):
+        ids_by_row[tuple(values)].append(student_id)
+    queues = {values: deque(sorted(ids)) for values, ids in ids_by_row.items()}
+    return [queues[(row["fio"], row["age"], row["group_id"])].popleft() for row in rows]
+
+def bulk_create_students_uncached(
+    db: Session, batch: List[Tuple[int, Any]]
+) -> Tuple[List[int], List[schemas.BulkItemError], List[str]]:
+    """
+    Валидирует и вставляет пачку (индекс, элемент) одной многострочной командой INSERT ... RETURNING
+    (см. insert_students_returning_ids). Commit не выполняет: вызывающий код фиксирует
+    транзакцию после последней пачки.
+    Возвращает (ID созданных студентов по порядку, ошибки по элементам, устаревшие ключи кэша).
+    """
+    errors: List[schemas.BulkItemError] = []
+    valid: List[Tuple[int, schemas.StudentCreate]] = []
+    for index, raw in batch:
+        try:
+            valid.append((index, schemas.StudentCreate.model_validate(raw)))
+        except ValidationError as e:
+            errors.append(schemas.BulkItemError(index=index, error=e.errors(include_url=False)[0]["msg"]))
+
+    # Существование групп проверяется одним запросом на пачку
+    group_ids = {student.group_id for _, student in valid if student.group_id is not None}
+    existing = set(db.scalars(select(models.Group.id).where(models.Group.id.in_(group_ids)))) if group_ids else set()
+    rows = []
+    for index, student in valid:
+        if student.group_id is not None and student.group_id not in existing:
+            errors.append(schemas.BulkItemError(index=index, error="Группа не найдена"))
+            continue
+        rows.append({"fio": student.fio, "age": student.age, "group_id": student.group_id})
+
+    ids: List[int] = []
+    stale_keys: List[str] = []
+    if rows:
+        ids = insert_students_returning_ids(db, rows)
+        apply_age_count_deltas(db, Counter((row["group_id"], row["age"]) for row in rows))
+        # До commit: при откате лишние ID отсеются при загрузке результатов поиска
+        for student_id, row in zip(ids, rows):
+            student_search_index.add(student_id, row["fio"])
+        # Составы групп устаревают сразу, до commit; гонку с чтением ограничивает TTL кэша
+        touched = {row["group_id"] for row in rows if row["group_id"] is not None}
+        bump_group_versions(db, touched)
+        stale_keys = [key for group_id in touched for key in (group_key(group_id), group_students_key(group_id))]
+    errors.sort(key=lambda error: error.index)
+    return ids, errors, stale_keys
+
+def bulk_create_students(
+    db: Session, batch: List[Tuple[int, Any]]
+) -> Tuple[List[int], List[schemas.BulkItemError]]:
+    """Как bulk_create_students_uncached, но сразу инвалидирует кэш. Возвращает (ID, ошибки)."""
+    ids, errors, stale_keys = bulk_create_students_uncached(db, batch)
+    cache.delete(*stale_keys)
+    return ids, errors
+
 # --- Получить информацию о студенте по его id ---
 
-def get_student(db: Session, student_id: int) -> Optional[models.Student]:
+def get_student(
+    db: Session, student_id: int, load: StudentLoad = DEFAULT_STUDENT_LOAD
+) -> Optional[models.Student]:
     """Получает информацию о студенте по его ID."""
     # Используем .first() для получения одной записи
-    return db.query(models.Student).filter(models.Student.id == student_id).first()
+    query = db.query(models.Student).filter(models.Student.id == student_id)
+    return with_group_loading(query, load).first()
+
+# --- Получить студента через кэш ---
+# Запись student:{id} хранит только поля студента (group=None), а вложенная группа
+# берется из записи group:{id}. Версия группы растет при любом изменении ее состава,
+# и каждый такой мутатор инвалидирует group:{id}; если бы группа хранилась внутри
+# записи студента, она устаревала бы у всех остальных участников группы.
+
+STUDENT_ADAPTER = TypeAdapter(schemas.Student)
+GROUP_ADAPTER = TypeAdapter(schemas.Group)
+
+def cache_student(student: schemas.Student) -> None:
+    """Кэширует студента без группы и, отдельно, его группу."""
+    cache.set(student_key(student.id), student.model_copy(update={"group": None}), STUDENT_ADAPTER)
+    if student.group is not None:
+        cache.set(group_key(student.group.id), student.group, GROUP_ADAPTER)
+
+def get_student_cached(db: Session, student_id: int) -> Optional[schemas.Student]:
+    """Получает студента из кэша; при промахе читает из БД и кэширует схему ответа."""
+    student = cache.get(student_key(student_id), STUDENT_ADAPTER)
+    if student is not None and student.group_id is not None:
+        group = cache.get(group_key(student.group_id), GROUP_ADAPTER)
+        if group is None:
+            db_group = db.get(models.Group, student.group_id)
+            group = schemas.Group.model_validate(db_group) if db_group is not None else None
+            if group is not None:
+                cache.set(group_key(group.id), group, GROUP_ADAPTER)
+        # Группа уже удалена: запись студента устарела, читаем его заново
+        student = student.model_copy(update={"group": group}) if group is not None else None
+    if student is None:
+        db_student = get_student(db, student_id)
+        if db_student is None:
+            return None
+        student = schemas.Student.model_validate(db_student)
+        cache_student(student)
+    return student
 
 # --- Получить список студентов ---
 
-def get_students(db: Session, skip: int = 0, limit: int = 100) -> List[models.Student]:
+def get_students(
+    db: Session, skip: int = 0, limit: int = 100, load: StudentLoad = DEFAULT_STUDENT_LOAD
+) -> List[models.Student]:
     """Получает список всех студентов."""
-    return db.query(models.Student).offset(skip).limit(limit).all()
+    # order_by обязателен: иначе OFFSET/LIMIT с JOIN не гарантируют стабильный порядок
+    query = db.query(models.Student).order_by(models.Student.id).offset(skip).limit(limit)
+    return with_group_loading(query, load).all()
+
+# --- Получить страницу студентов (keyset-пагинация) ---
+
+# Порядок сортировки для курсорной пагинации: по id или по (fio, id)
+StudentOrder = Literal["id", "fio"]
+
+def get_students_page(
+    db: Session,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    order: StudentOrder = "id",
+    load: StudentLoad = DEFAULT_STUDENT_LOAD,
+    with_total: bool = False,
+) -> Tuple[List[models.Student], Optional[str], Optional[int]]:
+    """
+    Получает страницу студентов после позиции курсора.
+    Стоимость страницы не зависит от ее глубины, а вставки/удаления во время обхода
+    не приводят к пропускам и повторам строк. Возвращает (студенты, next_cursor, total).
+    """
+    key_columns = [models.Student.id] if order == "id" else [models.Student.fio, models.Student.id]
+    query = db.query(models.Student).order_by(*key_columns)
+    if cursor:
+        last_key = decode_cursor(cursor, order, key_columns)
+        query = query.filter(tuple_(*key_columns) > tuple_(*last_key))
+
+    # Лишняя (limit + 1)-я строка означает, что есть следующая страница
+    students = with_group_loading(query.limit(limit + 1), load).all()
+    next_cursor = None
+    if len(students) > limit:
+        students = students[:limit]
+        last = students[-1]
+        next_cursor = encode_cursor(order, [last.id] if order == "id" else [last.fio, last.id])
+
+    total = db.query(func.count(models.Student.id)).scalar() if with_total else None
+    return students, next_cursor, total
+
+# --- Быстрый путь списка студентов (LIST_FAST_PATH=true) ---
+# Вместо ORM-объектов, которые FastAPI заново валидирует через response_model
+# (from_attributes и вложенная Group на каждую строку), читаются кортежи колонок
+# с LEFT JOIN groups, и ответ собирается словарями той же формы, что schemas.Student.
+# Строки из БД считаются доверенными, поэтому валидация не выполняется.
+
+STUDENT_ROW_COLUMNS = (
+    models.Student.id, models.Student.fio, models.Student.age, models.Student.group_id, models.Student.version,
+    models.Group.name, models.Group.version,
+)
+
+def student_rows_query(skip: int = 0, limit: int = 100) -> Select:
+    """Страница кортежей студентов с группой по OFFSET/LIMIT (в порядке id)."""
+    return (
+        select(*STUDENT_ROW_COLUMNS)
+        .outerjoin(models.Group, models.Group.id == models.Student.group_id)
+        .order_by(models.Student.id)
+        .offset(skip)
+        .limit(limit)
+    )
+
+def student_rows_page_query(limit: int = 100, cursor: Optional[str] = None, order: StudentOrder = "id") -> Select:
+    """Кортежи студентов после позиции курсора, limit + 1 строк (ValueError — неверный курсор)."""
+    key_columns = [models.Student.id] if order == "id" else [models.Student.fio, models.Student.id]
+    query = (
+        select(*STUDENT_ROW_COLUMNS)
+        .outerjoin(models.Group, models.Group.id == models.Student.group_id)
+        .order_by(*key_columns)
+    )
+    if cursor:
+        last_key = decode_cursor(cursor, order, key_columns)
+        query = query.where(tuple_(*key_columns) > tuple_(*last_key))
+    return query.limit(limit + 1)
+
+def student_row_dicts(rows: Iterable[Tuple]) -> List[dict]:
+    """Словари в форме schemas.Student (тот же порядок полей) из кортежей STUDENT_ROW_COLUMNS."""
+    return [
+        {
+            "fio": fio, "age": age, "group_id": group_id, "id": student_id, "version": version,
+            "group": None if group_id is None else {"name": group_name, "id": group_id, "version": group_version},
+        }
+        for student_id, fio, age, group_id, version, group_name, group_version in rows
+    ]
+
+def student_rows_page(rows: List[Tuple], limit: int, order: StudentOrder, total: Optional[int]) -> dict:
+    """Страница в форме schemas.StudentPage из limit + 1 кортежей."""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(order, [last.id] if order == "id" else [last.fio, last.id])
+    return {"items": student_row_dicts(rows), "next_cursor": next_cursor, "total": total}
+
+def get_student_rows(db: Session, skip: int = 0, limit: int = 100) -> List[dict]:
+    """Список студентов для быстрого пути (без ORM-объектов и валидации)."""
+    return student_row_dicts(db.execute(student_rows_query(skip, limit)).all())
+
+def get_student_rows_page(
+    db: Session, limit: int = 100, cursor: Optional[str] = None, order: StudentOrder = "id", with_total: bool = False
+) -> dict:
+    """Страница студентов для быстрого пути (keyset-пагинация, как get_students_page)."""
+    rows = db.execute(student_rows_page_query(limit, cursor, order)).all()
+    total = db.query(func.count(models.Student.id)).scalar() if with_total else None
+    return student_rows_page(rows, limit, order, total)
+
+# --- Поиск студентов по ФИО ---
+
+def ensure_search_index(db: Session) -> None:
+    """Строит индекс поиска в памяти (нужен только без PostgreSQL)."""
+    student_search_index.ensure_built(
+        lambda: db.execute(select(models.Student.id, models.Student.fio)).yield_per(50_000).tuples()
+    )
+
+def _like_prefix(text: str) -> str:
+    """Шаблон LIKE 'text%' с экранированием спецсимволов."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+def search_students(
+    db: Session, q: str, limit: int = 20, load: StudentLoad = DEFAULT_STUDENT_LOAD
+) -> List[models.Student]:
+    """
+    Ищет студентов по ФИО: по префиксу и с опечатками, по убыванию релевантности.
+    PostgreSQL — триграммный GIN-индекс (pg_trgm), иначе — индекс в памяти процесса.
+    """
+    q = q.strip()
+    if not q:
+        return []
+
+    if db.get_bind().dialect.name == "postgresql":
+        text = q.lower()
+        fio = func.lower(models.Student.fio)
+        is_prefix = fio.like(_like_prefix(text), escape="\\")
+        # fio %> q — word_similarity(q, fio) выше порога; оба условия используют ix_students_fio_trgm
+        query = (
+            db.query(models.Student)
+            .filter(or_(is_prefix, fio.op("%>")(text)))
+            .order_by(is_prefix.desc(), func.word_similarity(text, fio).desc(), models.Student.fio, models.Student.id)
+            .limit(limit)
+        )
+        return with_group_loading(query, load).all()
+
+    ensure_search_index(db)
+    ranked_ids = [student_id for student_id, _ in student_search_index.search(q, limit)]
+    query = db.query(models.Student).filter(models.Student.id.in_(ranked_ids))
+    found = {student.id: student for student in with_group_loading(query, load)}
+    return [found[student_id] for student_id in ranked_ids if student_id in found]
+
+# --- Инвалидация кэша ---
+
+def student_cache_keys(student_id: int, *group_ids: Optional[int]) -> List[str]:
+    """Ключи кэша, которые устаревают при изменении студента: он сам, его группы и их составы."""
+    keys = [student_key(student_id)]
+    for group_id in group_ids:
+        if group_id is not None:
+            keys += [group_key(group_id), group_students_key(group_id)]
+    return keys
+
+# --- Версии для ETag ---
+
+def bump_group_versions(db: Session, group_ids: Iterable[Optional[int]]) -> None:
+    """Увеличивает версии групп, состав которых изменился (ETag группы и ее состава)."""
+    ids = sorted({group_id for group_id in group_ids if group_id is not None})
+    if ids:
+        db.execute(
+            update(models.Group)
+            .where(models.Group.id.in_(ids))
+            .values(version=models.Group.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+# --- Потоковая выгрузка студентов ---
+
+ExportFormat = Literal["ndjson", "csv"]
+EXPORT_COLUMNS = ["id", "fio", "age", "group_id", "group_name"]
+# Строк на одну порцию курсора и один чанк ответа
+EXPORT_PARTITION_SIZE = 2000
+
+def export_query():
+    """Студенты с названием группы одним запросом (без ORM-объектов), в порядке id."""
+    return (
+        select(models.Student.id, models.Student.fio, models.Student.age, models.Student.group_id, models.Group.name)
+        .outerjoin(models.Group, models.Group.id == models.Student.group_id)
+        .order_by(models.Student.id)
+    )
+
+def export_header(fmt: ExportFormat) -> str:
+    return ",".join(EXPORT_COLUMNS) + "\r\n" if fmt == "csv" else ""
+
+def format_export_rows(rows: Iterable[tuple], fmt: ExportFormat) -> str:
+    """Кодирует порцию строк в NDJSON или CSV."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False, separators=(",", ":")) + "\n" for row in rows
+    )
+
+def iter_students_export(bind: Engine, fmt: ExportFormat = "ndjson") -> Iterator[str]:
+    """
+    Генератор выгрузки всех студентов. Строки читаются серверным курсором
+    (stream_results) порциями по EXPORT_PARTITION_SIZE, поэтому память не зависит от
+    числа студентов. Использует собственное соединение: сессия запроса закрывается
+    раньше, чем StreamingResponse дочитает генератор.
+    """
+    header = export_header(fmt)
+    if header:
+        yield header
+    with bind.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=EXPORT_PARTITION_SIZE).execute(export_query())
+        for partition in result.partitions():
+            yield format_export_rows(partition, fmt)
 
 # --- Удалить студента ---
 
@@ -34,34 +392,129 @@ def delete_student(db: Session, student_id: int) -> Optional[models.Student]:
     db_student = get_student(db, student_id)
     if db_student:
         db.delete(db_student)
+        apply_age_count_deltas(db, {(db_student.group_id, db_student.age): -1})
+        bump_group_versions(db, [db_student.group_id])
         db.commit()
+        cache.delete(*student_cache_keys(student_id, db_student.group_id))
+        student_search_index.remove(student_id)
     return db_student
 
 # --- Добавить студента в группу ---
 
-def add_student_to_group(db: Session, student_id: int, group_id: int) -> Optional[models.Student]:
+def add_student_to_group(
+    db: Session, student_id: int, group_id: int
+) -> Optional[Union[models.Student, schemas.Student]]:
     """Привязывает студента к указанной группе."""
+    if returning_mutations_enabled(db):
+        return move_student(db, student_id, group_id)
     db_student = get_student(db, student_id)
     if db_student:
+        old_group_id = db_student.group_id
         db_student.group_id = group_id
+        db_student.version = models.Student.version + 1
+        apply_age_count_deltas(db, age_count_move(db_student.age, old_group_id, group_id))
+        bump_group_versions(db, [old_group_id, group_id])
         db.commit()
         db.refresh(db_student)
+        cache.delete(*student_cache_keys(student_id, old_group_id, group_id))
     return db_student
 
 # --- Удалить студента из группы ---
 
-def remove_student_from_group(db: Session, student_id: int) -> Optional[models.Student]:
+def remove_student_from_group(db: Session, student_id: int) -> Optional[Union[models.Student, schemas.Student]]:
     """Удаляет студента из группы (устанавливает group_id в NULL)."""
+    if returning_mutations_enabled(db):
+        return move_student(db, student_id, None)
     db_student = get_student(db, student_id)
     if db_student:
+        old_group_id = db_student.group_id
         db_student.group_id = None
+        db_student.version = models.Student.version + 1
+        apply_age_count_deltas(db, age_count_move(db_student.age, old_group_id, None))
+        bump_group_versions(db, [old_group_id])
         db.commit()
         db.refresh(db_student)
+        cache.delete(*student_cache_keys(student_id, old_group_id))
     return db_student
 
 # --- Перевести студента из группы A в группу B ---
 
-def transfer_student(db: Session, student_id: int, new_group_id: int) -> Optional[models.Student]:
+def transfer_student(
+    db: Session, student_id: int, new_group_id: int
+) -> Optional[Union[models.Student, schemas.Student]]:
     """Переводит студента из текущей группы в новую."""
     # Это то же самое, что и добавление/обновление group_id
-    return add_student_to_group(db, student_id, new_group_id)
\ No newline at end of file
+    return add_student_to_group(db, student_id, new_group_id)
+
+# --- Перевод студента одной командой (MUTATION_MODE=returning) ---
+# Вместо SELECT студента, UPDATE, commit и refresh — одна команда PostgreSQL с изменяющими
+# CTE: блокирует строку студента, проверяет существование целевой группы, меняет group_id,
+# увеличивает версии старой и новой группы и возвращает все поля ответа.
+# SQLite не поддерживает UPDATE внутри WITH, поэтому в других СУБД остается путь через ORM.
+
+def returning_mutations_enabled(db: Session) -> bool:
+    """True, если мутации выполняются одной командой (MUTATION_MODE=returning на PostgreSQL)."""
+    return settings.MUTATION_MODE == "returning" and db.get_bind().dialect.name == "postgresql"
+
+def move_student_statement(student_id: int, group_id: Optional[int]) -> Select:
+    """
+    Команда перевода студента в группу (None — убрать из группы).
+    Возвращает одну строку: поля студента, old_group_id, group_name и group_version
+    (новая версия группы). Пустой результат — студент или группа не найдены.
+    """
+    student, group = models.Student, models.Group
+    # FOR UPDATE: при конкурентном переводе прежняя группа читается после ожидания блокировки
+    prev = select(student.id, student.group_id).where(student.id == student_id).with_for_update().cte("prev")
+    moved = (
+        update(student)
+        .where(student.id == prev.c.id)
+        .values(group_id=group_id, version=student.version + 1)
+        .returning(
+            student.id, student.fio, student.age, student.group_id, student.version,
+            prev.c.group_id.label("old_group_id"),
+        )
+    )
+    if group_id is not None:
+        # Несуществующая группа: UPDATE не затрагивает строк, и вся команда возвращает пустой результат
+        moved = moved.where(select(group.id).where(group.id == group_id).exists())
+    moved = moved.cte("moved")
+    bumped = (
+        update(group)
+        .where(or_(group.id == moved.c.group_id, group.id == moved.c.old_group_id))
+        .values(version=group.version + 1)
+        .returning(group.id, group.name, group.version)
+        .cte("bumped")
+    )
+    return (
+        select(moved, bumped.c.name.label("group_name"), bumped.c.version.label("group_version"))
+        .select_from(moved)
+        .outerjoin(bumped, bumped.c.id == moved.c.group_id)
+    )
+
+def move_student_uncached(
+    db: Session, student_id: int, group_id: Optional[int]
+) -> Tuple[Optional[schemas.Student], List[str]]:
+    """
+    Переводит студента одной командой и фиксирует транзакцию, не трогая кэш.
+    Возвращает (студент или None, устаревшие ключи кэша): асинхронный сервис вызывает
+    ее через run_sync и инвалидирует ключи, не блокируя цикл событий.
+    """
+    row = db.execute(move_student_statement(student_id, group_id)).first()
+    if row is None:
+        db.rollback()
+        return None, []
+    apply_age_count_deltas(db, age_count_move(row.age, row.old_group_id, row.group_id))
+    db.commit()
+    group = None
+    if row.group_id is not None:
+        group = schemas.Group(id=row.group_id, name=row.group_name, version=row.group_version)
+    student = schemas.Student(
+        id=row.id, fio=row.fio, age=row.age, group_id=row.group_id, version=row.version, group=group
+    )
+    return student, student_cache_keys(student_id, row.old_group_id, row.group_id)
+
+def move_student(db: Session, student_id: int, group_id: Optional[int]) -> Optional[schemas.Student]:
+    """Переводит студента одной командой; None — студент или группа не найдены."""
+    student, stale_keys = move_student_uncached(db, student_id, group_id)
+    cache.delete(*stale_keys)
+    return student
\ No newline at end of file
@@ -0,0 +1,253 @@
+# Assignment3/benchmarks/bench_api.py
+"""
+Набор бенчмарков всех эндпоинтов /students и /groups на файловой SQLite.
+
+    python benchmarks/bench_api.py --students 100000 --output results/base.json
+    python benchmarks/bench_api.py --students 100000 --set LIST_FAST_PATH=true --output results/fast.json
+    python benchmarks/compare_results.py results/base.json results/fast.json
+
+Приложение вызывается в процессе через TestClient (синхронные роутеры), зависимость
+get_db подменяется сессией файловой SQLite, заполненной seed (10k–1M студентов).
+Для каждого эндпоинта запросы идут последовательно; выводятся перцентили задержки,
+пропускная способность (запросов в секунду), среднее число SQL-команд на запрос и
+коды ответов. Входные данные детерминированы (--seed), поэтому результаты разных
+запусков сопоставимы. Кэш чтения по умолчанию выключен: замеряется путь через БД.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+from collections import Counter
+from datetime import datetime, timezone
+
+# Синхронные роутеры: подменяется зависимость get_db
+os.environ["DB_MODE"] = "sync"
+
+from sqlalchemy import event  # noqa: E402
+
+from common import FIRST_NAMES, LAST_NAMES, make_session_factory, make_sqlite_engine, seed, summarize  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+
+# Сколько студентов в конце диапазона ID отведено под DELETE /students/{id}
+# (остальные эндпоинты их не трогают)
+DELETE_RESERVE = 2_000
+BULK_SIZE = 100
+ASSIGN_SIZE = 100
+
+
+def parse_setting(assignment: str):
+    """KEY=VALUE -> (KEY, значение типа текущего атрибута Settings)."""
+    key, _, raw = assignment.partition("=")
+    if not hasattr(settings, key):
+        raise argparse.ArgumentTypeError(f"Unknown setting: {key}")
+    current = getattr(settings, key)
+    if current is None:
+        # Optional[int] (DB_POOL_SIZE и т.п.)
+        return key, int(raw) if raw else None
+    if isinstance(current, bool):
+        return key, raw.lower() == "true"
+    if isinstance(current, (int, float)):
+        return key, type(current)(raw)
+    return key, raw
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def make_cases(students: int, groups: int, rng: random.Random) -> list:
+    """
+    Эндпоинты в порядке выполнения: (имя, heavy, make_request, on_response).
+    make_request(client) возвращает (method, url, kwargs); подготовительные запросы
+    внутри него не замеряются. on_response (или None) получает ответ после замера.
+    """
+    readable = students - DELETE_RESERVE
+    deletable = list(range(readable + 1, students + 1))
+    rng.shuffle(deletable)
+    created_groups = []
+
+    def student_id():
+        return rng.randint(1, readable)
+
+    def group_id():
+        return rng.randint(1, groups)
+
+    def fio():
+        return f"{rng.choice(LAST_NAMES)} {rng.choice(FIRST_NAMES)} {rng.randint(1, 999999):06d}"
+
+    def create_student(client):
+        return "POST", "/students/", {"json": {"fio": fio(), "age": rng.randint(17, 30), "group_id": group_id()}}
+
+    def bulk_create(client):
+        body = [{"fio": fio(), "age": rng.randint(17, 30), "group_id": group_id()} for _ in range(BULK_SIZE)]
+        return "POST", "/students/bulk", {"content": json.dumps(body, ensure_ascii=False)}
+
+    def student_not_modified(client):
+        url = f"/students/{student_id()}"
+        etag = client.get(url).headers.get("etag", "")
+        return "GET", url, {"headers": {"If-None-Match": etag}}
+
+    def create_group(client):
+        return "POST", "/groups/", {"json": {"name": f"bench-{len(created_groups)}-{rng.getrandbits(48):x}"}}
+
+    def delete_group(client):
+        if not created_groups:
+            # Запуск без POST /groups (--only): группа создается без замера
+            remember_group(client.post("/groups/", json={"name": f"bench-delete-{rng.getrandbits(48):x}"}))
+        return "DELETE", f"/groups/{created_groups.pop()}", {}
+
+    def assign_students(client):
+        ids = [student_id() for _ in range(ASSIGN_SIZE)]
+        return "PUT", f"/groups/{group_id()}/students", {"json": {"student_ids": ids}}
+
+    def roster_not_modified(client):
+        url = f"/groups/{group_id()}/students"
+        etag = client.get(url).headers.get("etag", "")
+        return "GET", url, {"headers": {"If-None-Match": etag}}
+
+    def remember_group(response):
+        if response.status_code == 201:
+            created_groups.append(response.json()["id"])
+
+    cases = [
+        ("POST /students", False, create_student, None),
+        ("POST /students/bulk", False, bulk_create, None),
+        ("GET /students offset", False, lambda c: ("GET", "/students/", {"params": {"skip": student_id(), "limit": 100}}), None),
+        ("GET /students cursor", False, lambda c: ("GET", "/students/", {"params": {"paging": "cursor", "limit": 100}}), None),
+        ("GET /students cursor fio", False, lambda c: ("GET", "/students/", {"params": {"paging": "cursor", "order": "fio", "limit": 100}}), None),
+        ("GET /students/search", False, lambda c: ("GET", "/students/search", {"params": {"q": rng.choice(LAST_NAMES)[:4]}}), None),
+        ("GET /students/export", True, lambda c: ("GET", "/students/export", {}), None),
+        ("GET /students/{id}", False, lambda c: ("GET", f"/students/{student_id()}", {}), None),
+        ("GET /students/{id} 304", False, student_not_modified, None),
+        ("PUT /students/{id}/group/{gid}", False, lambda c: ("PUT", f"/students/{student_id()}/group/{group_id()}", {}), None),
+        ("DELETE /students/{id}/group", False, lambda c: ("DELETE", f"/students/{student_id()}/group", {}), None),
+        ("DELETE /students/{id}", False, lambda c: ("DELETE", f"/students/{deletable.pop()}", {}), None),
+        ("POST /groups", False, create_group, remember_group),
+        ("GET /groups", False, lambda c: ("GET", "/groups/", {"params": {"limit": 100}}), None),
+        ("GET /groups/stats", True, lambda c: ("GET", "/groups/stats", {}), None),
+        ("GET /groups/{id}", False, lambda c: ("GET", f"/groups/{group_id()}", {}), None),
+        ("PUT /groups/{id}/students", False, assign_students, None),
+        ("GET /groups/{id}/students", False, lambda c: ("GET", f"/groups/{group_id()}/students", {}), None),
+        ("GET /groups/{id}/students 304", False, roster_not_modified, None),
+        ("GET /groups/{id}/stats", False, lambda c: ("GET", f"/groups/{group_id()}/stats", {}), None),
+        ("DELETE /groups/{id}", False, delete_group, None),
+    ]
+    return cases
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=200, help="запросов на эндпоинт")
+    parser.add_argument("--heavy-requests", type=int, default=5, help="запросов на тяжелые эндпоинты (выгрузка, сводка)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", action="append", default=[], help="подстрока имени эндпоинта (можно несколько)")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], type=parse_setting,
+                        metavar="KEY=VALUE", help="переопределить атрибут Settings, например LIST_FAST_PATH=true")
+    parser.add_argument("--db-path", default=None, help="файл SQLite (по умолчанию временный)")
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--output", default=None, help="файл JSON с результатами (по умолчанию stdout)")
+    args = parser.parse_args()
+    if args.students <= DELETE_RESERVE:
+        parser.error(f"--students must be greater than {DELETE_RESERVE}")
+
+    # Кэш выключен, если не задан явно: его глобальный экземпляр создается при импорте app.main
+    settings.CACHE_BACKEND = "off"
+    for key, value in args.overrides:
+        setattr(settings, key, value)
+
+    from fastapi.testclient import TestClient
+    from app.core.fast_json import JSON_ENCODER
+    from app.db.database import get_db
+    from app.main import app
+
+    engine = make_sqlite_engine(args.db_path)
+    if not args.skip_seed:
+        seed(engine, args.students, args.groups)
+    Session = make_session_factory(engine)
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    statements = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count_statement(*_):
+        nonlocal statements
+        statements += 1
+
+    app.dependency_overrides[get_db] = override_get_db
+    # Без контекстного менеджера: lifespan (init_db на PostgreSQL) не запускается
+    client = TestClient(app)
+
+    rng = random.Random(args.seed)
+    results = {}
+    for name, heavy, make_request, on_response in make_cases(args.students, args.groups, rng):
+        if args.only and not any(part in name for part in args.only):
+            continue
+        # Входные данные эндпоинта не зависят от того, какие эндпоинты выбраны --only
+        rng.seed(f"{args.seed}:{name}")
+        repeats = args.heavy_requests if heavy else args.requests
+        samples, total_statements, statuses = [], 0, Counter()
+        for _ in range(repeats):
+            method, url, kwargs = make_request(client)
+            statements = 0
+            started = time.perf_counter()
+            response = client.request(method, url, **kwargs)
+            samples.append((time.perf_counter() - started) * 1000)
+            total_statements += statements
+            statuses[str(response.status_code)] += 1
+            if on_response:
+                on_response(response)
+        results[name] = {
+            **summarize(samples),
+            "rps": round(len(samples) / (sum(samples) / 1000), 1),
+            "statements_per_request": round(total_statements / len(samples), 2),
+            "statuses": dict(statuses),
+        }
+        print(f"{name:<34} p50 {results[name]['p50_ms']:9.3f} мс  "
+              f"{results[name]['statements_per_request']:6.2f} SQL/запрос", file=sys.stderr)
+
+    import sqlalchemy
+    report = {
+        "meta": {
+            "students": args.students,
+            "groups": args.groups,
+            "requests": args.requests,
+            "heavy_requests": args.heavy_requests,
+            "seed": args.seed,
+            "settings": {key: value for key, value in args.overrides},
+            "git_revision": git_revision(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "json_encoder": JSON_ENCODER,
+        },
+        "endpoints": results,
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# Assignment3/benchmarks/bench_concurrency.py
+"""
+Бенчмарк пропускной способности API при 50/200/1000 одновременных клиентах.
+
+    DB_MODE=sync  uvicorn app.main:app --port 8000
+    DB_MODE=async uvicorn app.main:app --port 8001
+    python benchmarks/bench_concurrency.py --target sync=http://localhost:8000 --target async=http://localhost:8001
+
+Каждый клиент в цикле запрашивает GET /students/{id} и GET /students/?limit=N
+в течение --duration секунд. Для каждой цели и уровня конкурентности выводятся
+запросы/сек, доля ошибок и перцентили задержки. База должна быть заполнена заранее
+(например, seed из common.py или POST-запросами); id берутся из диапазона 1..--max-id.
+"""
+import json
+import time
+import random
+import asyncio
+import argparse
+from typing import Dict, List
+
+import httpx
+
+from common import summarize
+
+
+async def client_loop(client: httpx.AsyncClient, deadline: float, max_id: int, list_limit: int,
+                      samples: List[float], errors: List[int], rng: random.Random) -> None:
+    while time.perf_counter() < deadline:
+        if rng.random() < 0.5:
+            url = f"/students/{rng.randint(1, max_id)}"
+        else:
+            url = f"/students/?limit={list_limit}&skip={rng.randint(0, max(max_id - list_limit, 0))}"
+        started = time.perf_counter()
+        try:
+            response = await client.get(url)
+            if response.status_code >= 500:
+                errors.append(response.status_code)
+        except httpx.HTTPError:
+            errors.append(0)
+            continue
+        samples.append((time.perf_counter() - started) * 1000)
+
+
+async def run_level(base_url: str, concurrency: int, duration: float, max_id: int, list_limit: int) -> Dict:
+    samples: List[float] = []
+    errors: List[int] = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            client_loop(client, deadline, max_id, list_limit, samples, errors, random.Random(i))
+            for i in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    total = len(samples) + len(errors)
+    return {
+        "concurrency": concurrency,
+        "requests_per_second": round(len(samples) / elapsed, 1),
+        "error_rate": round(len(errors) / total, 4) if total else 0.0,
+        "latency": summarize(samples) if samples else None,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", action="append", required=True, help="имя=URL, например async=http://localhost:8001")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--duration", type=float, default=20.0, help="длительность каждого замера (сек)")
+    parser.add_argument("--max-id", type=int, default=10_000)
+    parser.add_argument("--list-limit", type=int, default=20)
+    args = parser.parse_args()
+
+    results = {}
+    for target in args.target:
+        name, _, base_url = target.partition("=")
+        results[name] = [
+            await run_level(base_url, level, args.duration, args.max_id, args.list_limit)
+            for level in args.concurrency
+        ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
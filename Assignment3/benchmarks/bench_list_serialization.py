@@ -0,0 +1,88 @@
+# Assignment3/benchmarks/bench_list_serialization.py
+"""
+Бенчмарк GET /students: обычный путь (ORM-объекты + response_model) против быстрого
+(LIST_FAST_PATH: кортежи колонок -> dict -> orjson/json без валидации).
+
+    python benchmarks/bench_list_serialization.py --students 100000
+
+Приложение вызывается в процессе через TestClient, зависимость get_db подменяется
+сессией файловой SQLite. Для каждого размера страницы и режима выводятся запросы
+в секунду (последовательно, один клиент) и перцентили задержки; отдельно — для
+курсорного режима. Накладные расходы TestClient одинаковы для обоих путей.
+Поле encoder показывает, чем кодировал быстрый путь: orjson или (без него) json.
+"""
+import os
+import json
+import time
+import argparse
+
+# Синхронные роутеры: подменяется зависимость get_db
+os.environ["DB_MODE"] = "sync"
+
+from common import make_session_factory, make_sqlite_engine, seed, summarize  # noqa: E402
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.fast_json import JSON_ENCODER  # noqa: E402
+from app.db.database import get_db  # noqa: E402
+from app.main import app  # noqa: E402
+
+PAGE_SIZES = (10, 100, 1000)
+MODES = {"orm": False, "fast": True}
+
+
+def run(client: TestClient, params: dict, duration: float) -> dict:
+    samples = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = client.get("/students/", params=params)
+        samples.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return {"rps": round(len(samples) / (sum(samples) / 1000), 1), **summarize(samples)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--groups", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=5.0, help="секунд на каждую комбинацию")
+    parser.add_argument("--db-path", default=None, help="файл SQLite (по умолчанию временный)")
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+
+    engine = make_sqlite_engine(args.db_path)
+    if not args.skip_seed:
+        seed(engine, args.students, args.groups)
+    Session = make_session_factory(engine)
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    # Без контекстного менеджера: lifespan (init_db на PostgreSQL) не запускается
+    client = TestClient(app)
+
+    results = {}
+    for limit in PAGE_SIZES:
+        by_mode = {}
+        for mode, fast in MODES.items():
+            settings.LIST_FAST_PATH = fast
+            by_mode[mode] = {
+                "offset": run(client, {"limit": limit, "skip": 1000}, args.duration),
+                "cursor": run(client, {"limit": limit, "paging": "cursor"}, args.duration),
+            }
+        results[str(limit)] = by_mode
+
+    print(json.dumps(
+        {"students": args.students, "encoder": JSON_ENCODER, "by_page_size": results}, indent=2, ensure_ascii=False,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# Assignment3/benchmarks/bench_pagination.py
+"""
+Бенчмарк: OFFSET-пагинация против keyset (курсорной) на глубоких страницах.
+
+    python benchmarks/bench_pagination.py --students 1000000
+
+Для каждой глубины (номер первой строки страницы) измеряется медианная задержка
+get_students (OFFSET/LIMIT) и get_students_page (курсор) в порядке id и (fio, id).
+При keyset-пагинации задержка не должна зависеть от глубины.
+"""
+import json
+import time
+import argparse
+
+from common import make_session_factory, make_sqlite_engine, seed, summarize
+
+from app.core.pagination import encode_cursor
+from app.db import models
+from app.services import student_service
+
+
+def timed(fn, repeats: int):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=1_000_000)
+    parser.add_argument("--groups", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--db-path", default=None, help="файл SQLite (по умолчанию временный)")
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+
+    engine = make_sqlite_engine(args.db_path)
+    if not args.skip_seed:
+        seed(engine, args.students, args.groups)
+    Session = make_session_factory(engine)
+
+    depths = [d for d in (0, 1_000, 10_000, 100_000, 500_000, 900_000) if d < args.students]
+    results = {}
+    with Session() as db:
+        for depth in depths:
+            # Ключ строки, стоящей перед страницей (не входит в замер)
+            fio_key = None
+            if depth:
+                row = db.query(models.Student.fio, models.Student.id).order_by(
+                    models.Student.fio, models.Student.id
+                ).offset(depth - 1).first()
+                fio_key = [row.fio, row.id]
+            id_cursor = encode_cursor("id", [depth]) if depth else None
+            fio_cursor = encode_cursor("fio", fio_key) if depth else None
+
+            results[str(depth)] = {
+                "offset_id": timed(lambda: student_service.get_students(db, skip=depth, limit=args.limit), args.repeats),
+                "cursor_id": timed(lambda: student_service.get_students_page(
+                    db, limit=args.limit, cursor=id_cursor, order="id"), args.repeats),
+                "cursor_fio": timed(lambda: student_service.get_students_page(
+                    db, limit=args.limit, cursor=fio_cursor, order="fio"), args.repeats),
+            }
+            db.expunge_all()
+
+    print(json.dumps({"students": args.students, "limit": args.limit, "by_depth": results}, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# Assignment3/benchmarks/bench_pool_warmup.py
+"""
+Бенчмарк прогрева пула: задержка первой волны запросов после старта воркера
+без прогрева и с warm_up_pool.
+
+    python benchmarks/bench_pool_warmup.py --connect-latency-ms 30
+
+Вместо PostgreSQL используется файловая SQLite, у которой подключение бесплатно,
+поэтому цена подключения (TCP, TLS, аутентификация) имитируется задержкой
+--connect-latency-ms в creator. Пул настраивается pool_options из Settings
+(доля DB_MAX_CONNECTIONS на воркер). Первая волна — pool_size одновременных
+запросов get_students сразу после создания движка; вторая волна показывает
+установившуюся задержку.
+"""
+import json
+import time
+import sqlite3
+import argparse
+import threading
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from common import make_session_factory, make_sqlite_engine, seed, summarize
+
+from app.core.config import settings
+from app.db.database import pool_options, warm_up_pool
+from app.services import student_service
+
+
+def make_stand_in_engine(path: str, connect_latency_ms: float):
+    """Движок с пулом из Settings, каждое новое соединение которого стоит connect_latency_ms."""
+    def creator():
+        time.sleep(connect_latency_ms / 1000)
+        return sqlite3.connect(path, check_same_thread=False)
+
+    return create_engine("sqlite://", creator=creator, poolclass=QueuePool, **pool_options())
+
+
+def wave(Session, clients: int) -> list:
+    """clients одновременных запросов; задержка каждого в мс."""
+    samples = []
+    barrier = threading.Barrier(clients)
+    lock = threading.Lock()
+
+    def request():
+        barrier.wait()
+        started = time.perf_counter()
+        with Session() as db:
+            student_service.get_students(db, limit=100)
+        with lock:
+            samples.append((time.perf_counter() - started) * 1000)
+
+    threads = [threading.Thread(target=request) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def run(path: str, connect_latency_ms: float, warm: bool) -> dict:
+    engine = make_stand_in_engine(path, connect_latency_ms)
+    result = {}
+    if warm:
+        started = time.perf_counter()
+        result["warmed_connections"] = warm_up_pool(engine)
+        result["warm_up_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    Session = make_session_factory(engine)
+    clients = engine.pool.size()
+    result["first_wave"] = summarize(wave(Session, clients))
+    result["second_wave"] = summarize(wave(Session, clients))
+    engine.dispose()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--connect-latency-ms", type=float, default=30.0)
+    parser.add_argument("--workers", type=int, default=4, help="WEB_CONCURRENCY для расчета доли пула")
+    parser.add_argument("--max-connections", type=int, default=80, help="DB_MAX_CONNECTIONS")
+    parser.add_argument("--db-path", default=None, help="файл SQLite (по умолчанию временный)")
+    args = parser.parse_args()
+
+    settings.WEB_CONCURRENCY = args.workers
+    settings.DB_MAX_CONNECTIONS = args.max_connections
+    seed_engine = make_sqlite_engine(args.db_path)
+    seed(seed_engine, args.students, args.groups)
+    path = seed_engine.url.database
+    # Однократная настройка мапперов и компиляция SQL не должны попасть в замер "cold"
+    with make_session_factory(seed_engine)() as db:
+        student_service.get_students(db, limit=100)
+
+    results = {
+        "pool": {key: value for key, value in pool_options().items() if key in ("pool_size", "max_overflow")},
+        "cold": run(path, args.connect_latency_ms, warm=False),
+        "warm": run(path, args.connect_latency_ms, warm=True),
+    }
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# Assignment3/benchmarks/bench_search.py
+"""
+Бенчмарк поиска по ФИО (student_service.search_students) на SQLite-индексе в памяти.
+
+    python benchmarks/bench_search.py --students 1000000
+
+Замеряются время построения индекса и задержка запросов разных видов: префикс
+фамилии, полное ФИО, слова с опечатками, префикс номера. Для каждого вида выводятся
+перцентили по всему сервисному вызову (индекс + загрузка строк с группами) и
+отдельно по самому индексу. Цель — p95 < 10 мс на 1M студентов.
+"""
+import json
+import time
+import random
+import argparse
+
+from common import FIRST_NAMES, LAST_NAMES, make_session_factory, make_sqlite_engine, seed, summarize
+
+from app.core.search_index import student_search_index
+from app.services import student_service
+
+
+def typo(word: str, rng: random.Random) -> str:
+    """Удаляет одну случайную букву (не первую)."""
+    position = rng.randint(1, len(word) - 1)
+    return word[:position] + word[position + 1:]
+
+
+def make_queries(rng: random.Random, count: int) -> dict:
+    return {
+        "surname_prefix": [rng.choice(LAST_NAMES)[:rng.randint(2, 5)] for _ in range(count)],
+        "surname_name": [f"{rng.choice(LAST_NAMES)} {rng.choice(FIRST_NAMES)}" for _ in range(count)],
+        "typo": [f"{typo(rng.choice(LAST_NAMES), rng)} {typo(rng.choice(FIRST_NAMES), rng)}" for _ in range(count)],
+        "number_prefix": [f"{rng.randint(0, 999):03d}" for _ in range(count)],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=1_000_000)
+    parser.add_argument("--groups", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=200, help="запросов каждого вида")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--db-path", default=None, help="файл SQLite (по умолчанию временный)")
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+
+    engine = make_sqlite_engine(args.db_path)
+    if not args.skip_seed:
+        seed(engine, args.students, args.groups)
+    Session = make_session_factory(engine)
+    queries = make_queries(random.Random(7), args.queries)
+
+    results = {}
+    with Session() as db:
+        started = time.perf_counter()
+        student_service.ensure_search_index(db)
+        build_seconds = time.perf_counter() - started
+
+        for kind, texts in queries.items():
+            service_ms, index_ms = [], []
+            for text in texts:
+                started = time.perf_counter()
+                student_search_index.search(text, args.limit)
+                index_ms.append((time.perf_counter() - started) * 1000)
+
+                started = time.perf_counter()
+                student_service.search_students(db, text, limit=args.limit)
+                service_ms.append((time.perf_counter() - started) * 1000)
+                db.expunge_all()
+            results[kind] = {"service": summarize(service_ms), "index_only": summarize(index_ms)}
+
+    print(json.dumps({
+        "students": args.students,
+        "limit": args.limit,
+        "index_build_seconds": round(build_seconds, 2),
+        "by_query_kind": results,
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# Assignment3/benchmarks/common.py
+"""
+Общие утилиты бенчмарков: файловая SQLite-база вместо PostgreSQL и генерация данных
+(из tests/db_helpers.py), перцентили задержки.
+"""
+import os
+import sys
+import statistics
+from typing import Dict, List
+
+# Корень Assignment3 в sys.path, чтобы импортировать пакет app, и tests/ — ради общей тестовой базы
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+# Файловая SQLite и генерация данных — те же, что в фикстурах тестов
+from db_helpers import (  # noqa: E402,F401
+    FIRST_NAMES, LAST_NAMES, SEED_BATCH, make_session_factory, make_sqlite_engine, seed,
+)
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    """Перцентили задержки (мс)."""
+    ordered = sorted(samples_ms)
+
+    def pct(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+    return {
+        "count": len(ordered),
+        "p50_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(pct(95), 3),
+        "p99_ms": round(pct(99), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
@@ -0,0 +1,69 @@
+# Assignment3/benchmarks/compare_results.py
+"""
+Сравнение двух JSON-отчетов bench_api.py.
+
+    python benchmarks/compare_results.py results/base.json results/new.json --threshold 0.15
+
+Для каждого эндпоинта, который есть в обоих отчетах, выводятся p50/p95 и число
+SQL-команд на запрос. Регрессия — рост p50 или p95 больше чем на threshold (доля)
+или рост числа команд на запрос. При регрессиях код выхода 1 (удобно в CI).
+"""
+import sys
+import json
+import argparse
+
+# Рост задержки меньше этого (мс) не считается регрессией: шум на быстрых эндпоинтах
+MIN_DELTA_MS = 0.5
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def regressions(before: dict, after: dict, threshold: float) -> list:
+    """Причины, по которым эндпоинт считается регрессировавшим."""
+    reasons = []
+    for metric in ("p50_ms", "p95_ms"):
+        delta = after[metric] - before[metric]
+        if delta > MIN_DELTA_MS and after[metric] > before[metric] * (1 + threshold):
+            reasons.append(f"{metric} +{delta / before[metric]:.0%}" if before[metric] else f"{metric} +{delta:.1f}")
+    if after["statements_per_request"] > before["statements_per_request"] + 0.01:
+        reasons.append(f"SQL {before['statements_per_request']} -> {after['statements_per_request']}")
+    return reasons
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.15, help="допустимый рост задержки (доля)")
+    args = parser.parse_args()
+
+    baseline, current = load(args.baseline), load(args.current)
+    for key in ("students", "groups", "seed", "json_encoder"):
+        if baseline["meta"].get(key) != current["meta"].get(key):
+            print(f"warning: {key} differs ({baseline['meta'].get(key)} vs {current['meta'].get(key)})")
+
+    flagged = 0
+    print(f"{'endpoint':<34} {'p50 before':>11} {'p50 after':>10} {'p95 before':>11} {'p95 after':>10} {'SQL':>11}")
+    for name, before in baseline["endpoints"].items():
+        after = current["endpoints"].get(name)
+        if after is None:
+            continue
+        reasons = regressions(before, after, args.threshold)
+        flagged += bool(reasons)
+        print(
+            f"{name:<34} {before['p50_ms']:11.3f} {after['p50_ms']:10.3f} {before['p95_ms']:11.3f} {after['p95_ms']:10.3f} "
+            f"{before['statements_per_request']:5.2f}/{after['statements_per_request']:<5.2f}"
+            + (f"  REGRESSION: {', '.join(reasons)}" if reasons else "")
+        )
+    missing = sorted(set(baseline["endpoints"]) ^ set(current["endpoints"]))
+    if missing:
+        print(f"only in one report: {', '.join(missing)}")
+    print(f"{flagged} regression(s)")
+    sys.exit(1 if flagged else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# Assignment3/tests/conftest.py
+"""
+Общие фикстуры: приложение с синхронными роутерами, зависимость get_db подменена
+сессией файловой SQLite (tests/db_helpers.py, ее же используют benchmarks/), кэш чтения выключен.
+
+    cd Assignment3 && python -m pytest -q
+"""
+import os
+import sys
+
+# Настройки читаются при импорте app: синхронные роутеры и без кэша, чтобы считать SQL-команды
+os.environ["DB_MODE"] = "sync"
+os.environ["CACHE_BACKEND"] = "off"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+from db_helpers import StatementCounter, make_session_factory, make_sqlite_engine, seed  # noqa: E402
+
+STUDENTS = 200
+GROUPS = 5
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = make_sqlite_engine(str(tmp_path / "test.db"))
+    seed(engine, STUDENTS, GROUPS, ungrouped_share=0.0)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return make_session_factory(engine)
+
+
+@pytest.fixture
+def statements(engine):
+    return StatementCounter(engine)
+
+
+@pytest.fixture
+def client(session_factory):
+    from fastapi.testclient import TestClient
+    from app.db.database import get_db
+    from app.main import app
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    # Без контекстного менеджера: lifespan (init_db на PostgreSQL) не запускается
+    yield TestClient(app)
+    app.dependency_overrides.clear()
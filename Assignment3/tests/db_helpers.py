@@ -0,0 +1,75 @@
+# Assignment3/tests/db_helpers.py
+"""
+Тестовая база: файловая SQLite вместо PostgreSQL, генерация данных и счетчик SQL-команд.
+Используется фикстурами tests/ и бенчмарками (benchmarks/common.py).
+"""
+import random
+import tempfile
+from typing import Optional
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import Base
+from app.db import models
+
+SEED_BATCH = 50_000
+FIRST_NAMES = ["Иван", "Анна", "Петр", "Мария", "Олег", "Елена", "Сергей", "Ольга", "Дмитрий", "Наталья"]
+LAST_NAMES = ["Иванов", "Петров", "Сидоров", "Смирнов", "Кузнецов", "Попов", "Васильев", "Соколов", "Михайлов", "Новиков"]
+
+
+def make_sqlite_engine(path: Optional[str] = None) -> Engine:
+    """Файловая SQLite-база (как локальная замена PostgreSQL) с включенными внешними ключами."""
+    if path is None:
+        path = tempfile.NamedTemporaryFile(suffix=".db", delete=False).name
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
+
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def make_session_factory(engine: Engine) -> sessionmaker:
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def seed(engine: Engine, students: int, groups: int, ungrouped_share: float = 0.05, seed_value: int = 42) -> None:
+    """Заполняет groups и students синтетическими данными (id идут подряд с 1)."""
+    rng = random.Random(seed_value)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Group), [{"name": f"Группа-{i:05d}"} for i in range(1, groups + 1)])
+
+    for offset in range(0, students, SEED_BATCH):
+        rows = []
+        for _ in range(offset, min(offset + SEED_BATCH, students)):
+            rows.append({
+                "fio": f"{rng.choice(LAST_NAMES)} {rng.choice(FIRST_NAMES)} {rng.randint(1, 999999):06d}",
+                "age": rng.randint(17, 30),
+                "group_id": None if rng.random() < ungrouped_share else rng.randint(1, groups),
+            })
+        with engine.begin() as conn:
+            conn.execute(insert(models.Student), rows)
+
+
+class StatementCounter:
+    """Считает команды, отправленные в БД (before_cursor_execute)."""
+
+    def __init__(self, engine: Engine):
+        self.count = 0
+        self.statements = []
+        event.listen(engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, *_):
+        self.count += 1
+        self.statements.append(statement)
+
+    def reset(self) -> None:
+        self.count = 0
+        self.statements = []
@@ -0,0 +1,57 @@
+# Assignment3/tests/test_bulk.py
+"""Массовое создание студентов и назначение группы: одна транзакция, фиксированное число команд."""
+import pytest
+
+from app.services import student_service
+
+
+def test_bulk_create_is_one_insert_per_batch(client, statements):
+    items = [{"fio": f"Петров Петр {i:03d}", "age": 18 + i % 10, "group_id": 1 + i % 5} for i in range(100)]
+    statements.reset()
+    response = client.post("/students/bulk", json=items)
+    assert response.status_code == 201
+    # Проверка групп, многострочный INSERT ... RETURNING, UPDATE версий групп
+    assert statements.count == 3
+    assert sum(statement.lstrip().upper().startswith("INSERT") for statement in statements.statements) == 1
+
+    ids = response.json()["ids"]
+    assert response.json()["created"] == len(ids) == 100
+    for item, student_id in zip(items, ids):
+        student = client.get(f"/students/{student_id}").json()
+        assert (student["fio"], student["age"], student["group_id"]) == (item["fio"], item["age"], item["group_id"])
+
+
+def test_bulk_create_maps_ids_in_request_order_with_errors_and_duplicates(client):
+    items = [
+        {"fio": "Сидоров Иван", "age": 20, "group_id": 2},
+        {"fio": "Сидоров Иван", "age": 20, "group_id": 2},
+        {"fio": "Попов Олег", "age": "двадцать"},
+        {"fio": "Смирнова Анна", "age": 21, "group_id": 999},
+        {"fio": "Смирнова Анна", "age": 21},
+        {"fio": "Сидоров Иван", "age": 20, "group_id": 2},
+    ]
+    result = client.post("/students/bulk", json=items).json()
+    assert [error["index"] for error in result["errors"]] == [2, 3]
+    created = [item for index, item in enumerate(items) if index not in (2, 3)]
+    assert len(result["ids"]) == len(set(result["ids"])) == len(created)
+    assert result["ids"] == sorted(result["ids"])
+    for item, student_id in zip(created, result["ids"]):
+        student = client.get(f"/students/{student_id}").json()
+        assert (student["fio"], student["group_id"]) == (item["fio"], item.get("group_id"))
+
+
+@pytest.mark.parametrize("batch_size", [1, 7])
+def test_bulk_create_across_batches(client, monkeypatch, batch_size):
+    monkeypatch.setattr(student_service, "BULK_BATCH_SIZE", batch_size)
+    items = [{"fio": f"Кузнецов Олег {i}", "age": 25} for i in range(15)]
+    result = client.post("/students/bulk", json=items).json()
+    assert result["created"] == 15 and not result["errors"]
+    assert [client.get(f"/students/{i}").json()["fio"] for i in result["ids"]] == [item["fio"] for item in items]
+
+
+def test_assign_students_to_group_statements(client, statements):
+    statements.reset()
+    response = client.put("/groups/2/students", json={"student_ids": list(range(1, 51))})
+    assert response.status_code < 400, response.text
+    # SELECT группы; на пакет: прежние группы и UPDATE ... RETURNING; UPDATE версий групп
+    assert statements.count == 4
@@ -0,0 +1,181 @@
+# Assignment3/tests/test_cache.py
+"""
+Граница устаревания кэша чтения: запись живет не дольше TTL, а изменяющие
+операции сразу инвалидируют затронутые ключи.
+"""
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import update
+
+from app.core.cache import LRUTTLCache, RedisCache
+from app.db import models
+from app.services import group_service, student_service
+from app.services.student_service import STUDENT_ADAPTER
+
+TTL = 30.0
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def memory_cache(monkeypatch, clock):
+    """Кэш в памяти с управляемыми часами вместо выключенного глобального."""
+    cache = LRUTTLCache(max_entries=1000, ttl=TTL, clock=clock)
+    monkeypatch.setattr(student_service, "cache", cache)
+    monkeypatch.setattr(group_service, "cache", cache)
+    return cache
+
+
+# --- TTL ---
+
+def test_entry_expires_after_ttl(clock):
+    cache = LRUTTLCache(max_entries=10, ttl=TTL, clock=clock)
+    cache.set("k", "v", STUDENT_ADAPTER)
+    clock.now += TTL - 0.001
+    assert cache.get("k", STUDENT_ADAPTER) == "v"
+    clock.now += 0.001
+    assert cache.get("k", STUDENT_ADAPTER) is None
+    assert len(cache) == 0
+
+
+def test_write_without_invalidation_is_stale_at_most_ttl(client, session_factory, memory_cache, clock):
+    # Запись в обход сервисов (другой процесс, ручной SQL) инвалидацию не вызывает
+    assert client.get("/students/1").json()["age"] != 99
+    with session_factory() as db:
+        db.execute(update(models.Student).where(models.Student.id == 1).values(age=99))
+        db.commit()
+    assert client.get("/students/1").json()["age"] != 99
+    clock.now += TTL
+    assert client.get("/students/1").json()["age"] == 99
+
+
+# --- Инвалидация при записи ---
+
+def test_transfer_invalidates_student_and_rosters(client, memory_cache):
+    student = client.get("/students/1").json()
+    old_group, new_group = student["group_id"], student["group_id"] % 5 + 1
+    client.get(f"/groups/{old_group}/students")
+    client.get(f"/groups/{new_group}")
+
+    moved = client.put(f"/students/1/group/{new_group}").json()
+    assert client.get("/students/1").json() == moved
+    assert 1 not in {s["id"] for s in client.get(f"/groups/{old_group}/students").json()}
+    assert 1 in {s["id"] for s in client.get(f"/groups/{new_group}/students").json()}
+    assert client.get(f"/groups/{new_group}").json()["version"] == moved["group"]["version"]
+
+
+def test_remove_from_group_invalidates_student(client, memory_cache):
+    client.get("/students/1")
+    client.delete("/students/1/group")
+    assert client.get("/students/1").json()["group"] is None
+
+
+def test_assign_invalidates_students(client, memory_cache):
+    ids = [1, 2, 3]
+    for student_id in ids:
+        client.get(f"/students/{student_id}")
+    client.put("/groups/5/students", json={"student_ids": ids})
+    assert {client.get(f"/students/{student_id}").json()["group_id"] for student_id in ids} == {5}
+
+
+def test_delete_group_invalidates_members(client, memory_cache):
+    members = [s["id"] for s in client.get("/groups/2/students").json()]
+    assert members
+    client.get(f"/students/{members[0]}")
+    client.delete("/groups/2")
+    assert client.get("/groups/2").status_code == 404
+    assert client.get(f"/students/{members[0]}").json()["group"] is None
+
+
+def test_delete_student_invalidates_student(client, memory_cache):
+    client.get("/students/1")
+    client.delete("/students/1")
+    assert client.get("/students/1").status_code == 404
+
+
+# --- Redis: TTL на стороне сервера и неблокирующие вызовы из async-сервисов ---
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.threads = set()
+
+    def get(self, key):
+        self.threads.add(threading.get_ident())
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.threads.add(threading.get_ident())
+        self.data[key] = value
+        self.expires[key] = ex
+
+    def delete(self, *keys):
+        self.threads.add(threading.get_ident())
+        for key in keys:
+            self.data.pop(key, None)
+
+
+class FakeAsyncRedis(FakeRedis):
+    async def get(self, key):
+        return FakeRedis.get(self, key)
+
+    async def set(self, key, value, ex=None):
+        FakeRedis.set(self, key, value, ex)
+
+    async def delete(self, *keys):
+        FakeRedis.delete(self, *keys)
+
+
+def sample_student():
+    return STUDENT_ADAPTER.validate_python({"id": 1, "fio": "Иванов Иван", "age": 20, "group_id": None, "version": 1})
+
+
+def test_redis_entries_carry_ttl():
+    client = FakeRedis()
+    cache = RedisCache(client, ttl=TTL)
+    cache.set("student:1", sample_student(), STUDENT_ADAPTER)
+    assert client.expires["a3cache:student:1"] == int(TTL)
+    assert cache.get("student:1", STUDENT_ADAPTER) == sample_student()
+
+
+def test_redis_async_client_is_used_on_the_event_loop():
+    sync_client, async_client = FakeRedis(), FakeAsyncRedis()
+    cache = RedisCache(sync_client, ttl=TTL, async_client=async_client)
+
+    async def scenario():
+        await cache.aset("student:1", sample_student(), STUDENT_ADAPTER)
+        assert await cache.aget("student:1", STUDENT_ADAPTER) == sample_student()
+        await cache.adelete("student:1")
+        assert await cache.aget("student:1", STUDENT_ADAPTER) is None
+
+    asyncio.run(scenario())
+    assert async_client.expires["a3cache:student:1"] == int(TTL)
+    assert not sync_client.threads
+
+
+def test_redis_without_async_client_is_offloaded_to_a_thread():
+    client = FakeRedis()
+    cache = RedisCache(client, ttl=TTL)
+
+    async def scenario():
+        await cache.aset("student:1", sample_student(), STUDENT_ADAPTER)
+        assert await cache.aget("student:1", STUDENT_ADAPTER) == sample_student()
+        await cache.adelete("student:1")
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario())
+    assert client.threads and loop_thread not in client.threads
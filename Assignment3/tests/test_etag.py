@@ -0,0 +1,78 @@
+# Assignment3/tests/test_etag.py
+"""
+ETag студента совпадает тогда и только тогда, когда совпадает тело ответа (включая вложенную группу);
+ETag состава группы стоит одного запроса.
+"""
+import pytest
+
+from app.core.cache import LRUTTLCache
+from app.services import group_service, student_service
+
+
+@pytest.fixture(params=["off", "memory"])
+def cache_backend(request, monkeypatch):
+    if request.param == "memory":
+        cache = LRUTTLCache(max_entries=1000, ttl=3600)
+        monkeypatch.setattr(student_service, "cache", cache)
+        monkeypatch.setattr(group_service, "cache", cache)
+    return request.param
+
+
+def group_mate(client, student):
+    """Другой студент не из группы студента student."""
+    group_id = student["group_id"]
+    return next(s for s in client.get("/students/", params={"limit": 50}).json() if s["group_id"] != group_id)
+
+
+def test_etag_includes_group_version(client, cache_backend):
+    body = client.get("/students/1").json()
+    etag = client.get("/students/1").headers["etag"]
+    assert etag == f'"student-1-v{body["version"]}-g{body["group"]["version"]}"'
+
+    client.delete("/students/1/group")
+    assert client.get("/students/1").headers["etag"] == f'"student-1-v{body["version"] + 1}-g0"'
+
+
+@pytest.mark.parametrize("change", ["join", "leave", "assign"])
+def test_group_change_by_another_student_refreshes_body_and_etag(client, cache_backend, change):
+    first = client.get("/students/1")
+    student = first.json()
+    group_id = student["group_id"]
+    other = group_mate(client, student)
+    if change == "join":
+        client.put(f"/students/{other['id']}/group/{group_id}")
+    elif change == "leave":
+        leaving = next(s for s in client.get(f"/groups/{group_id}/students").json() if s["id"] != 1)
+        client.delete(f"/students/{leaving['id']}/group")
+    else:
+        client.put(f"/groups/{group_id}/students", json={"student_ids": [other["id"]]})
+
+    second = client.get("/students/1", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 200
+    assert second.json()["group"]["version"] == student["group"]["version"] + 1
+    assert second.json() == client.get("/students/1").json()
+    assert second.headers["etag"] != first.headers["etag"]
+
+    # Без изменений — 304 по новому ETag
+    third = client.get("/students/1", headers={"If-None-Match": second.headers["etag"]})
+    assert third.status_code == 304
+
+
+def test_cached_student_uses_current_group(client, cache_backend):
+    student = client.get("/students/1").json()
+    other = group_mate(client, student)
+    client.put(f"/students/{other['id']}/group/{student['group_id']}")
+    group = client.get(f"/groups/{student['group_id']}").json()
+    assert client.get("/students/1").json()["group"] == group
+
+
+def test_group_roster_costs_etag_query_plus_one(client, statements):
+    statements.reset()
+    first = client.get("/groups/1/students")
+    # Один запрос ETag состава и один запрос студентов с группами
+    assert first.status_code == 200 and statements.count == 2
+
+    statements.reset()
+    # Совпавший ETag: 304 без чтения состава
+    assert client.get("/groups/1/students", headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+    assert statements.count == 1
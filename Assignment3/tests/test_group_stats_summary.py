@@ -0,0 +1,46 @@
+# Assignment3/tests/test_group_stats_summary.py
+"""Сводная таблица group_age_counts: пересборка только по необходимости и согласованность с students."""
+import pytest
+
+from app.core.config import settings
+from app.services import stats_service
+
+
+@pytest.fixture
+def summary_engine(engine, monkeypatch):
+    monkeypatch.setattr(stats_service, "engine", engine)
+    return engine
+
+
+def stats(client):
+    return client.get("/groups/stats").json()
+
+
+def test_rebuild_runs_only_when_summary_is_not_valid(summary_engine, statements):
+    assert stats_service.ensure_group_age_counts() is True
+    statements.reset()
+    assert stats_service.ensure_group_age_counts() is False
+    assert statements.count == 1
+
+    # Воркер с выключенным режимом снимает отметку: следующий старт с режимом пересобирает
+    stats_service.mark_group_age_counts_stale()
+    assert stats_service.ensure_group_age_counts() is True
+    assert stats_service.ensure_group_age_counts() is False
+
+
+def test_summary_matches_students_after_mutations(client, summary_engine, monkeypatch):
+    expected = stats(client)
+    monkeypatch.setattr(settings, "GROUP_STATS_SUMMARY", True)
+    stats_service.ensure_group_age_counts()
+    assert stats(client) == expected
+
+    client.put("/students/1/group/3")
+    client.delete("/students/2/group")
+    client.delete("/students/3")
+    client.post("/students/", json={"fio": "Петров Петр", "age": 40, "group_id": 4})
+    client.put("/groups/5/students", json={"student_ids": [4, 5, 6]})
+    client.delete("/groups/1")
+    with_summary = stats(client)
+
+    monkeypatch.setattr(settings, "GROUP_STATS_SUMMARY", False)
+    assert with_summary == stats(client)
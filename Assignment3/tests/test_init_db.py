@@ -0,0 +1,32 @@
+# Assignment3/tests/test_init_db.py
+"""init_db: DDL только под блокировкой, быстрый путь — одно чтение без создания таблиц."""
+import pytest
+from sqlalchemy import create_engine, inspect
+
+from app.db import database
+from db_helpers import StatementCounter
+
+
+@pytest.fixture
+def fresh_engine(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    monkeypatch.setattr(database, "engine", engine)
+    yield engine
+    engine.dispose()
+
+
+def test_fast_path_read_does_not_create_schema_version(fresh_engine):
+    with fresh_engine.connect() as conn:
+        assert database._read_fingerprint(conn) is None
+    assert not inspect(fresh_engine).has_table("schema_version")
+
+
+def test_init_db_creates_schema_once(fresh_engine):
+    assert database.init_db() is True
+    assert {"students", "groups", "schema_version"} <= set(inspect(fresh_engine).get_table_names())
+
+    statements = StatementCounter(fresh_engine)
+    assert database.init_db() is False
+    # SELECT 1 из wait_for_db и чтение отметки
+    assert statements.count == 2
+    assert not any("CREATE" in statement for statement in statements.statements)
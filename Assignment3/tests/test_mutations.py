@@ -0,0 +1,78 @@
+# Assignment3/tests/test_mutations.py
+"""
+Число SQL-команд в мутаторах студента и группы: ORM-путь и одна команда
+UPDATE/DELETE ... RETURNING (MUTATION_MODE=returning, только PostgreSQL).
+"""
+import os
+
+import pytest
+
+from app.core.config import settings
+
+
+# --- ORM-путь (и запасной путь returning вне PostgreSQL) ---
+
+@pytest.mark.parametrize("mode", ["orm", "returning"])
+def test_transfer_statements_on_sqlite(client, statements, monkeypatch, mode):
+    monkeypatch.setattr(settings, "MUTATION_MODE", mode)
+    statements.reset()
+    response = client.put("/students/1/group/2")
+    assert response.status_code == 200 and response.json()["group_id"] == 2
+    # SELECT студента, UPDATE студента, UPDATE версий групп, refresh
+    assert statements.count == 4
+
+
+# --- Мутации одной командой (MUTATION_MODE=returning, только PostgreSQL) ---
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+
+@pytest.fixture
+def pg_session():
+    if not POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL не задан: изменяющие CTE есть только в PostgreSQL")
+    from sqlalchemy import create_engine
+
+    from db_helpers import StatementCounter, make_session_factory, seed
+    from app.db.database import Base
+
+    engine = create_engine(POSTGRES_URL)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    seed(engine, 50, 3, ungrouped_share=0.0)
+    counter = StatementCounter(engine)
+    with make_session_factory(engine)() as db:
+        yield db, counter
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+def test_returning_transfer_is_one_statement(pg_session, monkeypatch):
+    from app.services import student_service
+
+    db, counter = pg_session
+    monkeypatch.setattr(settings, "MUTATION_MODE", "returning")
+    counter.reset()
+    student = student_service.transfer_student(db, 1, 2)
+    assert counter.count == 1
+    assert student.group_id == 2 and student.group.id == 2
+
+
+def test_returning_transfer_to_missing_group_is_one_statement(pg_session, monkeypatch):
+    from app.services import student_service
+
+    db, counter = pg_session
+    monkeypatch.setattr(settings, "MUTATION_MODE", "returning")
+    counter.reset()
+    assert student_service.transfer_student(db, 1, 999) is None
+    assert counter.count == 1
+
+
+def test_returning_delete_group_is_one_statement(pg_session, monkeypatch):
+    from app.services import group_service
+
+    db, counter = pg_session
+    monkeypatch.setattr(settings, "MUTATION_MODE", "returning")
+    counter.reset()
+    assert group_service.delete_group(db, 1) is not None
+    assert counter.count == 1
@@ -0,0 +1,85 @@
+# Assignment3/tests/test_pagination.py
+"""Курсоры keyset-пагинации: неверный курсор — 400, а не ошибка БД."""
+import pytest
+
+from app.core.config import settings
+from app.core.pagination import encode_cursor
+
+
+@pytest.mark.parametrize("fast_path", [False, True])
+@pytest.mark.parametrize("url, params", [
+    ("/students/", {"paging": "cursor"}),
+    ("/students/", {"paging": "cursor", "order": "fio"}),
+    ("/groups/", {"paging": "cursor"}),
+])
+def test_cursor_page_is_one_statement(client, statements, monkeypatch, fast_path, url, params):
+    monkeypatch.setattr(settings, "LIST_FAST_PATH", fast_path)
+    first = client.get(url, params={**params, "limit": 100}).json()
+    statements.reset()
+    # Следующая страница — тоже один запрос: без COUNT и без OFFSET
+    response = client.get(url, params={"cursor": first["next_cursor"], "order": params.get("order", "id"), "limit": 100})
+    assert response.status_code == 200 and response.json()["items"]
+    assert statements.count == 1
+
+
+def test_cursor_round_trip(client):
+    first = client.get("/students/", params={"paging": "cursor", "order": "fio", "limit": 10}).json()
+    second = client.get("/students/", params={"cursor": first["next_cursor"], "order": "fio", "limit": 10}).json()
+    assert second["items"]
+    assert (first["items"][-1]["fio"], first["items"][-1]["id"]) < (second["items"][0]["fio"], second["items"][0]["id"])
+
+
+@pytest.mark.parametrize("fast_path", [False, True])
+@pytest.mark.parametrize("order, values", [
+    ("id", ["abc"]),
+    ("id", [True]),
+    ("id", [1.5]),
+    ("id", [None]),
+    ("fio", [1, 2]),
+    ("fio", ["Иванов", "2"]),
+    ("fio", ["Иванов"]),
+])
+def test_students_cursor_with_wrong_key_types_is_rejected(client, monkeypatch, fast_path, order, values):
+    monkeypatch.setattr(settings, "LIST_FAST_PATH", fast_path)
+    response = client.get("/students/", params={"cursor": encode_cursor(order, values), "order": order})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("order, values", [("id", ["1"]), ("id", [[1]]), ("name", [1]), ("name", [None])])
+def test_groups_cursor_with_wrong_key_types_is_rejected(client, order, values):
+    response = client.get("/groups/", params={"cursor": encode_cursor(order, values), "order": order})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", ["!!!", "bm90LWpzb24", encode_cursor("fio", ["Иванов", 1])])
+def test_malformed_or_foreign_cursor_is_rejected(client, cursor):
+    assert client.get("/students/", params={"cursor": cursor}).status_code == 400
+
+
+@pytest.mark.parametrize("fast_path", [False, True])
+@pytest.mark.parametrize("url, params", [
+    ("/students/", {}),
+    ("/students/", {"paging": "cursor"}),
+    ("/students/", {"paging": "cursor", "order": "fio"}),
+    ("/groups/", {}),
+    ("/groups/", {"paging": "cursor"}),
+])
+@pytest.mark.parametrize("limit", [0, -1, 1001])
+def test_out_of_range_limit_is_rejected(client, monkeypatch, fast_path, url, params, limit):
+    monkeypatch.setattr(settings, "LIST_FAST_PATH", fast_path)
+    assert client.get(url, params={**params, "limit": limit}).status_code == 422
+
+
+@pytest.mark.parametrize("url", ["/students/", "/groups/"])
+def test_negative_skip_is_rejected(client, url):
+    assert client.get(url, params={"skip": -1}).status_code == 422
+
+
+@pytest.mark.parametrize("url, params", [
+    ("/students/", {"paging": "cursor"}),
+    ("/students/", {"paging": "cursor", "order": "fio"}),
+    ("/groups/", {"paging": "cursor"}),
+])
+def test_cursor_page_of_one(client, url, params):
+    page = client.get(url, params={**params, "limit": 1}).json()
+    assert len(page["items"]) == 1 and page["next_cursor"]
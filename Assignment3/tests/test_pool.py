@@ -0,0 +1,138 @@
+# Assignment3/tests/test_pool.py
+"""
+Доля пула на воркер (DB_MAX_CONNECTIONS / WEB_CONCURRENCY) и прогрев пула при старте.
+Вместо PostgreSQL — файловая SQLite с QueuePool и счетчиком новых подключений.
+"""
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+from app.db.database import pool_options, warm_up_pool
+
+
+@pytest.fixture
+def pool_settings(monkeypatch):
+    """Значения по умолчанию, не зависящие от окружения."""
+    for key, value in {
+        "DB_MODE": "sync", "WEB_CONCURRENCY": 1, "DB_MAX_CONNECTIONS": 80,
+        "DB_POOL_SIZE": None, "DB_MAX_OVERFLOW": None, "DB_POOL_WARMUP": None,
+    }.items():
+        monkeypatch.setattr(settings, key, value)
+    return settings
+
+
+def pool_sizes(**overrides):
+    for key, value in overrides.items():
+        setattr(settings, key, value)
+    options = pool_options()
+    return options["pool_size"], options["max_overflow"]
+
+
+# --- Доля воркера в общем бюджете соединений ---
+
+@pytest.mark.parametrize("workers, max_connections, expected", [
+    (1, 80, (60, 20)),
+    (4, 80, (15, 5)),
+    (3, 80, (20, 6)),    # 80 // 3 = 26
+    (8, 20, (2, 0)),     # 20 // 8 = 2
+    (100, 80, (1, 0)),   # доля не меньше одного соединения
+    (0, 10, (8, 2)),     # WEB_CONCURRENCY=0 считается одним воркером
+])
+def test_budget_is_split_between_workers(pool_settings, workers, max_connections, expected):
+    pool_size, max_overflow = pool_sizes(WEB_CONCURRENCY=workers, DB_MAX_CONNECTIONS=max_connections)
+    assert (pool_size, max_overflow) == expected
+    if workers <= max_connections:
+        assert max(workers, 1) * (pool_size + max_overflow) <= max_connections
+
+
+def test_async_mode_reserves_one_connection_for_auxiliary_engine(pool_settings):
+    pool_size, max_overflow = pool_sizes(DB_MODE="async", WEB_CONCURRENCY=4, DB_MAX_CONNECTIONS=80)
+    assert pool_size + max_overflow == 80 // 4 - 1
+    auxiliary = pool_options(serving=False)
+    assert (auxiliary["pool_size"], auxiliary["max_overflow"]) == (1, 0)
+
+
+def test_explicit_sizes_are_clamped_to_worker_share(pool_settings, capsys):
+    assert pool_sizes(WEB_CONCURRENCY=4, DB_MAX_CONNECTIONS=80, DB_POOL_SIZE=30, DB_MAX_OVERFLOW=10) == (20, 0)
+    assert "уменьшен" in capsys.readouterr().out
+    assert pool_sizes(DB_POOL_SIZE=10, DB_MAX_OVERFLOW=10) == (10, 10)
+
+
+# --- Прогрев пула ---
+
+@pytest.fixture
+def stand_in_engine(tmp_path, pool_settings):
+    """Движок с пулом из pool_options; connects — число реально открытых подключений."""
+    path = str(tmp_path / "pool.db")
+    pool_settings.WEB_CONCURRENCY = 4
+    engine = create_engine(
+        "sqlite://", creator=lambda: sqlite3.connect(path, check_same_thread=False),
+        poolclass=QueuePool, **pool_options(),
+    )
+    engine.connects = 0
+
+    @event.listens_for(engine, "connect")
+    def _count(*_):
+        engine.connects += 1
+
+    yield engine
+    engine.dispose()
+
+
+def test_warm_up_opens_whole_pool(stand_in_engine):
+    assert warm_up_pool(stand_in_engine) == 15
+    assert stand_in_engine.connects == 15
+    assert stand_in_engine.pool.checkedin() == 15
+
+
+def test_warm_up_honours_db_pool_warmup(stand_in_engine, pool_settings):
+    pool_settings.DB_POOL_WARMUP = 4
+    assert warm_up_pool(stand_in_engine) == 4
+    assert stand_in_engine.connects == 4
+
+
+def test_first_wave_after_warm_up_opens_no_connections(stand_in_engine):
+    warm_up_pool(stand_in_engine)
+    clients = stand_in_engine.pool.size()
+    barrier = threading.Barrier(clients)
+
+    def request():
+        with stand_in_engine.connect() as conn:
+            barrier.wait()
+            conn.execute(text("SELECT 1"))
+
+    threads = [threading.Thread(target=request) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert stand_in_engine.connects == clients
+
+
+def test_async_warm_up_opens_whole_pool(tmp_path, pool_settings, monkeypatch):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from app.db import async_database
+
+    pool_settings.DB_MODE = "async"
+    pool_settings.WEB_CONCURRENCY = 4
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}", poolclass=AsyncAdaptedQueuePool, **pool_options(),
+    )
+    connects = []
+    event.listen(engine.sync_engine, "connect", lambda *_: connects.append(1))
+    monkeypatch.setattr(async_database, "async_engine", engine)
+
+    async def scenario():
+        warmed = await async_database.warm_up_async_pool()
+        await engine.dispose()
+        return warmed
+
+    # Доля 80 // 4 = 20 без одного соединения вспомогательного движка: 15 + 4 overflow
+    assert asyncio.run(scenario()) == 15
+    assert len(connects) == 15
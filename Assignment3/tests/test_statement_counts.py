@@ -0,0 +1,30 @@
+# Assignment3/tests/test_statement_counts.py
+"""
+Число SQL-команд на запрос: защита от возврата N+1 (ленивая загрузка Student.group).
+"""
+
+
+def count(client, statements, method: str, url: str, **kwargs) -> int:
+    statements.reset()
+    response = client.request(method, url, **kwargs)
+    assert response.status_code < 400, response.text
+    return statements.count
+
+
+# --- Чтение: стратегии загрузки группы ---
+
+def test_students_list_joined_is_one_statement(client, statements):
+    assert count(client, statements, "GET", "/students/", params={"limit": 100, "load": "joined"}) == 1
+
+
+def test_students_list_selectin_is_two_statements(client, statements):
+    assert count(client, statements, "GET", "/students/", params={"limit": 100, "load": "selectin"}) == 2
+
+
+def test_students_list_lazy_loads_each_group(client, statements):
+    # Эталон N+1: по запросу на каждую различную группу страницы (повторы берутся из identity map)
+    assert count(client, statements, "GET", "/students/", params={"limit": 100, "load": "lazy"}) > 2
+
+
+def test_student_read_is_one_statement(client, statements):
+    assert count(client, statements, "GET", "/students/1") == 1
@@ -0,0 +1,190 @@
+# Assignment4/app/bulk_import.py
+"""
+Массовый импорт пользователей из NDJSON или CSV.
+
+    python -m app.bulk_import users.ndjson > report.ndjson
+    python -m app.bulk_import users.csv --format csv --batch-size 5000
+
+Каждая строка содержит email и либо password (будет захеширован в пуле процессов),
+либо hashed_password (уже в формате passlib). Файл читается потоково, вставка
+выполняется пачками одной командой INSERT ... ON CONFLICT DO NOTHING.
+Результат по каждой строке пишется в stdout в формате NDJSON, итог — в stderr.
+"""
+import sys
+import csv
+import json
+import time
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from .database import engine as default_engine
+from .hashing import HASH_WORKERS
+from .models import User
+from .schemas import UserImport
+from .security import configure_password_hashing, hash_password, is_valid_password_hash, resolve_hash_rounds
+
+# Размер пачки по умолчанию (2 параметра на строку, лимит PostgreSQL — 32767 параметров)
+DEFAULT_BATCH_SIZE = 5000
+MAX_BATCH_SIZE = 16000
+
+
+def read_rows(source: TextIO, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """Потоково читает строки файла: (номер строки, dict или текст ошибки)."""
+    if fmt == "csv":
+        # Строка 1 — заголовок
+        for line_no, row in enumerate(csv.DictReader(source), start=2):
+            yield line_no, {key: value for key, value in row.items() if value not in (None, "")}
+        return
+
+    for line_no, line in enumerate(source, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, f"Invalid JSON: {e}"
+
+
+def _insert_statement(engine: AsyncEngine, rows: List[Dict[str, str]]):
+    """INSERT ... ON CONFLICT DO NOTHING RETURNING для текущего диалекта."""
+    dialect_insert = postgresql.insert if engine.dialect.name == "postgresql" else sqlite.insert
+    return (
+        dialect_insert(User)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User.id, User.email)
+    )
+
+
+async def import_batch(
+    engine: AsyncEngine,
+    pool: Optional[ProcessPoolExecutor],
+    batch: List[Tuple[int, Any]],
+) -> List[Dict[str, Any]]:
+    """Валидирует, хеширует и вставляет одну пачку. Возвращает результаты по строкам."""
+    results: Dict[int, Dict[str, Any]] = {}
+    valid: Dict[str, Tuple[int, UserImport]] = {}
+
+    # 1. Валидация и удаление дубликатов внутри пачки
+    for line_no, raw in batch:
+        if isinstance(raw, str):
+            results[line_no] = {"line": line_no, "status": "invalid", "error": raw}
+            continue
+        try:
+            user = UserImport.model_validate(raw)
+        except ValidationError as e:
+            results[line_no] = {"line": line_no, "status": "invalid", "error": e.errors(include_url=False)[0]["msg"]}
+            continue
+        if user.hashed_password is not None and not is_valid_password_hash(user.hashed_password):
+            # Иначе строка импортируется, а вход с ней всегда завершается ошибкой
+            results[line_no] = {
+                "line": line_no, "email": user.email, "status": "invalid", "error": "Unrecognized hashed_password format",
+            }
+            continue
+        if user.email in valid:
+            results[line_no] = {"line": line_no, "email": user.email, "status": "duplicate"}
+            continue
+        valid[user.email] = (line_no, user)
+
+    # 2. Параллельное хеширование открытых паролей
+    to_hash = [user for _, user in valid.values() if user.hashed_password is None]
+    if to_hash:
+        loop = asyncio.get_running_loop()
+        hashes = await asyncio.gather(*(
+            loop.run_in_executor(pool, hash_password, user.password) for user in to_hash
+        ))
+        for user, hashed in zip(to_hash, hashes):
+            user.hashed_password = hashed
+
+    # 3. Одна многострочная вставка на пачку
+    inserted: Dict[str, int] = {}
+    if valid:
+        rows = [{"email": email, "hashed_password": user.hashed_password} for email, (_, user) in valid.items()]
+        async with engine.begin() as conn:
+            result = await conn.execute(_insert_statement(engine, rows))
+            inserted = {email: user_id for user_id, email in result.all()}
+
+    for email, (line_no, _) in valid.items():
+        if email in inserted:
+            results[line_no] = {"line": line_no, "email": email, "status": "created", "id": inserted[email]}
+        else:
+            results[line_no] = {"line": line_no, "email": email, "status": "exists"}
+
+    return [results[line_no] for line_no, _ in batch]
+
+
+async def run_import(
+    source: TextIO,
+    report: TextIO,
+    fmt: str = "ndjson",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    engine: AsyncEngine = default_engine,
+    workers: int = HASH_WORKERS,
+) -> Dict[str, int]:
+    """Импортирует весь файл; возвращает счетчики по статусам."""
+    batch_size = min(max(batch_size, 1), MAX_BATCH_SIZE)
+    counters: Dict[str, int] = {"created": 0, "exists": 0, "duplicate": 0, "invalid": 0}
+    # Та же стоимость хеширования, что и у сервиса, иначе хеши будут пересчитаны при входе
+    hash_rounds = resolve_hash_rounds()
+    configure_password_hashing(hash_rounds)
+    pool = (
+        ProcessPoolExecutor(max_workers=workers, initializer=configure_password_hashing, initargs=(hash_rounds,))
+        if workers > 0 else None
+    )
+
+    async def flush(batch: List[Tuple[int, Any]]) -> None:
+        for outcome in await import_batch(engine, pool, batch):
+            counters[outcome["status"]] += 1
+            report.write(json.dumps(outcome, ensure_ascii=False) + "\n")
+
+    try:
+        batch: List[Tuple[int, Any]] = []
+        for item in read_rows(source, fmt):
+            batch.append(item)
+            if len(batch) >= batch_size:
+                await flush(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return counters
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="путь к файлу ('-' — stdin)")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--database-url", default=None, help="переопределить DATABASE_URL (например, sqlite+aiosqlite)")
+    args = parser.parse_args()
+
+    engine = create_async_engine(args.database_url) if args.database_url else default_engine
+    source = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8", newline="")
+    started = time.perf_counter()
+    try:
+        counters = await run_import(source, sys.stdout, args.format, args.batch_size, engine)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        await engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    total = sum(counters.values())
+    print(
+        f"Импорт завершен за {elapsed:.2f} сек: {counters} "
+        f"({total / elapsed if elapsed else 0:.0f} строк/сек)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,10 +1,17 @@
 # Assignment4/app/database.py
 import os
+import time
+import random
 import asyncio
-from sqlalchemy import text
+import hashlib
+from sqlalchemy import Column, Integer, MetaData, String, Table, delete, insert, inspect, select, text
+from sqlalchemy.schema import CreateIndex, CreateTable
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import DBAPIError, OperationalError, ProgrammingError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from .metrics import DB_POOL_WAIT
 
 # --- 1. Конфигурация и строка подключения ---
 # Получение настроек БД из переменных окружения (должны совпадать с docker-compose.yml)
@@ -24,10 +31,21 @@ class Base(DeclarativeBase):
 
 # --- 3. Настройка движка и сессии ---
 
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, измеряющий время ожидания свободного соединения."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - started)
+
 # Создание асинхронного движка
 engine = create_async_engine(
     DATABASE_URL, 
-    echo=False # В продакшене лучше ставить False
+    echo=False, # В продакшене лучше ставить False
+    poolclass=TimedAsyncQueuePool,
 )
 
 # Фабрика асинхронных сессий
@@ -54,37 +72,123 @@ async def get_async_session() -> AsyncSession:
 
 # --- 5. Инициализация БД (вызывается из lifespan в main.py) ---
 
+# Параметры ожидания БД: экспоненциальная задержка со случайным разбросом (full jitter)
+DB_CONNECT_MAX_ATTEMPTS = int(os.environ.get("DB_CONNECT_MAX_ATTEMPTS", "10"))
+DB_CONNECT_BASE_DELAY = float(os.environ.get("DB_CONNECT_BASE_DELAY", "0.2"))  # секунды
+DB_CONNECT_MAX_DELAY = float(os.environ.get("DB_CONNECT_MAX_DELAY", "5"))      # секунды
+
+# Ключ advisory lock PostgreSQL: DDL при старте выполняет только один процесс
+SCHEMA_LOCK_KEY = 4_004_004
+
+# Отметка версии схемы (отдельные метаданные — не входит в Base.metadata)
+schema_version_table = Table(
+    "schema_version",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+)
+
+# Признак готовности (используется проверкой /health/ready)
+db_initialized = False
+
+
+def schema_fingerprint(dialect) -> str:
+    """Хеш DDL всех таблиц и индексов: меняется при любом изменении моделей."""
+    from . import models  # noqa: F401 — регистрация моделей в Base.metadata
+
+    digest = hashlib.sha256()
+    for table in Base.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda idx: idx.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    return digest.hexdigest()
+
+
+async def wait_for_db() -> None:
+    """Ожидание доступности БД с экспоненциальной задержкой и jitter."""
+    for attempt in range(1, DB_CONNECT_MAX_ATTEMPTS + 1):
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            return
+        except (DBAPIError, OSError) as e:
+            if attempt == DB_CONNECT_MAX_ATTEMPTS:
+                print("Превышено количество попыток. БД недоступна.")
+                raise
+            delay = random.uniform(0, min(DB_CONNECT_MAX_DELAY, DB_CONNECT_BASE_DELAY * 2 ** attempt))
+            print(f"БД недоступна ({attempt}/{DB_CONNECT_MAX_ATTEMPTS}): {e}. Повтор через {delay:.2f} сек...")
+            await asyncio.sleep(delay)
+
+
+async def _read_fingerprint(conn) -> str | None:
+    """
+    Отметка версии схемы; None, если таблицы schema_version еще нет (новая БД).
+    Таблица создается только под advisory lock в init_db: одновременный
+    CREATE TABLE из нескольких процессов завершался бы ошибкой у проигравших.
+    """
+    try:
+        result = await conn.execute(select(schema_version_table.c.fingerprint).where(schema_version_table.c.id == 1))
+    except (ProgrammingError, OperationalError):
+        # PostgreSQL: UndefinedTable (транзакция прервана — вызывающий только откатывает ее);
+        # SQLite: "no such table"
+        return None
+    return result.scalar()
+
+
+def _create_missing_indexes(conn) -> None:
+    """
+    create_all не добавляет индексы к уже существующим таблицам: создаем недостающие
+    индексы моделей (например, ix_login_history_user_id_login_time) до записи отметки схемы.
+    """
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(conn)
+                print(f"Создан индекс {index.name}.")
+
+
 async def init_db():
     """
-    Попытка подключения к БД и создание таблиц.
-    Включает логику повторных попыток (retry) для ожидания запуска БД.
+    Ожидание БД и создание таблиц.
+    DDL выполняется только если отметка версии схемы не совпадает с текущими моделями,
+    поэтому обычный перезапуск стоит одного SELECT.
     """
-    MAX_RETRIES = 10
-    RETRY_DELAY = 3   # секунды
-    
-    for attempt in range(MAX_RETRIES):
-        try:
-            print(f"Попытка инициализации БД {attempt + 1}/{MAX_RETRIES}...")
-            
-            async with engine.begin() as conn:
-                # 1. Проверка соединения
-                await conn.execute(text("SELECT 1"))
-                
-                # 2. Создание всех таблиц, которые еще не существуют
-                await conn.run_sync(Base.metadata.create_all)
-                
-            print("БД успешно инициализирована.")
-            return # Успех, выход из функции
-        
-        except OperationalError as e:
-            # OperationalError обычно означает, что БД еще не готова
-            if attempt < MAX_RETRIES - 1:
-                print(f"Ошибка подключения: {e}. Повтор через {RETRY_DELAY} сек...")
-                await asyncio.sleep(RETRY_DELAY)
-            else:
-                print("Превышено количество попыток. Не удалось инициализировать БД.")
-                raise # Пробрасываем исключение после всех попыток
-        
-        except Exception as e:
-            print(f"Неожиданная ошибка при инициализации БД: {e}")
-            raise # Пробрасываем остальные ошибки
\ No newline at end of file
+    global db_initialized
+    await wait_for_db()
+
+    fingerprint = schema_fingerprint(engine.dialect)
+
+    # Быстрый путь: схема уже актуальна (только чтение, соединение закрывается с откатом)
+    async with engine.connect() as conn:
+        if await _read_fingerprint(conn) == fingerprint:
+            print("Схема БД актуальна, DDL пропущен.")
+            db_initialized = True
+            return
+
+    async with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            # Остальные процессы ждут здесь и затем видят уже обновленную отметку
+            await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        await conn.run_sync(schema_version_table.create, checkfirst=True)
+        if await _read_fingerprint(conn) != fingerprint:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(_create_missing_indexes)
+            await conn.execute(delete(schema_version_table))
+            await conn.execute(insert(schema_version_table).values(id=1, fingerprint=fingerprint))
+            print("Схема БД обновлена.")
+
+    db_initialized = True
+
+
+async def check_db_ready() -> bool:
+    """Проверка готовности: БД инициализирована и отвечает на запрос."""
+    if not db_initialized:
+        return False
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return True
+    except (DBAPIError, OSError):
+        return False
@@ -0,0 +1,102 @@
+# Assignment4/app/hashing.py
+import os
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, status
+
+from .security import configure_password_hashing, hash_password, verify_password
+
+# --------------------------------------------------
+# Конфигурация пула хеширования
+# --------------------------------------------------
+# Количество процессов-воркеров (по умолчанию — число ядер).
+# HASH_WORKERS=0 отключает пул: хеширование выполняется прямо в event loop
+# (удобно для локальной отладки, но блокирует обработку других запросов).
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+
+# Максимальное число задач хеширования (выполняемых + ожидающих).
+# При превышении запрос сразу получает 503, а не копится в очереди.
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", str(max(HASH_WORKERS, 1) * 8)))
+
+# Значение заголовка Retry-After (секунды) для ответа 503
+HASH_RETRY_AFTER_SECONDS = os.getenv("HASH_RETRY_AFTER_SECONDS", "1")
+
+
+class HashingExecutor:
+    """
+    Ограниченный пул процессов для CPU-bound операций с паролями.
+    Не дает pbkdf2 блокировать event loop uvicorn и быстро отказывает (503),
+    если очередь переполнена.
+    """
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._pool: Optional[Executor] = None
+        self._pending = 0
+        self._hash_rounds: Optional[int] = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Текущее количество задач в пуле (выполняемых и ожидающих)."""
+        return self._pending
+
+    def configure(self, hash_rounds: int) -> None:
+        """Задает стоимость хеширования для процессов пула (вызывать до start)."""
+        self._hash_rounds = hash_rounds
+
+    def start(self) -> None:
+        """Создает пул процессов (идемпотентно)."""
+        if self._pool is None and self.workers > 0:
+            if self._hash_rounds is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=configure_password_hashing,
+                    initargs=(self._hash_rounds,),
+                )
+
+    def shutdown(self) -> None:
+        """Останавливает пул, дожидаясь завершения текущих задач."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Выполняет функцию в пуле; при переполнении очереди возвращает 503."""
+        if self.workers <= 0:
+            return func(*args)
+
+        if self._pending >= self.queue_limit:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Password hashing is overloaded, try again later",
+                headers={"Retry-After": HASH_RETRY_AFTER_SECONDS},
+            )
+
+        self.start()
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, func, *args)
+        finally:
+            self._pending -= 1
+
+
+# Глобальный экземпляр (запускается и останавливается в lifespan в main.py)
+hashing_executor = HashingExecutor(workers=HASH_WORKERS, queue_limit=HASH_QUEUE_LIMIT)
+
+# --------------------------------------------------
+# Асинхронные обертки над функциями из security.py
+# --------------------------------------------------
+
+async def hash_password_async(password: str) -> str:
+    """Хеширование пароля в пуле процессов."""
+    return await hashing_executor.run(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Проверка пароля в пуле процессов."""
+    return await hashing_executor.run(verify_password, plain_password, hashed_password)
@@ -0,0 +1,169 @@
+# Assignment4/app/history_writer.py
+import os
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .models import LoginHistory
+
+# --------------------------------------------------
+# Конфигурация записи истории входов
+# --------------------------------------------------
+# Режим записи:
+#   sync    — строка пишется в транзакции запроса /login (максимальная надежность);
+#   batched — строки копятся в очереди и пишутся пачками фоновой задачей
+#             (при аварийном падении процесса может потеряться последнее окно).
+LOGIN_HISTORY_MODE = os.getenv("LOGIN_HISTORY_MODE", "batched").lower()
+# Максимальный размер пачки (строк) и окно накопления (мс)
+LOGIN_HISTORY_BATCH_SIZE = int(os.getenv("LOGIN_HISTORY_BATCH_SIZE", "500"))
+LOGIN_HISTORY_FLUSH_INTERVAL_MS = int(os.getenv("LOGIN_HISTORY_FLUSH_INTERVAL_MS", "200"))
+# Ограничение очереди; при переполнении /login ждет, пока фоновая задача освободит место
+LOGIN_HISTORY_QUEUE_LIMIT = int(os.getenv("LOGIN_HISTORY_QUEUE_LIMIT", "50000"))
+
+# Хранение истории: записи старше N дней удаляются (0 — хранить бессрочно)
+LOGIN_HISTORY_RETENTION_DAYS = int(os.getenv("LOGIN_HISTORY_RETENTION_DAYS", "0"))
+# Размер пачки удаления и пауза между пачками (короткие транзакции без долгих блокировок)
+LOGIN_HISTORY_PRUNE_BATCH_SIZE = int(os.getenv("LOGIN_HISTORY_PRUNE_BATCH_SIZE", "5000"))
+LOGIN_HISTORY_PRUNE_PAUSE_MS = int(os.getenv("LOGIN_HISTORY_PRUNE_PAUSE_MS", "50"))
+# Периодичность запуска очистки (сек)
+LOGIN_HISTORY_PRUNE_INTERVAL_SECONDS = int(os.getenv("LOGIN_HISTORY_PRUNE_INTERVAL_SECONDS", "3600"))
+
+
+class LoginHistoryWriter:
+    """
+    Фоновая запись LoginHistory пачками: одна многострочная INSERT-команда
+    на каждые batch_size строк или flush_interval, что наступит раньше.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, queue_limit: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_limit = queue_limit
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._engine: Optional[AsyncEngine] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self, engine: AsyncEngine) -> None:
+        """Запускает фоновую задачу (вызывается из lifespan)."""
+        if self._task is not None:
+            return
+        self._engine = engine
+        self._queue = asyncio.Queue(maxsize=self.queue_limit)
+        self._task = asyncio.create_task(self._run(), name="login-history-writer")
+
+    async def enqueue(self, user_id: int, user_agent: Optional[str], login_time: datetime) -> None:
+        """Ставит запись в очередь на пакетную вставку."""
+        await self._queue.put({"user_id": user_id, "user_agent": user_agent, "login_time": login_time})
+
+    async def stop(self) -> None:
+        """Останавливает фоновую задачу, предварительно записав все накопленные строки."""
+        if self._task is None:
+            return
+        # None — маркер завершения: задача допишет все, что стоит перед ним
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        self._queue = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            batch: List[Dict[str, Any]] = []
+            # Ждем первую строку без ограничения, затем добираем пачку в пределах окна
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch.append(item)
+            deadline = loop.time() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            async with self._engine.begin() as conn:
+                await conn.execute(insert(LoginHistory), batch)
+        except Exception as e:
+            # Ошибка записи истории не должна останавливать фоновую задачу
+            print(f"Ошибка записи истории входов ({len(batch)} строк): {e}")
+
+
+# Глобальный экземпляр (запускается и останавливается в lifespan в main.py)
+login_history_writer = LoginHistoryWriter(
+    batch_size=LOGIN_HISTORY_BATCH_SIZE,
+    flush_interval=LOGIN_HISTORY_FLUSH_INTERVAL_MS / 1000,
+    queue_limit=LOGIN_HISTORY_QUEUE_LIMIT,
+)
+
+
+# --------------------------------------------------
+# Очистка устаревшей истории
+# --------------------------------------------------
+
+async def prune_login_history(
+    engine: AsyncEngine,
+    older_than: datetime,
+    batch_size: int = LOGIN_HISTORY_PRUNE_BATCH_SIZE,
+    pause: float = LOGIN_HISTORY_PRUNE_PAUSE_MS / 1000,
+) -> int:
+    """
+    Удаляет записи старше older_than пачками по batch_size строк.
+    Каждая пачка — отдельная короткая транзакция; старые записи идут первыми
+    по первичному ключу, поэтому выборка пачки не сканирует всю таблицу.
+    Возвращает число удаленных строк.
+    """
+    total = 0
+    while True:
+        batch_ids = (
+            select(LoginHistory.id)
+            .where(LoginHistory.login_time < older_than)
+            .order_by(LoginHistory.id)
+            .limit(batch_size)
+        )
+        async with engine.begin() as conn:
+            result = await conn.execute(delete(LoginHistory).where(LoginHistory.id.in_(batch_ids)))
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            return total
+        await asyncio.sleep(pause)
+
+
+async def prune_login_history_periodically(
+    engine: AsyncEngine,
+    retention_days: int = LOGIN_HISTORY_RETENTION_DAYS,
+    interval: float = LOGIN_HISTORY_PRUNE_INTERVAL_SECONDS,
+) -> None:
+    """Фоновая задача очистки истории (запускается из lifespan при RETENTION_DAYS > 0)."""
+    while True:
+        try:
+            cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+            deleted = await prune_login_history(engine, cutoff)
+            if deleted:
+                print(f"Удалено устаревших записей истории входов: {deleted}")
+        except Exception as e:
+            print(f"Ошибка очистки истории входов: {e}")
+        await asyncio.sleep(interval)
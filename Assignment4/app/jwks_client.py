@@ -0,0 +1,78 @@
+# Assignment4/app/jwks_client.py
+"""
+Помощник для других сервисов: локальная проверка Access Token по JWKS
+без обращения к /me (ни сетевого запроса, ни запроса в БД на каждый вызов).
+
+    verifier = JWKSVerifier("http://auth:8000/.well-known/jwks.json")
+    payload = verifier.verify(token)   # JWTError, если токен недействителен
+"""
+import json
+import time
+import threading
+import urllib.request
+from typing import Any, Dict, Optional, Sequence
+
+from jose import JWTError, jwt
+from jose.exceptions import JWKError
+
+
+class JWKSVerifier:
+    """
+    Кэширует JWKS на cache_ttl секунд. Неизвестный kid (ротация ключа) вызывает
+    внеплановую загрузку, но не чаще min_refresh_interval.
+    """
+
+    def __init__(
+        self,
+        jwks_url: str,
+        cache_ttl: float = 300.0,
+        min_refresh_interval: float = 30.0,
+        algorithms: Sequence[str] = ("RS256",),
+        timeout: float = 5.0,
+    ):
+        self.jwks_url = jwks_url
+        self.cache_ttl = cache_ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.algorithms = list(algorithms)
+        self.timeout = timeout
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def _fetch(self) -> None:
+        """Загружает JWKS; сетевые ошибки и некорректный документ -> JWTError."""
+        try:
+            with urllib.request.urlopen(self.jwks_url, timeout=self.timeout) as response:
+                document = json.load(response)
+            keys = {key["kid"]: key for key in document.get("keys", []) if "kid" in key}
+        except (OSError, ValueError, AttributeError, TypeError) as e:
+            # OSError включает URLError и таймауты, ValueError — некорректный JSON
+            raise JWTError(f"Cannot load JWKS from {self.jwks_url}: {e}") from e
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+    def _get_key(self, kid: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            age = time.monotonic() - self._fetched_at
+            key = self._keys.get(kid)
+            if age >= self.cache_ttl or (key is None and age >= self.min_refresh_interval):
+                self._fetch()
+                key = self._keys.get(kid)
+            return key
+
+    def verify(self, token: str, expected_type: str = "access") -> Dict[str, Any]:
+        """Проверяет подпись, срок действия и тип токена; возвращает payload."""
+        kid = jwt.get_unverified_header(token).get("kid")
+        if not kid:
+            raise JWTError("Token header has no kid")
+        key = self._get_key(kid)
+        if key is None:
+            raise JWTError(f"Unknown signing key: {kid}")
+        try:
+            payload = jwt.decode(token, key, algorithms=self.algorithms)
+        except JWKError as e:
+            # Некорректный ключ в JWKS — тоже недействительный токен для вызывающего кода
+            raise JWTError(f"Invalid signing key {kid}: {e}") from e
+        if payload.get("type") != expected_type:
+            raise JWTError("Unexpected token type")
+        return payload
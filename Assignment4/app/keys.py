@@ -0,0 +1,197 @@
+# Assignment4/app/keys.py
+import os
+import sys
+import asyncio
+import time
+import base64
+import secrets
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+# --------------------------------------------------
+# Конфигурация ключей подписи
+# --------------------------------------------------
+# Каталог с закрытыми ключами в PEM (имя файла без .pem — kid).
+# Ключ с наибольшим kid подписывает, все остальные — только проверяют подпись.
+# Если каталог не задан, при первом обращении генерируется временный ключ
+# (подходит только для одного процесса и разработки).
+JWT_KEYS_DIR = os.getenv("JWT_KEYS_DIR", "")
+# Как часто перечитывать каталог ключей (сек), чтобы подхватить ротацию
+JWT_KEYS_RELOAD_SECONDS = float(os.getenv("JWT_KEYS_RELOAD_SECONDS", "60"))
+# Минимальный интервал между внеплановыми перечитываниями (при неизвестном kid)
+JWT_KEYS_MIN_RELOAD_INTERVAL_SECONDS = float(os.getenv("JWT_KEYS_MIN_RELOAD_INTERVAL_SECONDS", "5"))
+# Сколько ключей хранить в памяти без каталога (текущий + предыдущие)
+JWT_MAX_IN_MEMORY_KEYS = int(os.getenv("JWT_MAX_IN_MEMORY_KEYS", "3"))
+RSA_KEY_SIZE = 2048
+
+
+def _b64url_uint(value: int) -> str:
+    """Кодирование целого числа в base64url без выравнивания (RFC 7518)."""
+    raw = value.to_bytes((value.bit_length() + 7) // 8, "big")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _new_kid() -> str:
+    """kid сортируется по времени создания: 20250101T120000-1a2b3c4d."""
+    return f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{secrets.token_hex(4)}"
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    """Пара ключей RS256 с идентификатором."""
+    kid: str
+    private_pem: str
+    public_pem: str
+    jwk: Dict[str, str]
+
+    @classmethod
+    def from_private_key(cls, kid: str, private_key: rsa.RSAPrivateKey) -> "SigningKey":
+        public_key = private_key.public_key()
+        numbers = public_key.public_numbers()
+        private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode()
+        public_pem = public_key.public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        ).decode()
+        jwk = {
+            "kty": "RSA",
+            "use": "sig",
+            "alg": "RS256",
+            "kid": kid,
+            "n": _b64url_uint(numbers.n),
+            "e": _b64url_uint(numbers.e),
+        }
+        return cls(kid=kid, private_pem=private_pem, public_pem=public_pem, jwk=jwk)
+
+    @classmethod
+    def generate(cls) -> "SigningKey":
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=RSA_KEY_SIZE)
+        return cls.from_private_key(_new_kid(), private_key)
+
+
+class KeyRing:
+    """Набор ключей подписи: текущий ключ подписывает, предыдущие остаются для проверки."""
+
+    def __init__(self, keys_dir: str = JWT_KEYS_DIR):
+        self.keys_dir = Path(keys_dir) if keys_dir else None
+        self._keys: Dict[str, SigningKey] = {}
+        self._lock = threading.Lock()
+        self._last_reload = 0.0
+
+    # --- Загрузка и ротация ---
+
+    def reload(self) -> None:
+        """Перечитывает ключи из каталога (или создает временный ключ)."""
+        with self._lock:
+            self._last_reload = time.monotonic()
+            if self.keys_dir is None:
+                if not self._keys:
+                    key = SigningKey.generate()
+                    self._keys = {key.kid: key}
+                return
+
+            keys = {}
+            for path in sorted(self.keys_dir.glob("*.pem")):
+                known = self._keys.get(path.stem)
+                if known is not None:
+                    keys[path.stem] = known
+                    continue
+                private_key = serialization.load_pem_private_key(path.read_bytes(), password=None)
+                keys[path.stem] = SigningKey.from_private_key(path.stem, private_key)
+            if not keys:
+                raise RuntimeError(f"В каталоге {self.keys_dir} нет ключей подписи (*.pem)")
+            self._keys = keys
+
+    def rotate(self) -> SigningKey:
+        """Создает новый ключ подписи; предыдущие остаются для проверки выданных токенов."""
+        key = SigningKey.generate()
+        if self.keys_dir is not None:
+            self.keys_dir.mkdir(parents=True, exist_ok=True)
+            path = self.keys_dir / f"{key.kid}.pem"
+            path.write_text(key.private_pem)
+            path.chmod(0o600)
+            self.reload()
+            return key
+
+        with self._lock:
+            self._keys[key.kid] = key
+            for kid in sorted(self._keys)[:-JWT_MAX_IN_MEMORY_KEYS]:
+                del self._keys[kid]
+        return key
+
+    def _ensure_loaded(self) -> None:
+        if not self._keys:
+            self.reload()
+
+    # --- Доступ к ключам ---
+
+    @property
+    def signing_key(self) -> SigningKey:
+        """Текущий ключ подписи (с наибольшим kid)."""
+        self._ensure_loaded()
+        return self._keys[max(self._keys)]
+
+    def get(self, kid: Optional[str]) -> Optional[SigningKey]:
+        """Ключ для проверки подписи по kid (только уже загруженные ключи)."""
+        if kid is None:
+            return None
+        self._ensure_loaded()
+        return self._keys.get(kid)
+
+    async def get_or_reload(self, kid: Optional[str]) -> Optional[SigningKey]:
+        """
+        Ключ для проверки подписи по kid.
+        Неизвестный kid может означать ротацию в другом воркере — перечитываем каталог
+        (не чаще JWT_KEYS_MIN_RELOAD_INTERVAL_SECONDS) в потоке, не блокируя event loop.
+        Ошибка перечитывания (нет ключей, битый PEM) означает «ключ не найден».
+        """
+        key = self.get(kid)
+        if key is not None or kid is None or self.keys_dir is None:
+            return key
+        if time.monotonic() - self._last_reload < JWT_KEYS_MIN_RELOAD_INTERVAL_SECONDS:
+            return None
+        try:
+            await asyncio.to_thread(self.reload)
+        except Exception as e:
+            print(f"Ошибка перечитывания ключей подписи: {e}")
+            return None
+        return self._keys.get(kid)
+
+    def jwks(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Публичные ключи в формате JWKS (RFC 7517)."""
+        self._ensure_loaded()
+        return {"keys": [self._keys[kid].jwk for kid in sorted(self._keys, reverse=True)]}
+
+
+# Глобальный набор ключей
+key_ring = KeyRing()
+
+
+async def reload_keys_periodically(ring: KeyRing, interval: float = JWT_KEYS_RELOAD_SECONDS) -> None:
+    """Фоновая задача: периодически перечитывает каталог ключей (ротация без перезапуска)."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            # Чтение и разбор PEM-файлов — в потоке, чтобы не блокировать event loop
+            await asyncio.to_thread(ring.reload)
+        except Exception as e:
+            print(f"Ошибка перечитывания ключей подписи: {e}")
+
+
+if __name__ == "__main__":
+    # Ротация ключа: python -m app.keys rotate (требует JWT_KEYS_DIR)
+    if sys.argv[1:] != ["rotate"] or not JWT_KEYS_DIR:
+        print("Использование: JWT_KEYS_DIR=/path python -m app.keys rotate", file=sys.stderr)
+        sys.exit(2)
+    new_key = key_ring.rotate()
+    print(f"Создан новый ключ подписи: {new_key.kid}")
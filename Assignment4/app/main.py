@@ -1,16 +1,39 @@
 # Assignment4/app/main.py
+import time
+import asyncio
 from contextlib import asynccontextmanager
 from typing import Annotated
 
-from fastapi import FastAPI, Depends, APIRouter, Header, HTTPException, status
+from fastapi import FastAPI, Depends, APIRouter, Header, HTTPException, Query, status
+from fastapi.responses import JSONResponse, PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # Импорт локальных модулей
-from .database import init_db as initialize_database, get_async_session 
-from .models import User 
-from .schemas import UserAuth, Token, TokenRefresh, UserBase
-from .service import register_new_user, authenticate_user, refresh_tokens 
-from .security import get_current_user
+from .database import init_db as initialize_database, get_async_session, engine, check_db_ready
+from .schemas import UserAuth, Token, TokenRefresh, UserBase, LoginHistoryPage
+from .service import register_new_user, authenticate_user, refresh_tokens, get_login_history
+from .security import (
+    get_current_user,
+    configure_password_hashing,
+    resolve_hash_rounds,
+    ALGORITHM,
+    ASYMMETRIC_ALGORITHMS,
+)
+from .keys import key_ring, reload_keys_periodically
+from .token_cache import UserSnapshot, token_cache
+from .hashing import hashing_executor
+from .history_writer import (
+    LOGIN_HISTORY_MODE,
+    LOGIN_HISTORY_RETENTION_DAYS,
+    login_history_writer,
+    prune_login_history_periodically,
+)
+from .metrics import MetricsMiddleware, registry as metrics_registry
+from .rate_limit import RATE_LIMIT_ENABLED, evict_idle_buckets_periodically, rate_limit
+
+# Момент импорта приложения — точка отсчета времени холодного старта
+STARTUP_BEGAN = time.perf_counter()
+startup_seconds: float | None = None
 
 # ===================================================
 # Управление жизненным циклом приложения (Lifespan)
@@ -27,24 +50,87 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"КРИТИЧЕСКАЯ ОШИБКА: Не удалось инициализировать БД: {e}")
         raise e
+
+    # Стоимость хеширования: из PASSWORD_HASH_ROUNDS или калибровка под целевое время
+    hash_rounds = resolve_hash_rounds()
+    configure_password_hashing(hash_rounds)
+    print(f"Стоимость хеширования паролей: {hash_rounds} раундов pbkdf2_sha256.")
+
+    # Пул процессов для хеширования паролей
+    hashing_executor.configure(hash_rounds)
+    hashing_executor.start()
+    print(f"Пул хеширования запущен (процессов: {hashing_executor.workers}, "
+          f"лимит очереди: {hashing_executor.queue_limit}).")
+
+    # Фоновая пакетная запись истории входов
+    if LOGIN_HISTORY_MODE == "batched":
+        login_history_writer.start(engine)
+        print("Пакетная запись истории входов запущена.")
+
+    # Очистка неактивных корзин ограничителя частоты
+    evict_task = asyncio.create_task(evict_idle_buckets_periodically()) if RATE_LIMIT_ENABLED else None
+
+    # Очистка устаревшей истории входов
+    prune_task = None
+    if LOGIN_HISTORY_RETENTION_DAYS > 0:
+        prune_task = asyncio.create_task(prune_login_history_periodically(engine))
+        print(f"Очистка истории входов включена (хранение: {LOGIN_HISTORY_RETENTION_DAYS} дн.).")
+
+    # Ключи подписи JWT (RS256): загружаем сразу, чтобы ошибка конфигурации была видна при старте
+    keys_reload_task = None
+    if ALGORITHM in ASYMMETRIC_ALGORITHMS:
+        key_ring.reload()
+        print(f"Ключи подписи загружены, текущий kid: {key_ring.signing_key.kid}")
+        if key_ring.keys_dir is not None:
+            keys_reload_task = asyncio.create_task(reload_keys_periodically(key_ring))
         
-    print("Запуск сервера...")
+    global startup_seconds
+    startup_seconds = time.perf_counter() - STARTUP_BEGAN
+    print(f"Запуск сервера... (холодный старт: {startup_seconds * 1000:.0f} мс)")
     yield
     print("Остановка приложения...")
+    if keys_reload_task is not None:
+        keys_reload_task.cancel()
+    if prune_task is not None:
+        prune_task.cancel()
+    if evict_task is not None:
+        evict_task.cancel()
+    # Дописываем накопленную историю входов до закрытия пула соединений
+    await login_history_writer.stop()
+    hashing_executor.shutdown()
     
 # ===================================================
 # Инициализация FastAPI
 # ===================================================
 
 app = FastAPI(lifespan=lifespan, title="Auth Service")
+app.add_middleware(MetricsMiddleware)
 router = APIRouter()
 
+# ===================================================
+# Метрики (Prometheus)
+# ===================================================
+
+_pool = engine.sync_engine.pool
+metrics_registry.gauge("db_pool_size", "Configured DB pool size", _pool.size)
+metrics_registry.gauge("db_pool_checked_out", "DB connections currently checked out", _pool.checkedout)
+metrics_registry.gauge("db_pool_overflow", "DB connections opened above pool size", _pool.overflow)
+metrics_registry.gauge("hashing_queue_depth", "Password hashing jobs in flight", lambda: hashing_executor.queue_depth)
+metrics_registry.gauge("login_history_queue_depth", "Login history rows waiting to be written",
+                       lambda: login_history_writer.queue_depth)
+metrics_registry.gauge("startup_duration_seconds", "Time from app import to ready to serve",
+                       lambda: startup_seconds or 0.0)
+metrics_registry.counter_callback("token_cache_hits_total", "Verified token cache hits",
+                                  lambda: token_cache.hits)
+metrics_registry.counter_callback("token_cache_misses_total", "Verified token cache misses",
+                                  lambda: token_cache.misses)
+
 # ===================================================
 # Эндпоинты (Endpoints)
 # ===================================================
 
 # 1. Регистрация
-@router.post("/register")
+@router.post("/register", dependencies=[Depends(rate_limit("register"))])
 async def register(
     user_data: UserAuth, 
     db: AsyncSession = Depends(get_async_session)
@@ -54,7 +140,7 @@ async def register(
     return {"message": "User registered successfully"}
 
 # 2. Вход (Login)
-@router.post("/login", response_model=Token)
+@router.post("/login", response_model=Token, dependencies=[Depends(rate_limit("login"))])
 async def login(
     user_data: UserAuth,
     user_agent: Annotated[str | None, Header()] = None, 
@@ -81,10 +167,45 @@ async def refresh(
 # 4. Профиль пользователя (Protected)
 @router.get("/me", response_model=UserBase)
 async def read_current_user(
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """Получение информации о текущем пользователе (требует авторизации)."""
     return UserBase(email=current_user.email) 
 
+# 4.1. История входов текущего пользователя (keyset-пагинация)
+@router.get("/me/history", response_model=LoginHistoryPage)
+async def read_login_history(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """История входов, новые записи первыми. Для следующей страницы передайте next_cursor."""
+    return await get_login_history(current_user.id, db, limit, cursor)
+
+# 5. Публичные ключи для локальной проверки токенов другими сервисами
+@router.get("/.well-known/jwks.json")
+async def jwks():
+    """JWKS с публичными ключами подписи (пустой список при HS256)."""
+    keys = key_ring.jwks() if ALGORITHM in ASYMMETRIC_ALGORITHMS else {"keys": []}
+    return JSONResponse(content=keys, headers={"Cache-Control": "public, max-age=300"})
+
+# 6. Метрики в текстовом формате Prometheus
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Метрики сервиса: задержки по маршрутам, пул соединений, очереди."""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+# 7. Проверки состояния: liveness (процесс жив) и readiness (БД доступна)
+@router.get("/health/live", include_in_schema=False)
+async def health_live():
+    return {"status": "ok"}
+
+@router.get("/health/ready", include_in_schema=False)
+async def health_ready():
+    if not await check_db_ready():
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"status": "unavailable"})
+    return {"status": "ready"}
+
 # Подключение роутера
 app.include_router(router)
\ No newline at end of file
@@ -1,5 +1,5 @@
 # Assignment4/app/models.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.database import Base
@@ -30,4 +30,14 @@ class LoginHistory(Base):
     login_time = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
 
     # Связь с пользователем
-    user = relationship("User", back_populates="history")
\ No newline at end of file
+    user = relationship("User", back_populates="history")
+
+    # Составной индекс под постраничное чтение истории пользователя (новые записи первыми).
+    # В PostgreSQL user_agent включен в индекс, чтобы страница читалась index-only scan.
+    __table_args__ = (
+        Index(
+            "ix_login_history_user_id_login_time",
+            user_id, login_time.desc(), id.desc(),
+            postgresql_include=["user_agent"],
+        ),
+    )
\ No newline at end of file
@@ -0,0 +1,213 @@
+# Assignment4/app/rate_limit.py
+import os
+import time
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import HTTPException, Request, status
+
+from .metrics import registry, Counter
+
+# --------------------------------------------------
+# Конфигурация ограничения частоты запросов
+# --------------------------------------------------
+# memory — token bucket в памяти процесса;
+# redis  — общий счетчик (фиксированное окно) для нескольких воркеров/инстансов.
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+# Лимиты по email: скорость пополнения (запросов/сек) и емкость корзины
+RATE_LIMIT_EMAIL_PER_SECOND = float(os.getenv("RATE_LIMIT_EMAIL_PER_SECOND", "0.2"))
+RATE_LIMIT_EMAIL_BURST = int(os.getenv("RATE_LIMIT_EMAIL_BURST", "5"))
+# Лимиты по IP клиента
+RATE_LIMIT_IP_PER_SECOND = float(os.getenv("RATE_LIMIT_IP_PER_SECOND", "2"))
+RATE_LIMIT_IP_BURST = int(os.getenv("RATE_LIMIT_IP_BURST", "20"))
+# Количество шардов и период очистки неактивных ключей (один шард за проход)
+RATE_LIMIT_SHARDS = int(os.getenv("RATE_LIMIT_SHARDS", "64"))
+RATE_LIMIT_EVICT_INTERVAL_SECONDS = float(os.getenv("RATE_LIMIT_EVICT_INTERVAL_SECONDS", "1"))
+
+REDIS_HOST = os.getenv("REDIS_HOST", "redis")
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+
+RATE_LIMIT_REJECTIONS = registry.register(Counter(
+    "rate_limit_rejections_total", "Requests rejected by the rate limiter", ("action", "scope"),
+))
+
+
+class RateLimiter(ABC):
+    """Ограничитель частоты по произвольному ключу."""
+
+    @abstractmethod
+    async def allow(self, key: str) -> bool:
+        """True, если запрос по ключу разрешен (и учтен)."""
+
+    def retry_after(self) -> int:
+        """Рекомендуемая пауза (сек) для заголовка Retry-After."""
+        return 1
+
+
+class TokenBucketLimiter(RateLimiter):
+    """
+    Token bucket в памяти: на каждый активный ключ — [токены, время последнего запроса].
+    Ключи разбиты на шарды, чтобы очистку неактивных ключей можно было выполнять
+    понемногу (один шард за проход), не останавливая event loop на весь словарь.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        shards: int = RATE_LIMIT_SHARDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._shards: List[Dict[str, List[float]]] = [{} for _ in range(max(shards, 1))]
+        self._next_evict_shard = 0
+
+    async def allow(self, key: str) -> bool:
+        shard = self._shards[hash(key) % len(self._shards)]
+        now = self._clock()
+        bucket = shard.get(key)
+        if bucket is None:
+            shard[key] = [self.burst - 1.0, now]
+            return True
+
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens < 1.0:
+            bucket[0] = tokens
+            return False
+        bucket[0] = tokens - 1.0
+        return True
+
+    def retry_after(self) -> int:
+        return max(int(1 / self.rate), 1) if self.rate > 0 else 60
+
+    def evict_idle(self) -> int:
+        """
+        Удаляет из очередного шарда ключи, чьи корзины уже полностью восстановились
+        (такой ключ неотличим от нового). Возвращает число удаленных ключей.
+        """
+        shard = self._shards[self._next_evict_shard]
+        self._next_evict_shard = (self._next_evict_shard + 1) % len(self._shards)
+        now = self._clock()
+        idle = [
+            key for key, (tokens, last) in shard.items()
+            if tokens + (now - last) * self.rate >= self.burst
+        ]
+        for key in idle:
+            del shard[key]
+        return len(idle)
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+
+class RedisFixedWindowLimiter(RateLimiter):
+    """
+    Общий лимит в Redis: INCR + EXPIRE NX на ключ окна в одной транзакции MULTI/EXEC,
+    так что ключ не может остаться без срока жизни (EXPIRE NX требует Redis >= 7.0).
+    Приближение token bucket с той же средней скоростью (burst запросов за окно).
+    Принимает любой клиент с асинхронным pipeline (redis.asyncio или tests/fake_redis.py).
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        rate: float,
+        burst: int,
+        key_prefix: str = "ratelimit:",
+        clock: Callable[[], float] = time.time,
+    ):
+        self._client = client
+        self.window = max(int(round(burst / rate)), 1) if rate > 0 else 60
+        self.burst = burst
+        self._key_prefix = key_prefix
+        self._clock = clock
+
+    async def allow(self, key: str) -> bool:
+        window_key = f"{self._key_prefix}{key}:{int(self._clock()) // self.window}"
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.incr(window_key)
+            pipe.expire(window_key, self.window, nx=True)
+            count, _ = await pipe.execute()
+        return count <= self.burst
+
+    def retry_after(self) -> int:
+        return self.window
+
+
+# --------------------------------------------------
+# Выбор реализации
+# --------------------------------------------------
+
+def create_rate_limiter(rate: float, burst: int, backend: Optional[str] = None) -> RateLimiter:
+    """Создает ограничитель согласно RATE_LIMIT_BACKEND."""
+    backend = (backend or RATE_LIMIT_BACKEND).lower()
+    if backend == "memory":
+        return TokenBucketLimiter(rate, burst)
+    if backend == "redis":
+        # Необязательная зависимость: нужна только при RATE_LIMIT_BACKEND=redis
+        import redis.asyncio as redis
+        return RedisFixedWindowLimiter(redis.Redis(host=REDIS_HOST, port=REDIS_PORT), rate, burst)
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend}")
+
+
+email_limiter = create_rate_limiter(RATE_LIMIT_EMAIL_PER_SECOND, RATE_LIMIT_EMAIL_BURST)
+ip_limiter = create_rate_limiter(RATE_LIMIT_IP_PER_SECOND, RATE_LIMIT_IP_BURST)
+
+registry.gauge(
+    "rate_limit_active_keys", "Keys tracked by in-process rate limiters",
+    lambda: sum(len(limiter) for limiter in (email_limiter, ip_limiter) if isinstance(limiter, TokenBucketLimiter)),
+)
+
+
+async def evict_idle_buckets_periodically(interval: float = RATE_LIMIT_EVICT_INTERVAL_SECONDS) -> None:
+    """Фоновая задача: по одному шарду за проход удаляет неактивные корзины."""
+    limiters = [limiter for limiter in (email_limiter, ip_limiter) if isinstance(limiter, TokenBucketLimiter)]
+    while True:
+        await asyncio.sleep(interval)
+        for limiter in limiters:
+            limiter.evict_idle()
+
+
+# --------------------------------------------------
+# Зависимость FastAPI
+# --------------------------------------------------
+
+def _reject(action: str, scope: str, limiter: RateLimiter) -> HTTPException:
+    RATE_LIMIT_REJECTIONS.inc(action, scope)
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many requests, try again later",
+        headers={"Retry-After": str(limiter.retry_after())},
+    )
+
+def rate_limit(action: str):
+    """
+    Зависимость для маршрутов /login и /register.
+    Подключается через dependencies=[...] маршрута, поэтому выполняется раньше
+    открытия сессии БД и хеширования пароля.
+    """
+    async def dependency(request: Request) -> None:
+        if not RATE_LIMIT_ENABLED:
+            return
+
+        client_ip = request.client.host if request.client else "unknown"
+        if not await ip_limiter.allow(f"{action}:ip:{client_ip}"):
+            raise _reject(action, "ip", ip_limiter)
+
+        # Зависимость выполняется до валидации тела: байты берутся из кэша Request,
+        # но JSON разбирается здесь второй раз. Не-JSON тело (пустое, form-encoded)
+        # пропускает лимит по email — FastAPI затем отвечает 422.
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+        email = body.get("email") if isinstance(body, dict) else None
+        if isinstance(email, str) and not await email_limiter.allow(f"{action}:email:{email.lower()}"):
+            raise _reject(action, "email", email_limiter)
+
+    return dependency
@@ -0,0 +1,171 @@
+# Assignment4/app/revocation.py
+import os
+import time
+import math
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional
+
+# --------------------------------------------------
+# Конфигурация хранилища отозванных токенов
+# --------------------------------------------------
+# memory — в памяти процесса (один воркер / разработка);
+# redis  — общее хранилище для нескольких воркеров и инстансов.
+REVOCATION_BACKEND = os.getenv("REVOCATION_BACKEND", "memory").lower()
+REDIS_HOST = os.getenv("REDIS_HOST", "redis")
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+# Префикс ключей в Redis
+REVOCATION_KEY_PREFIX = os.getenv("REVOCATION_KEY_PREFIX", "revoked:jti:")
+# Ожидаемое число одновременно отозванных токенов (размер Bloom-фильтра)
+REVOCATION_EXPECTED_ITEMS = int(os.getenv("REVOCATION_EXPECTED_ITEMS", "100000"))
+# Период очистки истекших записей (сек)
+REVOCATION_SWEEP_INTERVAL_SECONDS = float(os.getenv("REVOCATION_SWEEP_INTERVAL_SECONDS", "300"))
+
+
+class RevocationStore(ABC):
+    """Хранилище отозванных токенов (по claim 'jti')."""
+
+    @abstractmethod
+    async def revoke(self, jti: str, expires_at: float) -> bool:
+        """
+        Атомарно отзывает токен до момента expires_at (unix time).
+        Возвращает True, если токен был активен и отозван этим вызовом,
+        и False, если он уже был отозван ранее (повторное использование).
+        """
+
+    @abstractmethod
+    async def is_revoked(self, jti: str) -> bool:
+        """Проверяет, отозван ли токен."""
+
+
+# --------------------------------------------------
+# Bloom-фильтр
+# --------------------------------------------------
+
+class BloomFilter:
+    """
+    Bloom-фильтр на bytearray с двойным хешированием.
+    Ответ 'нет' — точный, ответ 'возможно' требует проверки в основном множестве.
+    """
+
+    def __init__(self, expected_items: int, false_positive_rate: float = 0.01):
+        expected_items = max(expected_items, 1)
+        bits = -expected_items * math.log(false_positive_rate) / (math.log(2) ** 2)
+        self.size = max(int(bits), 8)
+        self.hash_count = max(int(round(self.size / expected_items * math.log(2))), 1)
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        h1 = hash(item)
+        h2 = hash((item, self.size)) | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        for pos in self._positions(item):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+
+# --------------------------------------------------
+# Хранилище в памяти
+# --------------------------------------------------
+
+class InMemoryRevocationStore(RevocationStore):
+    """
+    Хеш-таблица jti -> exp с Bloom-фильтром впереди: частый ответ 'не отозван'
+    не требует обращения к таблице. Истекшие записи периодически удаляются,
+    фильтр при этом перестраивается.
+    """
+
+    def __init__(
+        self,
+        expected_items: int = REVOCATION_EXPECTED_ITEMS,
+        sweep_interval: float = REVOCATION_SWEEP_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.expected_items = expected_items
+        self.sweep_interval = sweep_interval
+        self._clock = clock
+        self._revoked: Dict[str, float] = {}
+        self._bloom = BloomFilter(expected_items)
+        self._next_sweep = clock() + sweep_interval
+
+    async def revoke(self, jti: str, expires_at: float) -> bool:
+        # Между проверкой и записью нет await — операция атомарна в рамках event loop
+        self._maybe_sweep()
+        if self._is_revoked(jti):
+            return False
+        self._revoked[jti] = expires_at
+        self._bloom.add(jti)
+        return True
+
+    async def is_revoked(self, jti: str) -> bool:
+        return self._is_revoked(jti)
+
+    def _is_revoked(self, jti: str) -> bool:
+        if jti not in self._bloom:
+            return False
+        expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > self._clock()
+
+    def _maybe_sweep(self) -> None:
+        now = self._clock()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.sweep_interval
+        self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+        self._bloom = BloomFilter(max(self.expected_items, len(self._revoked) * 2))
+        for jti in self._revoked:
+            self._bloom.add(jti)
+
+
+# --------------------------------------------------
+# Хранилище в Redis
+# --------------------------------------------------
+
+class RedisRevocationStore(RevocationStore):
+    """
+    Хранилище в Redis: один ключ на jti с истечением в момент exp токена.
+    Отзыв выполняется одной командой SET NX EXAT, поэтому атомарен между воркерами.
+    Принимает любой клиент с асинхронными методами set/exists (redis.asyncio
+    или локальная подделка tests/fake_redis.py).
+    """
+
+    def __init__(self, client: Any, key_prefix: str = REVOCATION_KEY_PREFIX):
+        self._client = client
+        self._key_prefix = key_prefix
+
+    async def revoke(self, jti: str, expires_at: float) -> bool:
+        created = await self._client.set(
+            self._key_prefix + jti, b"1", nx=True, exat=int(math.ceil(expires_at))
+        )
+        return bool(created)
+
+    async def is_revoked(self, jti: str) -> bool:
+        return bool(await self._client.exists(self._key_prefix + jti))
+
+
+# --------------------------------------------------
+# Выбор реализации
+# --------------------------------------------------
+
+def create_revocation_store(backend: Optional[str] = None) -> RevocationStore:
+    """Создает хранилище согласно REVOCATION_BACKEND."""
+    backend = (backend or REVOCATION_BACKEND).lower()
+    if backend == "memory":
+        return InMemoryRevocationStore()
+    if backend == "redis":
+        # Необязательная зависимость: нужна только при REVOCATION_BACKEND=redis
+        import redis.asyncio as redis
+        return RedisRevocationStore(redis.Redis(host=REDIS_HOST, port=REDIS_PORT))
+    raise ValueError(f"Unknown REVOCATION_BACKEND: {backend}")
+
+
+# Глобальный экземпляр хранилища
+revocation_store = create_revocation_store()
@@ -1,6 +1,7 @@
 # Assignment4/app/schemas.py
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, model_validator
 from datetime import datetime
+from typing import List, Optional
 
 # ===================================================
 # Схемы аутентификации (Authentication Schemas)
@@ -21,6 +22,18 @@ class TokenRefresh(BaseModel):
     """Схема для обновления токена."""
     refresh_token: str
 
+class UserImport(BaseModel):
+    """Строка массового импорта: либо открытый пароль, либо готовый хеш."""
+    email: EmailStr
+    password: Optional[str] = None
+    hashed_password: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_password_source(self) -> "UserImport":
+        if (self.password is None) == (self.hashed_password is None):
+            raise ValueError("Exactly one of 'password' or 'hashed_password' is required")
+        return self
+
 # ===================================================
 # Схемы БД (Database Models)
 # ===================================================
@@ -41,4 +54,17 @@ class LoginHistoryBase(BaseModel):
     login_time: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class LoginHistoryItem(BaseModel):
+    """Запись истории входов для ответа /me/history."""
+    user_agent: Optional[str] = None
+    login_time: datetime
+
+    class Config:
+        from_attributes = True
+
+class LoginHistoryPage(BaseModel):
+    """Страница истории входов; next_cursor — курсор следующей страницы (None — конец)."""
+    items: List[LoginHistoryItem]
+    next_cursor: Optional[str] = None
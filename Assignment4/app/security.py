@@ -1,9 +1,12 @@
 # Assignment4/app/security.py
 import os
+import time
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from passlib.hash import pbkdf2_sha256
 
 # Импорт зависимостей FastAPI
 from fastapi import Depends, HTTPException, status
@@ -14,6 +17,8 @@ from sqlalchemy.future import select
 # Импорт локальных модулей
 from .database import get_async_session
 from .models import User
+from .token_cache import UserSnapshot, token_cache
+from .keys import key_ring
 
 # Настройка схемы OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
@@ -24,12 +29,31 @@ pwd_context = CryptContext(
     deprecated="auto"
 )
 
+# --------------------------------------------------
+# Стоимость хеширования паролей
+# --------------------------------------------------
+# Фиксированное число раундов pbkdf2 (0 — подобрать при старте под целевое время)
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "0"))
+# Целевое время одной проверки пароля (мс) для калибровки
+PASSWORD_HASH_TARGET_MS = float(os.getenv("PASSWORD_HASH_TARGET_MS", "50"))
+# Допустимое отклонение раундов от текущего значения, при выходе за него хеш пересчитывается
+PASSWORD_HASH_ROUNDS_TOLERANCE = float(os.getenv("PASSWORD_HASH_ROUNDS_TOLERANCE", "0.25"))
+# Нижняя граница, ниже которой калибровка не опускается даже на очень медленном железе
+MIN_PASSWORD_HASH_ROUNDS = 10000
+CALIBRATION_PROBE_ROUNDS = 20000
+
 # --------------------------------------------------
 # Конфигурация JWT
 # --------------------------------------------------
 # ВАЖНО: Читаем секретный ключ из переменных окружения для безопасности
 SECRET_KEY = os.getenv("SECRET_KEY", "change_this_to_a_secure_key_in_production")
-ALGORITHM = "HS256"
+# HS256 — общий секрет; RS256 — закрытый ключ из key_ring (keys.py), а другие
+# сервисы проверяют токены локально по публичным ключам из /.well-known/jwks.json
+ALGORITHM = os.getenv("ALGORITHM", "HS256")
+ASYMMETRIC_ALGORITHMS = {"RS256"}
+
+if ALGORITHM not in ASYMMETRIC_ALGORITHMS | {"HS256"}:
+    raise ValueError(f"Unsupported JWT ALGORITHM: {ALGORITHM}")
 
 # Срок действия Access Token (30 минут)
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
@@ -45,13 +69,69 @@ def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Проверка пароля."""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Проверка пароля. Нераспознанный или поврежденный хеш — неверный пароль, а не ошибка 500."""
+    try:
+        return pwd_context.verify(plain_password, hashed_password)
+    except ValueError:
+        return False
+
+def is_valid_password_hash(hashed_password: str) -> bool:
+    """True, если хеш полностью разбирается одной из схем pwd_context (не только по префиксу)."""
+    scheme = pwd_context.identify(hashed_password)
+    if scheme is None:
+        return False
+    try:
+        pwd_context.handler(scheme).from_string(hashed_password)
+    except ValueError:
+        return False
+    return True
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True, если хеш устарел или его стоимость вне допустимого диапазона."""
+    return pwd_context.needs_update(hashed_password)
+
+def calibrate_hash_rounds(target_ms: float = PASSWORD_HASH_TARGET_MS) -> int:
+    """Подбирает число раундов pbkdf2, при котором проверка пароля занимает ~target_ms."""
+    probe = pbkdf2_sha256.using(rounds=CALIBRATION_PROBE_ROUNDS)
+    elapsed = min(_time_hash(probe) for _ in range(3))
+    rounds = int(CALIBRATION_PROBE_ROUNDS * (target_ms / 1000) / elapsed)
+    # Округляем до тысяч, чтобы значения на разных воркерах совпадали чаще
+    return max(MIN_PASSWORD_HASH_ROUNDS, round(rounds, -3))
+
+def _time_hash(handler) -> float:
+    started = time.perf_counter()
+    handler.hash("calibration-probe")
+    return time.perf_counter() - started
+
+def resolve_hash_rounds() -> int:
+    """Число раундов из PASSWORD_HASH_ROUNDS или результат калибровки."""
+    return PASSWORD_HASH_ROUNDS if PASSWORD_HASH_ROUNDS > 0 else calibrate_hash_rounds()
+
+def configure_password_hashing(rounds: int) -> None:
+    """
+    Применяет стоимость хеширования к pwd_context (в том числе в процессах пула).
+    Хеши с числом раундов вне диапазона ±PASSWORD_HASH_ROUNDS_TOLERANCE
+    считаются устаревшими (см. password_needs_rehash).
+    """
+    pwd_context.update(
+        pbkdf2_sha256__default_rounds=rounds,
+        pbkdf2_sha256__min_rounds=int(rounds * (1 - PASSWORD_HASH_ROUNDS_TOLERANCE)),
+        pbkdf2_sha256__max_rounds=int(rounds * (1 + PASSWORD_HASH_ROUNDS_TOLERANCE)),
+    )
 
 # --------------------------------------------------
 # Генерация токенов
 # --------------------------------------------------
 
+def _encode_token(claims: Dict[str, Any]) -> str:
+    """Подписывает payload текущим ключом (для RS256 в заголовок добавляется kid)."""
+    if ALGORITHM in ASYMMETRIC_ALGORITHMS:
+        signing_key = key_ring.signing_key
+        return jwt.encode(
+            claims, signing_key.private_pem, algorithm=ALGORITHM, headers={"kid": signing_key.kid}
+        )
+    return jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+
 def create_access_token(data: dict) -> str:
     """Создание JWT Access Token (короткоживущий)."""
     to_encode = data.copy()
@@ -60,7 +140,7 @@ def create_access_token(data: dict) -> str:
     # В payload добавляем срок действия, ID пользователя и тип 'access'
     to_encode.update({"exp": expire, "sub": str(data["user_id"]), "type": "access"})
     
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = _encode_token(to_encode)
     return encoded_jwt
 
 def create_refresh_token(data: dict) -> str:
@@ -68,22 +148,34 @@ def create_refresh_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     
-    # В payload добавляем срок действия, ID пользователя и тип 'refresh'
-    to_encode.update({"exp": expire, "sub": str(data["user_id"]), "type": "refresh"})
+    # В payload добавляем срок действия, ID пользователя, тип 'refresh'
+    # и уникальный идентификатор (jti) для ротации и отзыва
+    to_encode.update({
+        "exp": expire,
+        "sub": str(data["user_id"]),
+        "type": "refresh",
+        "jti": uuid.uuid4().hex,
+    })
     
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = _encode_token(to_encode)
     return encoded_jwt
 
 # --------------------------------------------------
 # Валидация и декодирование токенов
 # --------------------------------------------------
 
-def decode_token(token: str) -> Optional[Dict[str, Any]]:
+async def decode_token(token: str) -> Optional[Dict[str, Any]]:
     """
     Декодирует JWT токен и проверяет его валидность.
     Возвращает payload при успехе, иначе None.
     """
     try:
+        if ALGORITHM in ASYMMETRIC_ALGORITHMS:
+            # Ключ проверки выбираем по kid из заголовка (неизвестный kid — перечитывание каталога в потоке)
+            verification_key = await key_ring.get_or_reload(jwt.get_unverified_header(token).get("kid"))
+            if verification_key is None:
+                return None
+            return jwt.decode(token, verification_key.public_pem, algorithms=[ALGORITHM])
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload
     except JWTError:
@@ -96,18 +188,24 @@ def decode_token(token: str) -> Optional[Dict[str, Any]]:
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_async_session)
-) -> User:
+) -> UserSnapshot:
     """
-    Зависимость для проверки Access Token и получения текущего пользователя из БД.
+    Зависимость для проверки Access Token и получения текущего пользователя.
+    Повторные запросы с тем же токеном обслуживаются из кэша без проверки подписи и БД.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+    # 0. Быстрый путь: токен уже был проверен ранее
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached.user
     
     # 1. Декодируем токен
-    payload = decode_token(token)
+    payload = await decode_token(token)
     
     # 2. Проверяем наличие 'sub' (ID) и правильный тип токена ('access')
     if payload is None or "sub" not in payload or payload.get("type") != "access":
@@ -124,5 +222,9 @@ async def get_current_user(
     
     if user is None:
         raise credentials_exception
+
+    # 4. Кэшируем проверенный токен вместе со снимком пользователя
+    snapshot = UserSnapshot(id=user.id, email=user.email)
+    token_cache.put(token, payload, snapshot)
         
-    return user
\ No newline at end of file
+    return snapshot
@@ -1,20 +1,28 @@
 # Assignment4/app/service.py
-from typing import Any 
+import json
+import asyncio
+import base64
+from typing import Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import tuple_, update
 from sqlalchemy.future import select
 from fastapi import HTTPException, status
 from datetime import datetime, timezone
 
+from app.database import AsyncSessionLocal
 from app.models import User, LoginHistory
-from app.schemas import UserAuth, Token, TokenRefresh
+from app.schemas import UserAuth, Token, TokenRefresh, LoginHistoryItem, LoginHistoryPage
 # Импортируем функции безопасности
 from app.security import (
-    hash_password, 
-    verify_password, 
     create_access_token, 
     create_refresh_token, 
-    decode_token
+    decode_token,
+    password_needs_rehash,
 )
+# Хеширование паролей выполняется в пуле процессов, чтобы не блокировать event loop
+from app.hashing import hash_password_async, verify_password_async
+from app.history_writer import LOGIN_HISTORY_MODE, login_history_writer
+from app.revocation import revocation_store
 
 # ===================================================
 # Основная бизнес-логика: Регистрация
@@ -34,7 +42,7 @@ async def register_new_user(user_data: UserAuth, db: AsyncSession) -> User:
         )
     
     # 2. Хеширование пароля
-    hashed_pass = hash_password(user_data.password)
+    hashed_pass = await hash_password_async(user_data.password)
     
     # 3. Создание объекта пользователя
     new_user = User(
@@ -53,6 +61,32 @@ async def register_new_user(user_data: UserAuth, db: AsyncSession) -> User:
 # Основная бизнес-логика: Аутентификация
 # ===================================================
 
+# Ссылки на фоновые задачи перехеширования (чтобы их не собрал сборщик мусора)
+_rehash_tasks: set[asyncio.Task] = set()
+
+async def _rehash_password(user_id: int, password: str, old_hash: str) -> None:
+    """
+    Пересчитывает хеш с текущей стоимостью и сохраняет его.
+    Обновление условное: если хеш успели изменить (например, смена пароля), ничего не пишем.
+    """
+    try:
+        new_hash = await hash_password_async(password)
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(User)
+                .where(User.id == user_id, User.hashed_password == old_hash)
+                .values(hashed_password=new_hash)
+            )
+            await session.commit()
+    except Exception as e:
+        # Не критично: хеш будет пересчитан при следующем входе
+        print(f"Не удалось перехешировать пароль пользователя {user_id}: {e}")
+
+def _schedule_rehash(user_id: int, password: str, old_hash: str) -> None:
+    task = asyncio.create_task(_rehash_password(user_id, password, old_hash))
+    _rehash_tasks.add(task)
+    task.add_done_callback(_rehash_tasks.discard)
+
 async def authenticate_user(user_data: UserAuth, user_agent: str, db: AsyncSession) -> Token:
     """Проверяет учетные данные и генерирует JWT токены."""
     
@@ -61,21 +95,29 @@ async def authenticate_user(user_data: UserAuth, user_agent: str, db: AsyncSessi
     user = result.scalars().first()
     
     # 2. Проверка пароля
-    if not user or not verify_password(user_data.password, user.hashed_password):
+    if not user or not await verify_password_async(user_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # 3. Запись истории входов
-    history_entry = LoginHistory(
-        user_id=user.id,
-        user_agent=user_agent,
-        login_time=datetime.now(timezone.utc)
-    )
-    db.add(history_entry)
-    await db.commit()
+    # 2.1. Хеш устарел или слишком дорогой — пересчитываем в фоне, не задерживая ответ
+    if password_needs_rehash(user.hashed_password):
+        _schedule_rehash(user.id, user_data.password, user.hashed_password)
+    
+    # 3. Запись истории входов (пачками в фоне или синхронно, см. LOGIN_HISTORY_MODE)
+    login_time = datetime.now(timezone.utc)
+    if LOGIN_HISTORY_MODE == "batched" and login_history_writer.running:
+        await login_history_writer.enqueue(user.id, user_agent, login_time)
+    else:
+        history_entry = LoginHistory(
+            user_id=user.id,
+            user_agent=user_agent,
+            login_time=login_time
+        )
+        db.add(history_entry)
+        await db.commit()
     
     # 4. Генерация токенов
     # Access Token (короткий): type="access"
@@ -97,10 +139,10 @@ async def refresh_tokens(token_data: TokenRefresh, db: AsyncSession) -> Token:
     Принимает Refresh Token, проверяет его и выдает новую пару токенов.
     """
     # 1. Декодирование Refresh Token
-    payload = decode_token(token_data.refresh_token)
+    payload = await decode_token(token_data.refresh_token)
     
-    # 2. Проверка: валидность и тип 'refresh'
-    if payload is None or payload.get("type") != "refresh":
+    # 2. Проверка: валидность, тип 'refresh' и наличие jti
+    if payload is None or payload.get("type") != "refresh" or not payload.get("jti"):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired refresh token",
@@ -128,7 +170,14 @@ async def refresh_tokens(token_data: TokenRefresh, db: AsyncSession) -> Token:
             detail="User not found",
         )
         
-    # 4. TODO: [Redis] Здесь можно добавить проверку черного списка токенов
+    # 4. Ротация: атомарно отзываем предъявленный Refresh Token.
+    # Если он уже был отозван (повторное использование) — отказываем.
+    if not await revocation_store.revoke(payload["jti"], payload["exp"]):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
 
     # 5. Генерация новых токенов
     new_access_token_data: dict[str, Any] = {"user_id": user.id, "type": "access"}
@@ -137,4 +186,55 @@ async def refresh_tokens(token_data: TokenRefresh, db: AsyncSession) -> Token:
     new_refresh_token_data: dict[str, Any] = {"user_id": user.id, "type": "refresh"}
     new_refresh_token = create_refresh_token(new_refresh_token_data)
     
-    return Token(access_token=new_access_token, refresh_token=new_refresh_token)
\ No newline at end of file
+    return Token(access_token=new_access_token, refresh_token=new_refresh_token)
+
+# ===================================================
+# Основная бизнес-логика: История входов
+# ===================================================
+
+def _encode_history_cursor(login_time: datetime, entry_id: int) -> str:
+    """Непрозрачный курсор: позиция последней записи страницы."""
+    raw = json.dumps([login_time.isoformat(), entry_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_history_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        login_time, entry_id = json.loads(raw)
+        return datetime.fromisoformat(login_time), int(entry_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+async def get_login_history(
+    user_id: int, db: AsyncSession, limit: int, cursor: Optional[str] = None
+) -> LoginHistoryPage:
+    """
+    Постраничная история входов (keyset-пагинация, новые записи первыми).
+    Стоимость страницы не зависит от ее номера: запрос идет по индексу
+    (user_id, login_time DESC, id DESC) от позиции курсора.
+    """
+    query = (
+        select(LoginHistory.id, LoginHistory.user_agent, LoginHistory.login_time)
+        .filter(LoginHistory.user_id == user_id)
+        .order_by(LoginHistory.login_time.desc(), LoginHistory.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        login_time, entry_id = _decode_history_cursor(cursor)
+        query = query.filter(tuple_(LoginHistory.login_time, LoginHistory.id) < tuple_(login_time, entry_id))
+
+    rows = (await db.execute(query)).all()
+
+    # Лишняя (limit + 1)-я строка означает, что есть следующая страница
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_history_cursor(rows[-1].login_time, rows[-1].id)
+
+    return LoginHistoryPage(
+        items=[LoginHistoryItem(user_agent=row.user_agent, login_time=row.login_time) for row in rows],
+        next_cursor=next_cursor,
+    )
@@ -0,0 +1,121 @@
+# Assignment4/app/token_cache.py
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Set
+
+# --------------------------------------------------
+# Конфигурация кэша
+# --------------------------------------------------
+# Максимальное число закэшированных токенов (0 — кэш отключен)
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+# Максимальное время жизни записи (сек); фактический TTL не превышает exp токена
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "60"))
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Облегченный снимок пользователя, достаточный для защищенных эндпоинтов."""
+    id: int
+    email: str
+
+
+@dataclass(frozen=True)
+class CachedToken:
+    """Запись кэша: декодированный payload, снимок пользователя и срок годности."""
+    payload: Dict[str, Any]
+    user: UserSnapshot
+    expires_at: float
+
+
+class VerifiedTokenCache:
+    """
+    Ограниченный LRU-кэш проверенных Access Token.
+    Ключ — SHA-256 от токена (сам токен в памяти не хранится).
+    Повторный запрос с тем же токеном не требует ни проверки подписи, ни запроса в БД.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, clock: Callable[[], float] = time.time):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, CachedToken]" = OrderedDict()
+        # Обратный индекс для инвалидации всех токенов пользователя
+        self._keys_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[CachedToken]:
+        """Возвращает запись для токена или None (промах/истекшая запись)."""
+        if self.max_size <= 0:
+            return None
+        key = self._digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def put(self, token: str, payload: Dict[str, Any], user: UserSnapshot) -> None:
+        """Сохраняет проверенный токен; TTL ограничен сроком действия (exp) токена."""
+        if self.max_size <= 0:
+            return
+        expires_at = self._clock() + self.ttl_seconds
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+
+        key = self._digest(token)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = CachedToken(payload=payload, user=user, expires_at=expires_at)
+            self._keys_by_user.setdefault(user.id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+
+    def invalidate_user(self, user_id: int) -> int:
+        """Удаляет все записи пользователя (смена пароля, удаление и т.п.). Возвращает их число."""
+        with self._lock:
+            keys = self._keys_by_user.pop(user_id, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Счетчики попаданий/промахов и текущий размер кэша."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def _remove(self, key: str) -> None:
+        # Вызывается под self._lock
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_keys = self._keys_by_user.get(entry.user.id)
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._keys_by_user[entry.user.id]
+
+
+# Глобальный экземпляр кэша
+token_cache = VerifiedTokenCache(max_size=TOKEN_CACHE_SIZE, ttl_seconds=TOKEN_CACHE_TTL_SECONDS)
@@ -0,0 +1,113 @@
+# Assignment4/benchmarks/bench_login_history_pages.py
+"""
+Бенчмарк keyset-пагинации истории входов (service.get_login_history).
+
+    python benchmarks/bench_login_history_pages.py --database-url postgresql+asyncpg://... --rows 10000000
+
+Таблица заполняется rows записями, из которых доля --target-share принадлежит
+одному пользователю. Затем страницы читаются по курсору подряд, и для страниц
+с номерами 1, 10, 100, ... выводится медианная задержка — при keyset-пагинации
+она не должна расти с номером страницы. По умолчанию — временная SQLite (aiosqlite).
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+
+from app.database import Base  # noqa: E402
+from app.models import LoginHistory, User  # noqa: E402
+from app.service import get_login_history  # noqa: E402
+
+SEED_BATCH = 20_000
+
+
+async def seed(engine, rows: int, users: int, target_share: float) -> None:
+    """Заполняет users и login_history; пользователь 1 получает target_share строк."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [
+            {"email": f"user{i}@example.com", "hashed_password": "x"} for i in range(1, users + 1)
+        ])
+
+    start = datetime(2015, 1, 1)
+    target_every = max(int(1 / target_share), 1)
+    for offset in range(0, rows, SEED_BATCH):
+        batch = []
+        for i in range(offset, min(offset + SEED_BATCH, rows)):
+            user_id = 1 if i % target_every == 0 else 2 + i % (users - 1)
+            batch.append({"user_id": user_id, "user_agent": "bench", "login_time": start + timedelta(seconds=i * 10)})
+        async with engine.begin() as conn:
+            await conn.execute(insert(LoginHistory), batch)
+
+
+async def measure(engine, pages: int, page_size: int, repeats: int) -> dict:
+    """Проходит pages страниц по курсору; замеряет страницы 1, 10, 100, ..."""
+    checkpoints = {10 ** k for k in range(0, 7) if 10 ** k <= pages}
+    cursors = {}
+    cursor = None
+    async with AsyncSession(engine) as db:
+        for page_no in range(1, pages + 1):
+            if page_no in checkpoints:
+                cursors[page_no] = cursor
+            page = await get_login_history(1, db, page_size, cursor)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        results = {}
+        for page_no, page_cursor in sorted(cursors.items()):
+            samples = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                await get_login_history(1, db, page_size, page_cursor)
+                samples.append((time.perf_counter() - started) * 1000)
+            results[str(page_no)] = round(statistics.median(samples), 3)
+    return results
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--target-share", type=float, default=0.5)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--skip-seed", action="store_true", help="использовать уже заполненную базу")
+    args = parser.parse_args()
+
+    db_file = None
+    url = args.database_url
+    if url is None:
+        db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False).name
+        url = f"sqlite+aiosqlite:///{db_file}"
+
+    engine = create_async_engine(url)
+    if not args.skip_seed:
+        await seed(engine, args.rows, args.users, args.target_share)
+    page_latency_ms = await measure(engine, args.pages, args.page_size, args.repeats)
+    await engine.dispose()
+    if db_file:
+        os.unlink(db_file)
+
+    print(json.dumps({
+        "database": engine.dialect.name,
+        "rows": args.rows,
+        "page_size": args.page_size,
+        "median_page_latency_ms_by_page": page_latency_ms,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+# Assignment4/benchmarks/bench_login_me_latency.py
+"""
+Бенчмарк: задержка /me во время потока логинов.
+
+Запускается против работающего сервиса (docker compose up):
+    python benchmarks/bench_login_me_latency.py --base-url http://localhost:8000
+
+Сначала измеряется p50/p99 /me без нагрузки, затем — при параллельных /login.
+При хешировании в пуле процессов p99 /me должен оставаться практически неизменным.
+Требует пакет httpx (в requirements.txt сервиса не входит).
+
+Все логины идут с одного IP и одного email, поэтому ограничитель частоты отклоняет
+почти весь поток быстрыми 429 без хеширования. Для замера сервис нужно запустить
+с RATE_LIMIT_ENABLED=false; в итог входят только успешные (200) логины, отклоненные
+и прочие ответы считаются отдельно.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import uuid
+from collections import Counter
+
+import httpx
+
+USER_AGENT = "bench-login-me/1.0"
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Перцентиль q (0..100) по отсортированной выборке."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def prepare_user(client: httpx.AsyncClient) -> tuple[dict, str]:
+    """Регистрирует тестового пользователя и возвращает его данные и access token."""
+    credentials = {"email": f"bench-{uuid.uuid4().hex[:12]}@example.com", "password": "bench-password"}
+    await client.post("/register", json=credentials)
+    response = await client.post("/login", json=credentials, headers={"User-Agent": USER_AGENT})
+    response.raise_for_status()
+    return credentials, response.json()["access_token"]
+
+
+async def measure_me(client: httpx.AsyncClient, token: str, duration: float) -> list[float]:
+    """Последовательно вызывает /me в течение duration секунд, возвращает задержки (мс)."""
+    headers = {"Authorization": f"Bearer {token}"}
+    samples = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get("/me", headers=headers)
+        response.raise_for_status()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+async def login_storm(client: httpx.AsyncClient, credentials: dict, stop: asyncio.Event) -> Counter:
+    """Непрерывно выполняет /login, пока не выставлен stop. Возвращает число ответов по статусам."""
+    statuses = Counter()
+    while not stop.is_set():
+        response = await client.post("/login", json=credentials, headers={"User-Agent": USER_AGENT})
+        statuses[response.status_code] += 1
+    return statuses
+
+
+def summarize(samples: list[float]) -> dict:
+    return {
+        "requests": len(samples),
+        "p50_ms": round(statistics.median(samples), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--duration", type=float, default=10.0, help="длительность каждой фазы, сек")
+    parser.add_argument("--login-concurrency", type=int, default=16, help="число параллельных логинов")
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.login_concurrency + 4)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        credentials, token = await prepare_user(client)
+
+        idle = await measure_me(client, token, args.duration)
+
+        stop = asyncio.Event()
+        storm = [asyncio.create_task(login_storm(client, credentials, stop)) for _ in range(args.login_concurrency)]
+        loaded = await measure_me(client, token, args.duration)
+        stop.set()
+        logins = sum(await asyncio.gather(*storm), Counter())
+
+    rejected = logins[429]
+    other = sum(logins.values()) - logins[200] - rejected
+    if rejected:
+        print(
+            f"warning: {rejected} логинов отклонено ограничителем (429) — запустите сервис "
+            f"с RATE_LIMIT_ENABLED=false, иначе нагрузка хешированием занижена",
+            file=sys.stderr,
+        )
+    print(json.dumps({
+        "me_idle": summarize(idle),
+        "me_during_logins": summarize(loaded),
+        "logins_completed": logins[200],
+        "logins_rejected": rejected,
+        "logins_other": other,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
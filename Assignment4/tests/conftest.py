@@ -0,0 +1,76 @@
+# Assignment4/tests/conftest.py
+"""
+Общие фикстуры: приложение без lifespan, сессия БД — файловая SQLite (aiosqlite),
+хеширование паролей в процессе запроса с минимальной стоимостью.
+
+    cd Assignment4 && python -m pytest -q
+"""
+import os
+import sys
+
+# Настройки читаются при импорте app: хеширование без пула процессов, история входов — в запросе
+os.environ["HASH_WORKERS"] = "0"
+os.environ["LOGIN_HISTORY_MODE"] = "sync"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio  # noqa: E402
+
+import pytest  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from app import rate_limit  # noqa: E402
+from app.database import Base, get_async_session  # noqa: E402
+from app.security import configure_password_hashing  # noqa: E402
+from app.token_cache import token_cache  # noqa: E402
+
+USER_AGENT = "pytest/1.0"
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    """Свежие корзины ограничителя и пустой кэш токенов в каждом тесте."""
+    monkeypatch.setattr(rate_limit, "email_limiter", rate_limit.TokenBucketLimiter(
+        rate_limit.RATE_LIMIT_EMAIL_PER_SECOND, rate_limit.RATE_LIMIT_EMAIL_BURST,
+    ))
+    monkeypatch.setattr(rate_limit, "ip_limiter", rate_limit.TokenBucketLimiter(
+        rate_limit.RATE_LIMIT_IP_PER_SECOND, rate_limit.RATE_LIMIT_IP_BURST,
+    ))
+    token_cache.clear()
+    configure_password_hashing(1000)
+
+
+@pytest.fixture
+def client(tmp_path):
+    from fastapi.testclient import TestClient
+    from app import models  # noqa: F401 — регистрация моделей в Base.metadata
+    from app.main import app
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'auth.db'}")
+
+    async def create_tables():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        # Соединения привязаны к циклу событий; TestClient работает в своем
+        await engine.dispose()
+
+    asyncio.run(create_tables())
+    Session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_async_session():
+        async with Session() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_get_async_session
+    # Без контекстного менеджера: lifespan (init_db на PostgreSQL, пул хеширования) не запускается
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def register_and_login(client, email: str = "user@example.com", password: str = "secret-password") -> dict:
+    """Регистрирует пользователя и возвращает пару токенов."""
+    credentials = {"email": email, "password": password}
+    assert client.post("/register", json=credentials).status_code == 200
+    response = client.post("/login", json=credentials, headers={"User-Agent": USER_AGENT})
+    assert response.status_code == 200, response.text
+    return response.json()
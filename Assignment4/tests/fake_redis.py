@@ -0,0 +1,107 @@
+# Assignment4/tests/fake_redis.py
+"""
+Локальная подделка асинхронного клиента Redis (redis.asyncio) для тестов
+общих бэкендов: только команды, которые использует сервис, с истечением ключей
+по управляемым часам.
+"""
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class FakeRedis:
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._data: Dict[str, Any] = {}
+        self._expires_at: Dict[str, float] = {}
+        self.commands = 0
+
+    def _alive(self, key: str) -> bool:
+        expires_at = self._expires_at.get(key)
+        if expires_at is not None and expires_at <= self._clock():
+            self._data.pop(key, None)
+            self._expires_at.pop(key, None)
+        return key in self._data
+
+    def ttl(self, key: str) -> Optional[float]:
+        """Оставшееся время жизни ключа (None — без истечения или ключа нет)."""
+        if not self._alive(key) or key not in self._expires_at:
+            return None
+        return self._expires_at[key] - self._clock()
+
+    async def set(self, key: str, value: Any, nx: bool = False, ex: Optional[int] = None,
+                  exat: Optional[int] = None) -> Optional[bool]:
+        self.commands += 1
+        if nx and self._alive(key):
+            return None
+        self._data[key] = value
+        self._expires_at.pop(key, None)
+        if ex is not None:
+            self._expires_at[key] = self._clock() + ex
+        if exat is not None:
+            self._expires_at[key] = exat
+        return True
+
+    async def get(self, key: str) -> Any:
+        self.commands += 1
+        return self._data[key] if self._alive(key) else None
+
+    async def exists(self, *keys: str) -> int:
+        self.commands += 1
+        return sum(self._alive(key) for key in keys)
+
+    async def delete(self, *keys: str) -> int:
+        self.commands += 1
+        deleted = 0
+        for key in keys:
+            if self._alive(key):
+                del self._data[key]
+                self._expires_at.pop(key, None)
+                deleted += 1
+        return deleted
+
+    async def incr(self, key: str) -> int:
+        self.commands += 1
+        value = int(self._data[key]) + 1 if self._alive(key) else 1
+        self._data[key] = value
+        return value
+
+    async def expire(self, key: str, seconds: int, nx: bool = False) -> bool:
+        self.commands += 1
+        if not self._alive(key) or (nx and key in self._expires_at):
+            return False
+        self._expires_at[key] = self._clock() + seconds
+        return True
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """
+    Буфер команд как у redis.asyncio Pipeline: методы ставят команду в очередь,
+    execute выполняет очередь без переключений event loop (аналог MULTI/EXEC).
+    """
+
+    def __init__(self, client: FakeRedis):
+        self._client = client
+        self._queue = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._queue.clear()
+
+    def __getattr__(self, name: str):
+        command = getattr(self._client, name)
+
+        def queue(*args, **kwargs) -> "FakePipeline":
+            self._queue.append((command, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self) -> list:
+        # Корутины подделки не ждут ввода-вывода, поэтому очередь выполняется атомарно
+        queue, self._queue = self._queue, []
+        return [await command(*args, **kwargs) for command, args, kwargs in queue]
@@ -0,0 +1,50 @@
+# Assignment4/tests/test_init_db.py
+"""init_db: DDL только под блокировкой, быстрый путь — одно чтение без создания таблиц."""
+import asyncio
+
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import database
+
+
+@pytest.fixture
+def fresh_engine(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'fresh.db'}")
+    monkeypatch.setattr(database, "engine", engine)
+    return engine
+
+
+def table_names(engine) -> set:
+    async def read():
+        async with engine.connect() as conn:
+            names = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+        await engine.dispose()
+        return set(names)
+
+    return asyncio.run(read())
+
+
+def test_fast_path_read_does_not_create_schema_version(fresh_engine):
+    async def scenario():
+        async with fresh_engine.connect() as conn:
+            fingerprint = await database._read_fingerprint(conn)
+        await fresh_engine.dispose()
+        return fingerprint
+
+    assert asyncio.run(scenario()) is None
+    assert "schema_version" not in table_names(fresh_engine)
+
+
+def test_init_db_creates_schema_and_skips_ddl_on_restart(fresh_engine, capsys):
+    async def init():
+        await database.init_db()
+        await fresh_engine.dispose()
+
+    asyncio.run(init())
+    assert "Схема БД обновлена." in capsys.readouterr().out
+    assert {"users", "schema_version"} <= table_names(fresh_engine)
+
+    asyncio.run(init())
+    assert "Схема БД актуальна, DDL пропущен." in capsys.readouterr().out
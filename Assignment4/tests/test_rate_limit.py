@@ -0,0 +1,146 @@
+# Assignment4/tests/test_rate_limit.py
+"""Ограничитель частоты /login и /register: token bucket в памяти и общий счетчик в Redis (подделка)."""
+import asyncio
+
+import pytest
+
+from app import rate_limit
+from app.rate_limit import RATE_LIMIT_REJECTIONS, RedisFixedWindowLimiter, TokenBucketLimiter
+from conftest import USER_AGENT
+from fake_redis import FakeRedis
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def allowed(limiter, key: str, attempts: int) -> list:
+    async def scenario():
+        return [await limiter.allow(key) for _ in range(attempts)]
+
+    return asyncio.run(scenario())
+
+
+# --- Token bucket в памяти ---
+
+def test_token_bucket_rejects_after_burst_and_refills():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=0.5, burst=3, clock=clock)
+    assert allowed(limiter, "login:email:a", 4) == [True, True, True, False]
+    assert allowed(limiter, "login:email:b", 1) == [True]
+
+    clock.now += 2  # один токен за 2 секунды
+    assert allowed(limiter, "login:email:a", 2) == [True, False]
+
+
+def test_idle_buckets_are_evicted_once_refilled():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=1, burst=2, shards=1, clock=clock)
+    allowed(limiter, "a", 2)
+    assert limiter.evict_idle() == 0 and len(limiter) == 1
+    clock.now += 2
+    assert limiter.evict_idle() == 1 and len(limiter) == 0
+
+
+# --- Общий счетчик в Redis ---
+
+def test_redis_limit_is_shared_between_workers():
+    clock = FakeClock(now=1_700_000_010.0)
+    client = FakeRedis(clock=clock)
+    # Два воркера с одним Redis: лимит общий, а не на каждый процесс
+    workers = [RedisFixedWindowLimiter(client, rate=0.5, burst=3, clock=clock) for _ in range(2)]
+    assert workers[0].window == 6
+
+    async def scenario():
+        return [await workers[i % 2].allow("login:email:a") for i in range(5)]
+
+    assert asyncio.run(scenario()) == [True, True, True, False, False]
+    assert allowed(workers[1], "login:email:b", 1) == [True]
+
+    clock.now += 6  # следующее окно
+    assert allowed(workers[0], "login:email:a", 1) == [True]
+
+
+def test_redis_window_key_always_gets_ttl_in_one_round_trip():
+    clock = FakeClock(now=1_700_000_010.0)
+    client = FakeRedis(clock=clock)
+    limiter = RedisFixedWindowLimiter(client, rate=0.5, burst=3, key_prefix="rl:", clock=clock)
+    window_key = f"rl:k:{int(clock.now) // limiter.window}"
+
+    allowed(limiter, "k", 1)
+    assert client.ttl(window_key) == pytest.approx(6)
+    # EXPIRE NX не продлевает окно на последующих запросах
+    clock.now += 2
+    allowed(limiter, "k", 1)
+    assert client.ttl(window_key) == pytest.approx(4)
+    assert client.commands == 4  # INCR + EXPIRE на запрос, в одной транзакции
+
+    clock.now += 4
+    assert client.ttl(window_key) is None and not client._alive(window_key)
+
+
+# --- Зависимость FastAPI ---
+
+@pytest.fixture(params=["memory", "redis"])
+def email_limiter(request, monkeypatch):
+    if request.param == "memory":
+        limiter = TokenBucketLimiter(rate=0.01, burst=2)
+    else:
+        limiter = RedisFixedWindowLimiter(FakeRedis(), rate=0.01, burst=2)
+    monkeypatch.setattr(rate_limit, "email_limiter", limiter)
+    return limiter
+
+
+def rejections(action: str, scope: str) -> float:
+    return RATE_LIMIT_REJECTIONS._values.get((action, scope), 0.0)
+
+
+def test_login_is_rejected_per_email_and_counted(client, email_limiter):
+    credentials = {"email": "user@example.com", "password": "wrong-password"}
+    before = rejections("login", "email")
+    statuses = [
+        client.post("/login", json=credentials, headers={"User-Agent": USER_AGENT}).status_code
+        for _ in range(3)
+    ]
+    assert statuses == [401, 401, 429]
+    assert rejections("login", "email") == before + 1
+
+    response = client.post("/login", json={**credentials, "email": "USER@example.com"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == str(email_limiter.retry_after())
+    # Другой email не затронут
+    assert client.post("/login", json={**credentials, "email": "other@example.com"}).status_code == 401
+
+
+def test_register_is_rejected_per_ip_and_counted(client, monkeypatch):
+    monkeypatch.setattr(rate_limit, "ip_limiter", TokenBucketLimiter(rate=0.01, burst=2))
+    before = rejections("register", "ip")
+    statuses = [
+        client.post("/register", json={"email": f"user{i}@example.com", "password": "secret-password"}).status_code
+        for i in range(3)
+    ]
+    assert statuses == [200, 200, 429]
+    assert rejections("register", "ip") == before + 1
+
+
+def test_disabled_limiter_does_not_reject(client, monkeypatch):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", False)
+    monkeypatch.setattr(rate_limit, "ip_limiter", TokenBucketLimiter(rate=0.01, burst=1))
+    credentials = {"email": "user@example.com", "password": "wrong-password"}
+    assert {client.post("/login", json=credentials).status_code for _ in range(3)} == {401}
+
+
+@pytest.mark.parametrize("path", ["/login", "/register"])
+@pytest.mark.parametrize("kwargs", [
+    {},
+    {"content": b"", "headers": {"Content-Type": "application/json"}},
+    {"data": {"email": "user@example.com", "password": "x"}},
+    {"content": b"{not json", "headers": {"Content-Type": "application/json"}},
+])
+def test_malformed_body_gets_validation_error_not_500(client, path, kwargs):
+    headers = {"User-Agent": USER_AGENT, **kwargs.pop("headers", {})}
+    assert client.post(path, headers=headers, **kwargs).status_code == 422
@@ -0,0 +1,129 @@
+# Assignment4/tests/test_revocation.py
+"""Отзыв refresh-токенов при ротации: память (Bloom-фильтр + таблица) и Redis (подделка)."""
+import asyncio
+
+import pytest
+
+from app import service
+from app.revocation import BloomFilter, InMemoryRevocationStore, RedisRevocationStore
+from conftest import register_and_login
+from fake_redis import FakeRedis
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingDict(dict):
+    """dict, считающий обращения get (проверка, что Bloom-фильтр отвечает сам)."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.lookups = 0
+
+    def get(self, *args):
+        self.lookups += 1
+        return super().get(*args)
+
+
+# --- Ротация через HTTP ---
+
+@pytest.fixture(params=["memory", "redis"])
+def store(request, monkeypatch):
+    store = InMemoryRevocationStore() if request.param == "memory" else RedisRevocationStore(FakeRedis())
+    monkeypatch.setattr(service, "revocation_store", store)
+    return store
+
+
+def test_rotated_refresh_token_is_rejected_on_reuse(client, store):
+    tokens = register_and_login(client)
+    rotated = client.post("/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert rotated.status_code == 200
+    assert rotated.json()["refresh_token"] != tokens["refresh_token"]
+
+    reused = client.post("/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert reused.status_code == 401
+    assert reused.json()["detail"] == "Refresh token has been revoked"
+
+    # Новый токен из ротации по-прежнему действителен (один раз)
+    assert client.post("/refresh", json={"refresh_token": rotated.json()["refresh_token"]}).status_code == 200
+
+
+def test_concurrent_reuse_is_accepted_once(store):
+    async def scenario():
+        return await asyncio.gather(*(store.revoke("jti-1", 2_000_000_000) for _ in range(10)))
+
+    assert sorted(asyncio.run(scenario())) == [False] * 9 + [True]
+
+
+# --- Bloom-фильтр ---
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(expected_items=10_000, false_positive_rate=0.01)
+    for i in range(10_000):
+        bloom.add(f"added-{i}")
+    assert all(f"added-{i}" in bloom for i in range(10_000))
+    false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+
+def test_unrevoked_token_is_answered_by_bloom_filter_without_table_lookup():
+    clock = FakeClock()
+    store = InMemoryRevocationStore(expected_items=1000, clock=clock)
+
+    async def scenario():
+        for i in range(500):
+            await store.revoke(f"revoked-{i}", clock.now + 3600)
+        store._revoked = CountingDict(store._revoked)
+        negatives = [not await store.is_revoked(f"active-{i}") for i in range(1000)]
+        positives = [await store.is_revoked(f"revoked-{i}") for i in range(500)]
+        return negatives, positives
+
+    negatives, positives = asyncio.run(scenario())
+    assert all(negatives) and all(positives)
+    # Таблица читается только для ответов "возможно" фильтра: все 500 отозванных и редкие ложные срабатывания
+    assert store._revoked.lookups < 500 + 50
+
+
+# --- Истечение ---
+
+def test_expired_entries_are_swept_and_bloom_filter_rebuilt():
+    clock = FakeClock()
+    store = InMemoryRevocationStore(expected_items=1000, sweep_interval=60, clock=clock)
+
+    async def scenario():
+        assert await store.revoke("short", clock.now + 10)
+        assert await store.revoke("long", clock.now + 3600)
+        clock.now += 11
+        # Истекший токен уже не считается отозванным, но запись еще хранится до очистки
+        assert not await store.is_revoked("short")
+        assert "short" in store._revoked
+
+        clock.now += 60
+        assert await store.revoke("trigger", clock.now + 3600)
+
+    asyncio.run(scenario())
+    assert set(store._revoked) == {"long", "trigger"}
+    assert "short" not in store._bloom
+    assert "long" in store._bloom
+
+
+def test_redis_entry_expires_with_token():
+    clock = FakeClock()
+    client = FakeRedis(clock=clock)
+    store = RedisRevocationStore(client, key_prefix="revoked:")
+
+    async def scenario():
+        expires_at = clock.now + 10.5
+        assert await store.revoke("jti", expires_at)
+        assert client.ttl("revoked:jti") == pytest.approx(11)  # EXAT округляется вверх
+        assert await store.is_revoked("jti")
+        assert not await store.revoke("jti", expires_at)
+        clock.now += 11
+        assert not await store.is_revoked("jti")
+
+    asyncio.run(scenario())